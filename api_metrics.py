@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Request metrics for the Galaxy API server
+Per-route latency / size histograms, in-flight gauges, error counts,
+section timers (calculator, pricing load, YAML I/O, outbound probes) and
+process memory, exported in the Prometheus text format.
+
+Every thread records into its own shard without locking; shards are only
+merged when /metrics is scraped, and shards of finished threads are folded
+into a retired total so thread-per-request servers do not accumulate them.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, List, Optional, Tuple
+
+from memory_tracer import peak_rss_bytes, rss_bytes
+
+# Prometheus client defaults, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+
+# name -> (type, help, buckets)
+METRICS = {
+    'galaxy_http_requests_total': ('counter', 'HTTP requests by route, method and status', None),
+    'galaxy_http_request_exceptions_total': ('counter', 'Requests that raised an unhandled exception', None),
+    'galaxy_http_requests_in_flight': ('gauge', 'Requests currently being served', None),
+    'galaxy_http_request_duration_seconds': ('histogram', 'Time from request start until the response body '
+                                             'is fully sent', LATENCY_BUCKETS),
+    'galaxy_http_request_size_bytes': ('histogram', 'Request body size', SIZE_BUCKETS),
+    'galaxy_http_response_size_bytes': ('histogram', 'Response body size', SIZE_BUCKETS),
+    'galaxy_section_duration_seconds': ('histogram', 'Time spent inside instrumented sections of request '
+                                        'handling', LATENCY_BUCKETS),
+    'galaxy_http_peak_rss_growth_bytes_total': ('counter', 'Growth of the process peak RSS while requests of '
+                                                'this route were being served', None),
+    'galaxy_process_resident_memory_bytes': ('gauge', 'Resident memory of the API process', None),
+    'galaxy_process_peak_resident_memory_bytes': ('gauge', 'Peak resident memory of the API process', None),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+class _Shard:
+    """One thread's metrics: counters / gauges as floats, histograms as [bucket counts..., sum, count]"""
+
+    def __init__(self, thread: Optional[threading.Thread]):
+        self.thread = thread
+        self.values: Dict[Tuple[str, Labels], float] = {}
+        self.histograms: Dict[Tuple[str, Labels], List[float]] = {}
+
+    def merge_into(self, values: Dict, histograms: Dict):
+        for key, value in list(self.values.items()):
+            values[key] = values.get(key, 0) + value
+        for key, series in list(self.histograms.items()):
+            total = histograms.setdefault(key, [0.0] * len(series))
+            for i, v in enumerate(series):
+                total[i] += v
+
+class MetricsRegistry:
+    """Lock-free recording into per-thread shards, merged on collection"""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        self._retired = _Shard(None)
+        self._lock = threading.Lock()
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = _Shard(threading.current_thread())
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def inc(self, name: str, labels: Labels, amount: float = 1):
+        values = self._shard().values
+        key = (name, labels)
+        values[key] = values.get(key, 0) + amount
+
+    def observe(self, name: str, labels: Labels, value: float):
+        buckets = METRICS[name][2]
+        histograms = self._shard().histograms
+        key = (name, labels)
+        series = histograms.get(key)
+        if series is None:
+            series = histograms[key] = [0.0] * (len(buckets) + 2)
+        for i, bound in enumerate(buckets):
+            if value <= bound:
+                series[i] += 1
+                break
+        series[-2] += value
+        series[-1] += 1
+
+    @contextmanager
+    def section(self, name: str):
+        """Time a block of request handling under galaxy_section_duration_seconds"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe('galaxy_section_duration_seconds', (('section', name),), time.perf_counter() - start)
+
+    def timed(self, name: str, func: Callable) -> Callable:
+        """func, timed as a section on every call"""
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with self.section(name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    def collect(self) -> Tuple[Dict, Dict]:
+        """Merged (values, histograms) across all threads, plus process memory"""
+        with self._lock:
+            live = []
+            for shard in self._shards:
+                if shard.thread.is_alive():
+                    live.append(shard)
+                else:
+                    shard.merge_into(self._retired.values, self._retired.histograms)
+            self._shards = live
+            values, histograms = {}, {}
+            self._retired.merge_into(values, histograms)
+            for shard in live:
+                shard.merge_into(values, histograms)
+        for name, size in (('galaxy_process_resident_memory_bytes', rss_bytes()),
+                           ('galaxy_process_peak_resident_memory_bytes', peak_rss_bytes())):
+            if size is not None:
+                values[(name, ())] = size
+        return values, histograms
+
+    def render(self) -> str:
+        """Prometheus text exposition format"""
+        values, histograms = self.collect()
+        lines = []
+        for name, (kind, help_text, buckets) in METRICS.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == 'histogram':
+                for (metric, labels), series in sorted(histograms.items()):
+                    if metric != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(buckets, series):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_labels(labels + (('le', _number(bound)),))} "
+                                     f"{_number(cumulative)}")
+                    lines.append(f"{name}_bucket{_labels(labels + (('le', '+Inf'),))} {_number(series[-1])}")
+                    lines.append(f"{name}_sum{_labels(labels)} {_number(series[-2])}")
+                    lines.append(f"{name}_count{_labels(labels)} {_number(series[-1])}")
+            else:
+                for (metric, labels), value in sorted(values.items()):
+                    if metric == name:
+                        lines.append(f"{name}{_labels(labels)} {_number(value)}")
+        return '\n'.join(lines) + '\n'
+
+def _number(value) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(labels: Labels) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels) + '}'
+
+class MetricsMiddleware:
+    """WSGI middleware timing each request until its response body is fully sent.
+
+    The route label is the matched URL rule (e.g. /api/live/<session_id>),
+    which the Flask app stores in environ['galaxy.route'] (see
+    install_metrics); unmatched paths are grouped as 'unmatched'.
+
+    A request that raises the process's peak RSS is charged the increase, so
+    routes that drive memory up stand out; concurrent requests are each
+    charged the growth seen while they ran.
+    """
+
+    def __init__(self, app, registry: MetricsRegistry):
+        self.app = app
+        self.registry = registry
+
+    def __call__(self, environ, start_response):
+        registry = self.registry
+        start = time.perf_counter()
+        method = environ.get('REQUEST_METHOD', 'GET')
+        state = {'status': '500', 'bytes': 0}
+        peak_before = peak_rss_bytes()
+        in_flight = (('method', method),)
+        registry.inc('galaxy_http_requests_in_flight', in_flight)
+
+        def recording_start_response(status, headers, exc_info=None):
+            state['status'] = status.split(' ', 1)[0]
+            return start_response(status, headers, exc_info)
+
+        def finish(failed: bool):
+            route = environ.get('galaxy.route', 'unmatched')
+            labels = (('route', route), ('method', method))
+            registry.inc('galaxy_http_requests_in_flight', in_flight, -1)
+            registry.inc('galaxy_http_requests_total', labels + (('status', state['status']),))
+            if failed:
+                registry.inc('galaxy_http_request_exceptions_total', labels)
+            registry.observe('galaxy_http_request_duration_seconds', labels, time.perf_counter() - start)
+            registry.observe('galaxy_http_response_size_bytes', labels, state['bytes'])
+            try:
+                request_bytes = int(environ.get('CONTENT_LENGTH') or 0)
+            except ValueError:
+                request_bytes = 0
+            registry.observe('galaxy_http_request_size_bytes', labels, request_bytes)
+            if peak_before is not None:
+                growth = peak_rss_bytes() - peak_before
+                if growth > 0:
+                    registry.inc('galaxy_http_peak_rss_growth_bytes_total', labels, growth)
+
+        try:
+            body = self.app(environ, recording_start_response)
+        except Exception:
+            finish(True)
+            raise
+        return _RecordedBody(body, state, finish)
+
+class _RecordedBody:
+    """Response iterable that counts bytes and records the request once it is closed"""
+
+    def __init__(self, body, state: Dict, finish: Callable[[bool], None]):
+        self.body = body
+        self.state = state
+        self.finish = finish
+        self.failed = False
+        self.finished = False
+
+    def __iter__(self):
+        try:
+            for chunk in self.body:
+                self.state['bytes'] += len(chunk)
+                yield chunk
+        except BaseException:
+            self.failed = True
+            raise
+
+    def close(self):
+        # WSGI servers call close() whether or not the body was fully iterated
+        try:
+            if hasattr(self.body, 'close'):
+                self.body.close()
+        finally:
+            if not self.finished:
+                self.finished = True
+                self.finish(self.failed)
+
+def install_metrics(app, registry: MetricsRegistry, path: str = '/metrics'):
+    """Instrument a Flask app and serve the registry at path"""
+    from flask import Response, request
+
+    @app.before_request
+    def record_route():
+        if request.url_rule is not None:
+            request.environ['galaxy.route'] = request.url_rule.rule
+
+    @app.route(path, methods=['GET'])
+    def metrics():
+        """Prometheus metrics"""
+        return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
+    app.wsgi_app = MetricsMiddleware(app.wsgi_app, registry)
@@ -4,13 +4,17 @@ Enhanced Flask API server for Galaxy Cost Calculator
 Supports customer segments and YAML configuration
 """
 
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_from_directory, stream_with_context
 from flask_cors import CORS
 import yaml
 import json
 import os
 from pathlib import Path
-from typing import Dict, List
+from datetime import datetime
+from typing import Dict, Iterator, Tuple
+import importlib.util
+import itertools
+import time
 import traceback
 import logging
 
@@ -44,25 +48,44 @@ try:
 except ImportError:
     TECHNICAL_MODULES_AVAILABLE = False
 
-# Import database inspector separately
-try:
-    from database_inspector import DatabaseInspector
-    DATABASE_INSPECTOR_AVAILABLE = True
-    print("Database Inspector loaded successfully")
-except ImportError as e:
-    DATABASE_INSPECTOR_AVAILABLE = False
-    print(f"Warning: Database Inspector not available: {e}")
+# Database inspector needs psycopg2, which is only imported on first use
+DATABASE_INSPECTOR_AVAILABLE = importlib.util.find_spec('psycopg2') is not None
+if not DATABASE_INSPECTOR_AVAILABLE:
+    print("Warning: Database Inspector not available: No module named 'psycopg2'")
 
 # Import original calculation functions
 from galaxy_cloud_calculator import (
     load_cloud_pricing,
-    calculate_complete_galaxy_metrics,
-    calculate_with_cloud_pricing
+    calculate_with_cloud_pricing,
+    calculate_segment_metrics,
+    COMPUTE_MODELS
 )
+from scenario_store import ScenarioStore, scenario_record, model_fingerprint
+from cost_surface import CostSurfaceCache
+from live_recalc import LiveSessionManager
+from chart_renderer import FORMATS, ChartCache, ChartRenderer
+from api_metrics import MetricsRegistry, install_metrics
+from calc_profiler import ProfileGate, profiled_view
+from memory_tracer import install_memory_admin, peak_rss_bytes
 
 app = Flask(__name__, static_folder='static', static_url_path='')
 CORS(app)  # Enable CORS for React frontend
 
+# Per-route latency / size histograms and section timers, served at /metrics
+METRICS = MetricsRegistry()
+install_metrics(app, METRICS)
+load_cloud_pricing = METRICS.timed('pricing_load', load_cloud_pricing)
+calculate_segment_metrics = METRICS.timed('calculator', calculate_segment_metrics)
+calculate_with_cloud_pricing = METRICS.timed('calculator', calculate_with_cloud_pricing)
+yaml_load = METRICS.timed('yaml_io', yaml.safe_load)
+yaml_dump = METRICS.timed('yaml_io', yaml.dump)
+
+# Opt-in request profiling (?profile=cprofile|sample|memory with X-Profile-Token);
+# off unless GALAXY_PROFILE_TOKEN is set
+PROFILER = ProfileGate.from_env()
+# Allocation tracing sessions under /api/admin/memory, behind the same token
+install_memory_admin(app, PROFILER)
+
 # Configuration file paths
 CONFIG_DIR = Path(__file__).parent
 VOLUME_CONFIG_FILE = CONFIG_DIR / 'volume_config.yaml'
@@ -71,6 +94,57 @@ PRICING_FILES = {
     'gcp': CONFIG_DIR / 'pricing_gcp.yaml',
     'azure': CONFIG_DIR / 'pricing_azure.yaml'
 }
+PRICING_HISTORY_DB = CONFIG_DIR / 'pricing_history.db'
+SCENARIO_DB = CONFIG_DIR / 'scenarios.db'
+
+# Interpolated cost surfaces for interactive (slider) requests
+COST_SURFACES = CostSurfaceCache()
+
+# Charts render on worker processes; identical requests are served from the byte cache
+CHARTS = ChartRenderer(ChartCache(), workers=2)
+CHART_TIMEOUT_SECONDS = 30
+
+# calculate-segment options the cost surface does not model
+EXACT_ONLY_OPTIONS = ('asOf', 'dataLifecycleMonth', 'loadProfile', 'topology', 'attribution', 'allocationKeys')
+
+# Limits for /api/calculate-batch
+MAX_BATCH_SCENARIOS = 10000
+MAX_BATCH_REQUEST_BYTES = 5 * 1024 * 1024
+BATCH_CHUNK_SIZE = 50
+
+# Request field -> batch_runner scenario field
+BATCH_FIELDS = {
+    'id': 'id',
+    'retail': 'retail',
+    'sme': 'sme',
+    'corporate': 'corporate',
+    'customerCount': 'customer_count',
+    'architecture': 'architecture',
+    'provider': 'provider',
+    'region': 'region',
+    'includeNonProd': 'include_nonprod',
+    'volumeMultiplier': 'volume_multiplier',
+}
+
+# Component name -> response key, as returned by /api/calculate-segment
+COMPONENT_KEYS = {
+    'compute': 'compute',
+    'database': 'database',
+    'storage': 'storage',
+    'network': 'network',
+    'observability': 'observability',
+    'security': 'security',
+    'backup_dr': 'backupDr',
+    'non_production': 'nonProduction',
+    'cache_queue': 'cacheQueue',
+    'api_gateway': 'apiGateway',
+    'cicd': 'cicd',
+}
+
+def _service_min_instances() -> Dict[str, int]:
+    """Baseline instance count per service, used as the floor for peak sizing"""
+    from galaxy_complete_cost_model import GALAXY_SERVICES
+    return {service_id: service['instances'] for service_id, service in GALAXY_SERVICES.items()}
 
 @app.route('/')
 def serve_frontend():
@@ -100,6 +174,7 @@ def get_databases():
         if not DATABASE_INSPECTOR_AVAILABLE:
             raise Exception("Database Inspector not available")
         
+        from database_inspector import DatabaseInspector
         db_inspector = DatabaseInspector()
         
         # Get Galaxy databases stats
@@ -157,6 +232,7 @@ def get_databases():
 def get_database_details(database_name):
     """Get detailed information for a specific database"""
     try:
+        from database_inspector import DatabaseInspector
         db_inspector = DatabaseInspector()
         stats = db_inspector.get_database_stats(database_name)
         
@@ -242,16 +318,18 @@ def check_service_health(service_name):
     
     # Try to check if the service port is open
     try:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(1)
-        result = sock.connect_ex((service_config['host'], service_config['port']))
-        sock.close()
+        with METRICS.section('outbound_probe'):
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.settimeout(1)
+            result = sock.connect_ex((service_config['host'], service_config['port']))
+            sock.close()
         
         if result == 0:
             # Port is open, try actual health check
             try:
                 start_time = time.time()
-                response = requests.get(endpoint_url, timeout=2)
+                with METRICS.section('outbound_probe'):
+                    response = requests.get(endpoint_url, timeout=2)
                 response_time = (time.time() - start_time) * 1000
                 
                 health_status['response_time_ms'] = round(response_time, 2)
@@ -389,7 +467,7 @@ def get_segments():
     try:
         if VOLUME_CONFIG_FILE.exists():
             with open(VOLUME_CONFIG_FILE, 'r') as f:
-                config = yaml.safe_load(f)
+                config = yaml_load(f)
                 return jsonify(config.get('customer_segments', {}))
         else:
             # Return default segments
@@ -460,7 +538,7 @@ def get_operations():
         segments = {'retail': 1000000, 'sme': 100000, 'corporate': 10000}
         if VOLUME_CONFIG_FILE.exists():
             with open(VOLUME_CONFIG_FILE, 'r') as f:
-                config = yaml.safe_load(f)
+                config = yaml_load(f)
                 if 'customer_segments' in config:
                     for seg in segments.keys():
                         if seg in config['customer_segments']:
@@ -491,12 +569,9 @@ def get_operations():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/calculate-segment', methods=['POST'])
-def calculate_segment_cost():
-    """Calculate infrastructure costs based on customer segments"""
+def segment_cost_response(data: Dict) -> Tuple[Dict, int]:
+    """Calculate infrastructure costs based on customer segments; returns (payload, HTTP status)"""
     try:
-        data = request.json
-        
         # Extract segment counts
         retail_count = data.get('retail', 1000000)
         sme_count = data.get('sme', 100000)
@@ -505,9 +580,51 @@ def calculate_segment_cost():
         provider = data.get('provider', 'gcp')
         include_nonprod = data.get('includeNonProd', True)
         volume_multiplier = data.get('volumeMultiplier', 1.0)
+        compute_model = data.get('computeModel', 'fixed')
+        if compute_model not in COMPUTE_MODELS:
+            return {'error': f"Unknown computeModel: {compute_model} (expected one of {', '.join(COMPUTE_MODELS)})"}, 400
+        
+        # While a slider is moving, answer from the interpolated cost surface;
+        # the final request without 'interactive' is computed exactly
+        if (data.get('interactive') and compute_model == 'fixed' and
+                not any(data.get(option) for option in EXACT_ONLY_OPTIONS)):
+            estimate = COST_SURFACES.query(provider, architecture, include_nonprod, retail_count, sme_count,
+                                           corporate_count, volume_multiplier)
+            if estimate:
+                return {
+                    'provider': provider.upper(),
+                    'totalCustomers': retail_count + sme_count + corporate_count,
+                    'architecture': architecture,
+                    'monthlyCost': estimate['total_monthly'],
+                    'annualCost': estimate['total_annual'],
+                    'costPerCustomer': estimate['cost_per_customer'],
+                    'components': {COMPONENT_KEYS.get(k, k): v for k, v in estimate['components'].items()},
+                    'approximate': True,
+                    'errorBound': estimate['error_bound'],
+                    'relativeErrorBound': estimate['relative_error'],
+                }, 200
         
-        # Calculate total volumes
-        totals = calculate_total_volumes(retail_count, sme_count, corporate_count, volume_multiplier)
+        # Load pricing for provider, optionally as it was on a past date
+        if data.get('asOf'):
+            from pricing_history import pricing_as_of
+            try:
+                pricing = pricing_as_of(provider, data['asOf'], str(PRICING_HISTORY_DB))
+            except (FileNotFoundError, LookupError) as e:
+                return {'error': str(e)}, 404
+        else:
+            pricing = load_cloud_pricing(provider)
+        
+        # Return the stored result for identical inputs, pricing and model version
+        inputs = {k: v for k, v in data.items() if k != 'useCache'}
+        inputs.update({'retail': retail_count, 'sme': sme_count, 'corporate': corporate_count,
+                       'architecture': architecture, 'provider': provider,
+                       'includeNonProd': include_nonprod, 'volumeMultiplier': volume_multiplier})
+        store_config = {'model': model_fingerprint()}
+        if data.get('useCache', True):
+            with ScenarioStore(str(SCENARIO_DB)) as store:
+                cached = store.find_cached(inputs, pricing, store_config)
+            if cached and cached['response']:
+                return {**cached['response'], 'scenarioId': cached['id'], 'cached': True}, 200
         
         # Calculate total customer count
         total_customers = retail_count + sme_count + corporate_count
@@ -521,21 +638,51 @@ def calculate_segment_cost():
         }
         
         # Calculate metrics with segment-weighted transaction rates
-        metrics = calculate_complete_galaxy_metrics(config)
+        metrics, totals = calculate_segment_metrics(retail_count, sme_count, corporate_count, architecture,
+                                                    include_nonprod, volume_multiplier)
         
-        # Adjust metrics based on actual operation volumes
-        # Transaction rate based on actual volumes
-        total_transactions = totals['services'].get('TITAN', {}).get('write_ops', 0) / (30 * 24 * 3600)
-        metrics['transaction_tps'] = total_transactions
-        metrics['ledger_tps'] = total_transactions  # Ledger entries match transactions
-        metrics['customer_api_tps'] = totals['total_operations_month'] / (30 * 24 * 3600)
+        # Optionally bill the database on data accumulated by a given month
+        lifecycle = None
+        if data.get('dataLifecycleMonth'):
+            from data_lifecycle_model import simulate_data_lifecycle, lifecycle_summary, HOT_INDEX_OVERHEAD
+            month = int(data['dataLifecycleMonth'])
+            result = simulate_data_lifecycle(retail_count, sme_count, corporate_count, pricing,
+                                             months=month, growth_rate=data.get('growthRate', 0.0),
+                                             volume_multiplier=volume_multiplier, config=config)
+            lifecycle = lifecycle_summary(result, month)
+            metrics['total_data_gb'] = lifecycle['hot_gb'] * HOT_INDEX_OVERHEAD
         
-        # Data volume based on actual calculations
-        metrics['total_data_gb'] = totals['total_data_gb_month'] * 12  # Annual data
-        metrics['include_nonprod'] = include_nonprod
+        # Optionally size transaction rates on simulated hourly peaks
+        peaks = None
+        if data.get('loadProfile') or compute_model == 'autoscaling':
+            from load_profile_model import simulate_hourly_demand, calculate_peak_metrics, apply_peak_metrics
+            try:
+                demand = simulate_hourly_demand(retail_count, sme_count, corporate_count, volume_multiplier,
+                                                shape=data.get('loadShape'))
+            except ValueError as e:
+                return {'error': str(e)}, 400
+            if data.get('loadProfile'):
+                peaks = calculate_peak_metrics(demand, _service_min_instances())
+                apply_peak_metrics(metrics, peaks)
+            if compute_model == 'autoscaling':
+                from autoscaling_model import default_policies
+                try:
+                    default_policies(data.get('autoscalingPolicies'))
+                except ValueError as e:
+                    return {'error': str(e)}, 400
+                metrics['compute_model'] = compute_model
+                metrics['hourly_demand'] = demand
+                metrics['autoscaling_policies'] = data.get('autoscalingPolicies')
         
-        # Load pricing for provider
-        pricing = load_cloud_pricing(provider)
+        # Optionally price an explicit region layout instead of the architecture multiplier
+        if data.get('topology'):
+            from topology_model import validate_topology
+            try:
+                validate_topology(data['topology'])
+            except ValueError as e:
+                return {'error': str(e)}, 400
+            metrics['topology'] = data['topology']
+            metrics['write_gb_month'] = totals['total_data_gb_month']
         
         # Calculate costs
         costs = calculate_with_cloud_pricing(metrics, pricing)
@@ -594,13 +741,272 @@ def calculate_segment_cost():
             'serviceBreakdown': totals['services']
         }
         
-        return jsonify(response)
+        if 'autoscaling' in metrics:
+            response['autoscaling'] = metrics['autoscaling']
+        
+        if lifecycle:
+            response['dataLifecycle'] = lifecycle
+        
+        if data.get('attribution') or data.get('allocationKeys'):
+            from cost_attribution_model import build_allocation_weights, attribute_costs, attribution_summary
+            weights = build_allocation_weights(retail_count, sme_count, corporate_count, volume_multiplier,
+                                               data.get('cpuWeights'), config)
+            try:
+                attribution = attribute_costs(costs['components'], weights, data.get('allocationKeys'))
+            except ValueError as e:
+                return {'error': str(e)}, 400
+            response['attribution'] = attribution_summary(attribution, data.get('attributionTop'))
+        
+        if 'regions' in costs:
+            response['topology'] = {
+                'regions': costs['regions'],
+                'replicationGbMonth': costs['replication_gb_month'],
+            }
+        
+        if peaks:
+            response['loadProfile'] = {
+                'avgTps': peaks['avg_tps'],
+                'peakTps': peaks['peak_tps'],
+                'p95Tps': peaks['p95_tps'],
+                'peakMultiplier': peaks['peak_multiplier'],
+                'peakIops': peaks['peak_iops'],
+                'peakHour': peaks['peak_hour'],
+                'instanceHours': peaks['instance_hours'],
+                'services': peaks['services']
+            }
+        
+        with ScenarioStore(str(SCENARIO_DB)) as store:
+            response['scenarioId'] = store.save(scenario_record(
+                inputs, costs['components'], costs['total_monthly'], 'api', pricing, store_config, response))
+        response['cached'] = False
+        
+        return response, 200
     
     except Exception as e:
         traceback.print_exc()
-        return jsonify({'error': str(e)}), 500
+        return {'error': str(e)}, 500
+
+@app.route('/api/calculate-segment', methods=['POST'])
+@profiled_view(PROFILER)
+def calculate_segment_cost():
+    """Calculate infrastructure costs based on customer segments"""
+    payload, status = segment_cost_response(request.json)
+    return jsonify(payload), status
+
+# Live recalculation: interactive (surface-backed) unless the client sends interactive=false
+LIVE_SESSIONS = LiveSessionManager(lambda inputs: segment_cost_response({'interactive': True, **inputs}))
+
+@app.route('/api/live', methods=['POST'])
+def create_live_session():
+    """Start a live recalculation session, optionally with initial inputs"""
+    session = LIVE_SESSIONS.create(request.get_json(silent=True) or {})
+    return jsonify({'sessionId': session.id, 'events': f'/api/live/{session.id}/events'}), 201
+
+@app.route('/api/live/<session_id>', methods=['POST'])
+def push_live_inputs(session_id):
+    """Merge input changes into a session (?replace=true to replace them); the latest state is computed"""
+    session = LIVE_SESSIONS.get(session_id)
+    if session is None:
+        return jsonify({'error': f'Unknown live session: {session_id}'}), 404
+    changes = request.get_json(silent=True)
+    if not isinstance(changes, dict):
+        return jsonify({'error': 'Input changes must be a JSON object'}), 400
+    try:
+        version = session.push(changes, replace=request.args.get('replace') == 'true')
+    except RuntimeError as e:
+        return jsonify({'error': str(e)}), 404
+    return jsonify({'version': version}), 202
+
+@app.route('/api/live/<session_id>/events', methods=['GET'])
+def live_events(session_id):
+    """Server-Sent Events stream of results for a session"""
+    session = LIVE_SESSIONS.get(session_id)
+    if session is None:
+        return jsonify({'error': f'Unknown live session: {session_id}'}), 404
+    last_version = int(request.headers.get('Last-Event-ID', 0) or 0)
+    return Response(session.events(last_version), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/live/<session_id>', methods=['GET'])
+def get_live_session(session_id):
+    """Inputs, versions and coalescing counters of a session"""
+    session = LIVE_SESSIONS.get(session_id)
+    if session is None:
+        return jsonify({'error': f'Unknown live session: {session_id}'}), 404
+    return jsonify(session.status())
+
+@app.route('/api/live/<session_id>', methods=['DELETE'])
+def close_live_session(session_id):
+    """Close a session and end its event streams"""
+    if not LIVE_SESSIONS.close(session_id):
+        return jsonify({'error': f'Unknown live session: {session_id}'}), 404
+    return jsonify({'message': f'Live session {session_id} closed'})
+
+def _read_body(limit: int):
+    """Request body bytes, or None once more than limit bytes arrive (chunked bodies carry no Content-Length)"""
+    body = bytearray()
+    while len(body) <= limit:
+        chunk = request.stream.read(min(65536, limit + 1 - len(body)))
+        if not chunk:
+            return bytes(body)
+        body.extend(chunk)
+    return None
+
+def _batch_scenarios(data) -> Tuple[int, Iterator[Dict]]:
+    """(count, scenarios) for an array, {'scenarios': [...]} or a {'grid': {...}, 'base': {...}} spec.
+
+    A grid is the cartesian product of its value lists, each merged over base,
+    and is generated lazily.
+    """
+    if isinstance(data, dict) and 'grid' in data:
+        grid = data['grid']
+        if not isinstance(grid, dict) or not grid or not all(isinstance(v, list) and v for v in grid.values()):
+            raise ValueError('grid must map field names to non-empty lists of values')
+        base = data.get('base', {})
+        count = 1
+        for values in grid.values():
+            count *= len(values)
+        keys = list(grid)
+        return count, ({**base, **dict(zip(keys, combo))} for combo in itertools.product(*grid.values()))
+
+    scenarios = data.get('scenarios') if isinstance(data, dict) else data
+    if not isinstance(scenarios, list):
+        raise ValueError('Expected an array of scenarios, {"scenarios": [...]} or {"grid": {...}}')
+    return len(scenarios), iter(scenarios)
+
+def _batch_item(item: Dict) -> Dict:
+    """Format one batch_runner result like a /api/calculate-segment response"""
+    if 'error' in item:
+        return {'index': item['index'], 'id': item['id'], 'error': item['error']}
+    return {
+        'index': item['index'],
+        'id': item['id'],
+        'provider': item['provider'].upper(),
+        'architecture': item['architecture'],
+        'segments': {s: item[s] for s in ('retail', 'sme', 'corporate') if item.get(s) is not None},
+        'totalCustomers': item['customer_count'],
+        'monthlyCost': item['total_monthly'],
+        'annualCost': item['total_annual'],
+        'costPerCustomer': item['cost_per_customer'],
+        'components': {COMPONENT_KEYS.get(k, k): v for k, v in item['components'].items()},
+    }
+
+@app.route('/api/calculate-batch', methods=['POST'])
+def calculate_batch():
+    """Calculate many segment scenarios, streaming one NDJSON line per scenario in input order"""
+    from batch_runner import evaluate_chunk
+    
+    body = None
+    if not request.content_length or request.content_length <= MAX_BATCH_REQUEST_BYTES:
+        body = _read_body(MAX_BATCH_REQUEST_BYTES)
+    if body is None:
+        return jsonify({'error': f'Request body exceeds {MAX_BATCH_REQUEST_BYTES} bytes'}), 413
+    
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return jsonify({'error': 'Request body must be JSON'}), 400
+    try:
+        count, scenarios = _batch_scenarios(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if count > MAX_BATCH_SCENARIOS:
+        return jsonify({'error': f'{count} scenarios requested; the limit is {MAX_BATCH_SCENARIOS}'}), 413
+    
+    def generate():
+        start = time.perf_counter()
+        peak_before = peak_rss_bytes()
+        failed = 0
+        chunk = []
+        
+        def flush():
+            nonlocal failed
+            for item in evaluate_chunk(chunk):
+                failed += 'error' in item
+                yield json.dumps(_batch_item(item)) + '\n'
+            chunk.clear()
+        
+        for index, scenario in enumerate(scenarios):
+            unknown = set(scenario) - set(BATCH_FIELDS) if isinstance(scenario, dict) else set()
+            if unknown:
+                yield from flush()
+                failed += 1
+                yield json.dumps({'index': index, 'id': scenario.get('id', index),
+                                  'error': f"Unknown field(s): {', '.join(sorted(unknown))}"}) + '\n'
+                continue
+            if isinstance(scenario, dict):
+                scenario = {BATCH_FIELDS[k]: v for k, v in scenario.items()}
+            chunk.append((index, scenario))
+            if len(chunk) >= BATCH_CHUNK_SIZE:
+                yield from flush()
+        yield from flush()
+        
+        summary = {'count': count, 'failed': failed, 'elapsedMs': (time.perf_counter() - start) * 1000}
+        if peak_before is not None:
+            peak = peak_rss_bytes()
+            summary.update({'peakRssMb': round(peak / 1048576, 1),
+                            'peakRssGrowthMb': round((peak - peak_before) / 1048576, 1)})
+        yield json.dumps({'summary': summary}) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/api/cost-surface', methods=['GET'])
+def get_cost_surfaces():
+    """Status of the interpolated cost surfaces used for interactive requests"""
+    return jsonify({'maxRelativeError': COST_SURFACES.max_relative_error, 'surfaces': COST_SURFACES.status()})
+
+@app.route('/api/cost-surface/rebuild', methods=['POST'])
+def rebuild_cost_surface():
+    """Start building the cost surface for a provider / architecture / includeNonProd"""
+    data = request.json or {}
+    provider = data.get('provider', 'gcp')
+    if provider not in PRICING_FILES and provider != 'generic':
+        return jsonify({'error': f'Unknown provider: {provider}'}), 400
+    key = (provider, data.get('architecture', 'single_region_3az'), bool(data.get('includeNonProd', True)))
+    COST_SURFACES.rebuild(key, wait=bool(data.get('wait')))
+    return jsonify({'surfaces': COST_SURFACES.status()}), 202
+
+def chart_response(kind: str, data: Dict, style: Dict = None, fmt: str = 'png'):
+    """Rendered chart bytes with a content-hash ETag"""
+    try:
+        key, future = CHARTS.submit(kind, data, style, fmt)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if request.if_none_match.contains(key):
+        return Response(status=304, headers={'ETag': f'"{key}"'})
+    try:
+        content = future.result(CHART_TIMEOUT_SECONDS)
+    except Exception as e:
+        return jsonify({'error': f'Chart rendering failed: {e}'}), 500
+    return Response(content, mimetype=FORMATS[fmt],
+                    headers={'ETag': f'"{key}"', 'Cache-Control': 'private, max-age=300'})
+
+@app.route('/api/charts', methods=['POST'])
+def render_chart_endpoint():
+    """Render a chart from {kind, data, style, format}"""
+    data = request.json or {}
+    if not isinstance(data.get('data'), dict):
+        return jsonify({'error': 'data must be an object'}), 400
+    return chart_response(data.get('kind'), data['data'], data.get('style'), data.get('format', 'png'))
+
+@app.route('/api/charts/segment-breakdown', methods=['POST'])
+def segment_breakdown_chart():
+    """Pie chart of the component costs for a /api/calculate-segment request"""
+    data = dict(request.json or {})
+    fmt = data.pop('format', 'png')
+    payload, status = segment_cost_response(data)
+    if status != 200:
+        return jsonify(payload), status
+    title = f"{payload['provider'].upper()} Monthly Cost Breakdown"
+    return chart_response('cost_breakdown', {'costs': payload['components']}, {'title': title}, fmt)
+
+@app.route('/api/charts/cache', methods=['GET'])
+def chart_cache_stats():
+    """Chart byte cache statistics"""
+    return jsonify(CHARTS.cache.stats())
 
 @app.route('/api/compare-segment', methods=['POST'])
+@profiled_view(PROFILER)
 def compare_segment_providers():
     """Compare costs across providers for segment-based configuration"""
     try:
@@ -614,28 +1020,18 @@ def compare_segment_providers():
         include_nonprod = data.get('includeNonProd', True)
         volume_multiplier = data.get('volumeMultiplier', 1.0)
         
-        # Calculate volumes once
-        totals = calculate_total_volumes(retail_count, sme_count, corporate_count, volume_multiplier)
-        total_customers = retail_count + sme_count + corporate_count
-        
-        # Create config
-        config = {
-            'customer_count': total_customers,
-            'architecture_variant': architecture,
-            'backup_retention_days': 30,
-            'log_retention_days': 30
-        }
-        
-        # Calculate metrics
-        metrics = calculate_complete_galaxy_metrics(config)
-        metrics['include_nonprod'] = include_nonprod
+        # Calculate metrics once, sized on segment volumes
+        metrics, _ = calculate_segment_metrics(retail_count, sme_count, corporate_count, architecture,
+                                               include_nonprod, volume_multiplier)
         
-        # Adjust metrics for segments
-        total_transactions = totals['services'].get('TITAN', {}).get('write_ops', 0) / (30 * 24 * 3600)
-        metrics['transaction_tps'] = total_transactions
-        metrics['ledger_tps'] = total_transactions
-        metrics['customer_api_tps'] = totals['total_operations_month'] / (30 * 24 * 3600)
-        metrics['total_data_gb'] = totals['total_data_gb_month'] * 12
+        if data.get('loadProfile'):
+            from load_profile_model import simulate_hourly_demand, calculate_peak_metrics, apply_peak_metrics
+            try:
+                demand = simulate_hourly_demand(retail_count, sme_count, corporate_count, volume_multiplier,
+                                                shape=data.get('loadShape'))
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            apply_peak_metrics(metrics, calculate_peak_metrics(demand, _service_min_instances()))
         
         # Calculate for each provider
         results = {}
@@ -682,13 +1078,118 @@ def compare_segment_providers():
         traceback.print_exc()
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/commitments/optimize', methods=['POST'])
+def optimize_commitment_levels():
+    """Recommend committed-use / reserved capacity levels for a provider"""
+    try:
+        from commitment_model import (
+            demand_from_growth_projection, demand_from_hourly_profile,
+            optimize_commitments, DEFAULT_DOWNSIDE
+        )
+        data = request.json or {}
+        provider = data.get('provider', 'aws')
+        pricing = load_cloud_pricing(provider)
+        
+        if data.get('source', 'growth') == 'hourly':
+            demand = demand_from_hourly_profile(
+                data.get('retail', 1000000), data.get('sme', 100000), data.get('corporate', 10000),
+                pricing, data.get('volumeMultiplier', 1.0)
+            )
+        else:
+            demand = demand_from_growth_projection(
+                data.get('initialCustomers', 100000), data.get('growthRate', 0.03), data.get('months', 36)
+            )
+        
+        result = optimize_commitments(demand, pricing, data.get('downside', DEFAULT_DOWNSIDE))
+        result['provider'] = provider.upper()
+        return jsonify(result)
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/data-lifecycle', methods=['POST'])
+def simulate_data_lifecycle_endpoint():
+    """Simulate multi-year data accumulation and tiered storage cost"""
+    try:
+        from data_lifecycle_model import simulate_data_lifecycle, lifecycle_summary
+        data = request.json or {}
+        months = int(data.get('years', 10) * 12)
+        config = {
+            'backup_retention_days': data.get('backupRetentionDays', 30),
+            'log_retention_days': data.get('logRetentionDays', 90),
+            'data_classes': data.get('dataClasses', {}),
+        }
+        
+        result = simulate_data_lifecycle(
+            data.get('retail', 1000000), data.get('sme', 100000), data.get('corporate', 10000),
+            load_cloud_pricing(data.get('provider', 'gcp')), months=months,
+            growth_rate=data.get('growthRate', 0.0),
+            volume_multiplier=data.get('volumeMultiplier', 1.0), config=config
+        )
+        
+        return jsonify({
+            'months': months,
+            'prices': result['prices'],
+            'totalCost': result['total_cost'],
+            'monthly': {
+                'hotGb': result['hot_gb'].tolist(),
+                'warmGb': result['warm_gb'].tolist(),
+                'coldGb': result['cold_gb'].tolist(),
+                'expiredGb': result['expired_gb'].tolist(),
+                'cost': result['monthly_cost'].tolist(),
+            },
+            'final': lifecycle_summary(result)
+        })
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/what-if', methods=['POST'])
+def what_if():
+    """Apply price / volume edits to a session baseline, recomputing only affected components"""
+    try:
+        from whatif_model import get_session
+        data = request.json or {}
+        
+        session_id, session, created = get_session(
+            data.get('sessionId'),
+            retail_count=data.get('retail', 1000000),
+            sme_count=data.get('sme', 100000),
+            corporate_count=data.get('corporate', 10000),
+            provider=data.get('provider', 'gcp'),
+            architecture=data.get('architecture', 'single_region_3az'),
+            include_nonprod=data.get('includeNonProd', True),
+            volume_multiplier=data.get('volumeMultiplier', 1.0),
+        )
+        
+        try:
+            result = session.apply(data.get('changes', []))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return jsonify({
+            'sessionId': session_id,
+            'created': created,
+            'monthlyCost': result['total_monthly'],
+            'annualCost': result['total_monthly'] * 12,
+            'monthlyDelta': result['total_delta'],
+            'components': result['components'],
+            'deltas': result['deltas'],
+            'changedInputs': result['changed_inputs'],
+            'recomputed': result['recomputed'],
+            'elapsedMs': result['elapsed_ms'],
+        })
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/config/volume', methods=['GET'])
 def get_volume_config():
     """Get the current volume configuration YAML"""
     try:
         if VOLUME_CONFIG_FILE.exists():
             with open(VOLUME_CONFIG_FILE, 'r') as f:
-                config = yaml.safe_load(f)
+                config = yaml_load(f)
                 return jsonify(config)
         else:
             return jsonify({'error': 'Configuration file not found'}), 404
@@ -707,7 +1208,8 @@ def update_volume_config():
         
         # Save configuration
         with open(VOLUME_CONFIG_FILE, 'w') as f:
-            yaml.dump(data, f, default_flow_style=False, sort_keys=False)
+            yaml_dump(data, f, default_flow_style=False, sort_keys=False)
+        COST_SURFACES.invalidate()
         
         return jsonify({'message': 'Configuration updated successfully'})
     except Exception as e:
@@ -723,7 +1225,7 @@ def get_pricing_config(provider):
         pricing_file = PRICING_FILES[provider]
         if pricing_file.exists():
             with open(pricing_file, 'r') as f:
-                config = yaml.safe_load(f)
+                config = yaml_load(f)
                 return jsonify(config)
         else:
             return jsonify({'error': f'Pricing file not found for {provider}'}), 404
@@ -738,13 +1240,117 @@ def update_pricing_config(provider):
             return jsonify({'error': f'Unknown provider: {provider}'}), 400
         
         data = request.json
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Pricing configuration must be an object'}), 400
         pricing_file = PRICING_FILES[provider]
         
-        # Save configuration
-        with open(pricing_file, 'w') as f:
-            yaml.dump(data, f, default_flow_style=False, sort_keys=False)
+        from pricing_history import PricingHistory, parse_as_of
+        effective = request.args.get('effective')
+        if effective:
+            try:
+                parse_as_of(effective)
+            except ValueError:
+                return jsonify({'error': f'Invalid effective date: {effective} (expected ISO date or datetime)'}), 400
+        
+        # Keep the file being replaced as the baseline the first time history is used
+        history = PricingHistory(str(PRICING_HISTORY_DB))
+        try:
+            if not history.log(provider) and pricing_file.exists():
+                with open(pricing_file, 'r') as f:
+                    baseline = yaml_load(f)
+                modified = datetime.fromtimestamp(pricing_file.stat().st_mtime).isoformat(timespec='seconds')
+                history.record(provider, baseline, modified)
+            
+            # Record the version before touching the file, so a failure never leaves an unversioned change
+            version = history.record(provider, data, effective)
+        finally:
+            history.close()
         
-        return jsonify({'message': f'Pricing configuration for {provider} updated successfully'})
+        # Save configuration; readers see the old file or the new one, never a partial write
+        staging = pricing_file.with_name(f'.{pricing_file.name}.tmp')
+        with open(staging, 'w') as f:
+            yaml_dump(data, f, default_flow_style=False, sort_keys=False)
+        os.replace(staging, pricing_file)
+        COST_SURFACES.invalidate(provider)
+        
+        return jsonify({
+            'message': f'Pricing configuration for {provider} updated successfully',
+            'version': version['id'],
+            'contentHash': version['content_hash'],
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/config/pricing/<provider>/history', methods=['GET'])
+def get_pricing_history(provider):
+    """List recorded pricing versions, or the pricing in effect at ?asOf=<date>"""
+    try:
+        if provider not in PRICING_FILES:
+            return jsonify({'error': f'Unknown provider: {provider}'}), 400
+        
+        from pricing_history import PricingHistory
+        history = PricingHistory(str(PRICING_HISTORY_DB))
+        try:
+            if request.args.get('asOf'):
+                pricing = history.as_of(provider, request.args['asOf'])
+                if pricing is None:
+                    return jsonify({'error': f"No {provider} pricing recorded on or before {request.args['asOf']}"}), 404
+                return jsonify(pricing)
+            return jsonify({'provider': provider, 'versions': history.log(provider)})
+        finally:
+            history.close()
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/scenarios', methods=['GET'])
+def list_scenarios():
+    """Query stored scenarios by provider, architecture, segment counts and date"""
+    try:
+        args = request.args
+        with ScenarioStore(str(SCENARIO_DB)) as store:
+            scenarios = store.query(
+                provider=args.get('provider'),
+                architecture=args.get('architecture'),
+                retail=args.get('retail', type=int),
+                sme=args.get('sme', type=int),
+                corporate=args.get('corporate', type=int),
+                min_customers=args.get('minCustomers', type=int),
+                max_customers=args.get('maxCustomers', type=int),
+                since=args.get('since'),
+                until=args.get('until'),
+                source=args.get('source'),
+                limit=args.get('limit', 100, type=int),
+                with_components=args.get('components') == 'true'
+            )
+        return jsonify({'scenarios': scenarios})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/scenarios/<int:scenario_id>', methods=['GET'])
+def get_scenario(scenario_id):
+    """Stored inputs and component results of one scenario"""
+    try:
+        with ScenarioStore(str(SCENARIO_DB)) as store:
+            scenario = store.get(scenario_id)
+        if scenario is None:
+            return jsonify({'error': f'Unknown scenario id: {scenario_id}'}), 404
+        return jsonify(scenario)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/scenarios/diff', methods=['GET'])
+def diff_scenarios():
+    """Input changes and component deltas between ?from=<id> and ?to=<id>"""
+    try:
+        from_id = request.args.get('from', type=int)
+        to_id = request.args.get('to', type=int)
+        if from_id is None or to_id is None:
+            return jsonify({'error': 'from and to scenario ids are required'}), 400
+        with ScenarioStore(str(SCENARIO_DB)) as store:
+            try:
+                return jsonify(store.diff(from_id, to_id))
+            except KeyError as e:
+                return jsonify({'error': e.args[0]}), 404
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -756,7 +1362,7 @@ def get_services():
         segments = {'retail': 1000000, 'sme': 100000, 'corporate': 10000}
         if VOLUME_CONFIG_FILE.exists():
             with open(VOLUME_CONFIG_FILE, 'r') as f:
-                config = yaml.safe_load(f)
+                config = yaml_load(f)
                 if 'customer_segments' in config:
                     for seg in segments.keys():
                         if seg in config['customer_segments']:
@@ -959,13 +1565,33 @@ if __name__ == '__main__':
     print("  POST /api/segments - Update customer segments")
     print("  GET  /api/operations - Get operation profiles")
     print("  POST /api/calculate-segment - Calculate segment-based costs")
+    print("  POST /api/live - Start a live recalculation session")
+    print("  POST /api/live/<id> - Push input changes (coalesced; latest state wins)")
+    print("  GET  /api/live/<id>/events - Server-Sent Events stream of results")
+    print("  POST /api/calculate-batch - Calculate many scenarios (array or grid), streamed as NDJSON")
     print("  POST /api/compare-segment - Compare providers")
+    print("       ?profile=cprofile|sample|memory on calculate/compare-segment - Profile the request "
+          "(X-Profile-Token)")
+    print("  GET  /api/cost-surface - Interpolated cost surface status")
+    print("  POST /api/cost-surface/rebuild - Rebuild a cost surface")
+    print("  POST /api/charts - Render a chart (PNG/SVG) from {kind, data, style, format}")
+    print("  POST /api/charts/segment-breakdown - Component cost chart for a segment calculation")
+    print("  POST /api/commitments/optimize - Recommend reserved/committed capacity")
+    print("  POST /api/data-lifecycle - Simulate data accumulation and storage tiering")
+    print("  POST /api/what-if - Incremental recalculation for price / volume edits")
     print("  GET  /api/config/volume - Get volume configuration")
     print("  POST /api/config/volume - Update volume configuration")
     print("  GET  /api/config/pricing/<provider> - Get pricing config")
     print("  POST /api/config/pricing/<provider> - Update pricing config")
+    print("  GET  /api/config/pricing/<provider>/history - Pricing versions (?asOf=<date>)")
+    print("  GET  /api/scenarios - Query stored scenarios")
+    print("  GET  /api/scenarios/<id> - Stored scenario inputs and results")
+    print("  GET  /api/scenarios/diff?from=<id>&to=<id> - Compare two stored scenarios")
     print("  GET  /api/services - List Galaxy services")
     print("  GET  /api/health - Health check")
+    print("  GET  /api/admin/memory - Process RSS / peak RSS; POST .../start, GET .../snapshot, POST .../stop "
+          "trace allocations (X-Profile-Token)")
+    print("  GET  /metrics - Prometheus metrics (per-route latency, sizes, errors, section timings)")
     print("  GET  /api/documentation/status - Documentation portal status")
     print("  POST /api/documentation/lint - Run documentation lint")
     print("  POST /api/documentation/build - Build documentation")
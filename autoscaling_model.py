@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Autoscaling replay engine for Galaxy Platform
+Replays a horizontal autoscaling policy over hourly demand to estimate
+instance-hours and compute cost under time-varying load
+"""
+
+import argparse
+from dataclasses import dataclass, fields
+from typing import Dict, Optional
+import numpy as np
+
+from galaxy_complete_cost_model import GALAXY_SERVICES
+from pricing_tables import apply_architecture_multiplier
+
+HOURS_PER_MONTH = 730
+
+# Sustained throughput of one vCPU (pricing_tables assumes 100 TPS per 4 vCPU instance)
+DEFAULT_TPS_PER_VCPU = 25
+
+@dataclass
+class AutoscalingPolicy:
+    """Horizontal autoscaling policy for a single service"""
+    min_replicas: int
+    max_replicas: int
+    target_utilization: float = 0.7   # Scale so load / capacity stays near this value
+    tps_per_replica: float = 100      # Sustained TPS of one replica at 100% utilisation
+    scale_up_cooldown_hours: int = 1  # Minimum hours between two scale-up events
+    scale_down_cooldown_hours: int = 3  # Minimum hours since the last scale event before scaling down
+
+    def __post_init__(self):
+        if not 1 <= self.min_replicas <= self.max_replicas:
+            raise ValueError(f"Replica bounds must satisfy 1 <= min_replicas <= max_replicas, "
+                             f"got {self.min_replicas} and {self.max_replicas}")
+        if not 0 < self.target_utilization <= 1:
+            raise ValueError(f"target_utilization must be in (0, 1], got {self.target_utilization}")
+        if not self.tps_per_replica > 0:
+            raise ValueError(f"tps_per_replica must be positive, got {self.tps_per_replica}")
+        if self.scale_up_cooldown_hours < 0 or self.scale_down_cooldown_hours < 0:
+            raise ValueError("Cooldowns must not be negative")
+
+POLICY_FIELDS = {f.name for f in fields(AutoscalingPolicy)}
+
+def default_policies(overrides: Optional[Dict[str, Dict]] = None) -> Dict[str, AutoscalingPolicy]:
+    """Build a policy per Galaxy service, seeded from its fixed instance count.
+
+    overrides maps 'default' or a service id to policy fields; unknown
+    services, unknown fields and out-of-range values raise ValueError.
+    """
+    overrides = overrides or {}
+    if not isinstance(overrides, dict):
+        raise ValueError("Autoscaling policies must be an object keyed by service")
+    for key, settings in overrides.items():
+        if key != 'default' and key not in GALAXY_SERVICES:
+            raise ValueError(f"Unknown service in autoscaling policies: {key}")
+        if not isinstance(settings, dict):
+            raise ValueError(f"Autoscaling policy for {key} must be an object")
+        unknown = set(settings) - POLICY_FIELDS
+        if unknown:
+            raise ValueError(f"Unknown autoscaling policy field(s) for {key}: {', '.join(sorted(unknown))}")
+        for name, value in settings.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError(f"Autoscaling policy field {key}.{name} must be a number")
+
+    policies = {}
+    for service_id, service in GALAXY_SERVICES.items():
+        settings = {
+            'min_replicas': service['instances'],
+            'max_replicas': service['instances'] * 10,
+            'tps_per_replica': service['cpu_per_instance'] * DEFAULT_TPS_PER_VCPU,
+        }
+        settings.update(overrides.get('default', {}))
+        settings.update(overrides.get(service_id, {}))
+        try:
+            policies[service_id] = AutoscalingPolicy(**settings)
+        except ValueError as e:
+            raise ValueError(f"Autoscaling policy for {service_id}: {e}") from None
+    return policies
+
+def replay_autoscaling(tps: np.ndarray, policies: Dict[str, AutoscalingPolicy], services: list) -> Dict:
+    """Replay autoscaling decisions hour by hour for all services at once.
+
+    tps is a (services x hours) array of demand. The desired replica count is
+    computed vectorised up front; only the cooldown state machine runs per
+    hour, operating on whole service vectors.
+    """
+    policy_list = [policies[s.lower()] for s in services]
+    min_r = np.array([p.min_replicas for p in policy_list], dtype=np.int64)
+    max_r = np.array([p.max_replicas for p in policy_list], dtype=np.int64)
+    capacity = np.array([p.tps_per_replica * p.target_utilization for p in policy_list])
+    up_cooldown = np.array([p.scale_up_cooldown_hours for p in policy_list], dtype=np.int64)
+    down_cooldown = np.array([p.scale_down_cooldown_hours for p in policy_list], dtype=np.int64)
+
+    desired = np.clip(np.ceil(tps / capacity[:, None]).astype(np.int64), min_r[:, None], max_r[:, None])
+
+    n_services, n_hours = tps.shape
+    replicas = np.empty((n_services, n_hours), dtype=np.int64)
+    current = min_r.copy()
+    last_up = np.full(n_services, -10**9, dtype=np.int64)
+    last_change = np.full(n_services, -10**9, dtype=np.int64)
+
+    for hour in range(n_hours):
+        want = desired[:, hour]
+        up = (want > current) & (hour - last_up >= up_cooldown)
+        down = (want < current) & (hour - last_change >= down_cooldown)
+        changed = up | down
+        current = np.where(changed, want, current)
+        last_up = np.where(up, hour, last_up)
+        last_change = np.where(changed, hour, last_change)
+        replicas[:, hour] = current
+
+    served_capacity = replicas * np.array([p.tps_per_replica for p in policy_list])[:, None]
+    saturated = tps > served_capacity
+    utilization = np.divide(tps, served_capacity, out=np.zeros_like(tps), where=served_capacity > 0)
+
+    return {
+        'services': services,
+        'replicas': replicas,
+        'instance_hours': replicas.sum(axis=1),
+        'scale_events': np.count_nonzero(np.diff(replicas, axis=1), axis=1),
+        'saturated_hours': saturated.sum(axis=1),
+        'avg_utilization': utilization.mean(axis=1),
+    }
+
+def estimate_autoscaled_compute_cost(metrics: Dict, pricing: Dict, variant: str,
+                                     policies: Optional[Dict[str, AutoscalingPolicy]] = None) -> float:
+    """Alternative to estimate_complete_compute_cost driven by replayed instance-hours.
+
+    Expects metrics['hourly_demand'] as produced by
+    load_profile_model.simulate_hourly_demand. The per-service replay
+    summary is stored in metrics['autoscaling'].
+    """
+    demand = metrics['hourly_demand']
+    policies = policies or default_policies(metrics.get('autoscaling_policies'))
+    replay = replay_autoscaling(demand['ops'] / 3600, policies, demand['services'])
+
+    months = demand['ops'].shape[1] / HOURS_PER_MONTH
+    total_cost = 0
+    summary = {}
+    for i, service in enumerate(demand['services']):
+        spec = GALAXY_SERVICES[service.lower()]
+        hourly_rate = (spec['cpu_per_instance'] * pricing['compute']['vcpu_hour'] +
+                       spec['memory_per_instance'] * pricing['compute']['memory_gb_hour'])
+        monthly_instance_hours = replay['instance_hours'][i] / months
+        service_cost = monthly_instance_hours * hourly_rate
+        total_cost += service_cost
+
+        summary[service.lower()] = {
+            'monthly_instance_hours': float(monthly_instance_hours),
+            'fixed_instance_hours': spec['instances'] * HOURS_PER_MONTH,
+            'peak_replicas': int(replay['replicas'][i].max()),
+            'scale_events': int(replay['scale_events'][i]),
+            'saturated_hours': int(replay['saturated_hours'][i]),
+            'avg_utilization': float(replay['avg_utilization'][i]),
+            'monthly_cost': float(service_cost),
+        }
+
+    # Add load balancers (2 per API gateway service)
+    lb_count = sum(2 for s in GALAXY_SERVICES.values() if s.get('api_gateway'))
+    total_cost += lb_count * pricing['compute']['load_balancer']
+
+    # Container orchestration overhead (15% for Kubernetes)
+    total_cost *= 1.15
+
+    metrics['autoscaling'] = summary
+    return apply_architecture_multiplier(total_cost, variant)
+
+def main():
+    """Main function for autoscaling replay"""
+    parser = argparse.ArgumentParser(description='Galaxy Platform Autoscaling Replay')
+    parser.add_argument('--retail', type=int, default=1000000, help='Number of retail customers')
+    parser.add_argument('--sme', type=int, default=100000, help='Number of SME customers')
+    parser.add_argument('--corporate', type=int, default=10000, help='Number of corporate customers')
+    parser.add_argument('--multiplier', type=float, default=1.0, help='Volume multiplier for all operations')
+    parser.add_argument('--provider', choices=['aws', 'gcp', 'azure', 'generic'], default='generic',
+                       help='Cloud provider for pricing')
+    parser.add_argument('--architecture', default='single_region_3az', help='Architecture variant')
+    parser.add_argument('--target-utilization', type=float, help='Override target utilisation for all services')
+    parser.add_argument('--scale-down-cooldown', type=int, help='Override scale-down cooldown (hours)')
+
+    args = parser.parse_args()
+
+    from galaxy_cloud_calculator import load_cloud_pricing
+    from load_profile_model import simulate_hourly_demand
+    from galaxy_complete_cost_model import estimate_complete_compute_cost
+    from utils import format_cost
+
+    overrides = {'default': {}}
+    if args.target_utilization is not None:
+        overrides['default']['target_utilization'] = args.target_utilization
+    if args.scale_down_cooldown is not None:
+        overrides['default']['scale_down_cooldown_hours'] = args.scale_down_cooldown
+
+    pricing = load_cloud_pricing(args.provider)
+    metrics = {
+        'customer_count': args.retail + args.sme + args.corporate,
+        'hourly_demand': simulate_hourly_demand(args.retail, args.sme, args.corporate, args.multiplier),
+        'autoscaling_policies': overrides,
+    }
+    autoscaled = estimate_autoscaled_compute_cost(metrics, pricing, args.architecture)
+    fixed = estimate_complete_compute_cost(metrics, pricing, args.architecture)
+
+    print("\n" + "="*90)
+    print("GALAXY PLATFORM - AUTOSCALING REPLAY")
+    print("="*90)
+    print(f"{'Service':<12} {'Inst-Hrs/Mo':>12} {'Fixed Hrs':>10} {'Peak Rep':>9} {'Events':>8} "
+          f"{'Saturated':>10} {'Avg Util':>9} {'Cost/Mo':>12}")
+    print("-"*90)
+    for service, data in sorted(metrics['autoscaling'].items(), key=lambda x: x[1]['monthly_cost'], reverse=True):
+        print(f"{service:<12} {data['monthly_instance_hours']:>12,.0f} {data['fixed_instance_hours']:>10,} "
+              f"{data['peak_replicas']:>9} {data['scale_events']:>8} {data['saturated_hours']:>10} "
+              f"{data['avg_utilization'] * 100:>8.1f}% {format_cost(data['monthly_cost']):>12}")
+    print("-"*90)
+    print(f"{'Autoscaled compute (monthly)':.<40} {format_cost(autoscaled):>15}")
+    print(f"{'Fixed-fleet compute (monthly)':.<40} {format_cost(fixed):>15}")
+    print("="*90)
+    return 0
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Batch scenario runner for Galaxy Platform
+Reads scenarios from CSV or JSONL, evaluates them in chunks across a process
+pool and streams results out in input order with bounded memory
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO
+
+from galaxy_cloud_calculator import (
+    CLOUD_COMPONENTS,
+    calculate_complete_galaxy_metrics,
+    calculate_segment_metrics,
+    calculate_with_cloud_pricing,
+    load_cloud_pricing
+)
+from memory_tracer import peak_rss_bytes
+
+# Scenario inputs carried into result rows and stored scenario inputs; anything that changes the price belongs here
+INPUT_FIELDS = ['provider', 'region', 'architecture', 'retail', 'sme', 'corporate', 'volume_multiplier',
+                'include_nonprod', 'backup_retention_days', 'log_retention_days']
+RESULT_FIELDS = ['index', 'id', 'provider', 'architecture', 'retail', 'sme', 'corporate', 'volume_multiplier',
+                 'include_nonprod', 'customer_count', 'total_monthly', 'total_annual', 'cost_per_customer']
+COMPONENT_FIELDS = list(CLOUD_COMPONENTS) + ['non_production']
+
+INT_FIELDS = {'retail', 'sme', 'corporate', 'customer_count', 'backup_retention_days', 'log_retention_days'}
+FLOAT_FIELDS = {'volume_multiplier'}
+BOOL_FIELDS = {'include_nonprod'}
+
+# Per-worker pricing, loaded once per provider/region
+_PRICING: Dict = {}
+
+def read_scenarios(source: TextIO, fmt: str) -> Iterator[Dict[str, Any]]:
+    """Yield raw scenarios from a CSV or JSONL stream, one at a time.
+
+    JSONL lines are yielded unparsed so a malformed line fails as its own
+    scenario in a worker instead of aborting the run.
+    """
+    if fmt == 'csv':
+        for row in csv.DictReader(source):
+            yield {k.strip(): v.strip() for k, v in row.items() if k and v not in (None, '')}
+    else:
+        for line in source:
+            if line.strip():
+                yield line
+
+def normalize_scenario(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """Coerce CSV strings to typed values and fill defaults.
+
+    A scenario is either segment-based (retail / sme / corporate, priced like
+    /api/calculate-segment) or a galaxy_cloud_calculator config with a
+    customer_count.
+    """
+    scenario = {}
+    for key, value in raw.items():
+        if key in INT_FIELDS:
+            value = int(float(value))
+        elif key in FLOAT_FIELDS:
+            value = float(value)
+        elif key in BOOL_FIELDS and isinstance(value, str):
+            value = value.lower() in ('1', 'true', 'yes', 'y')
+        scenario[key] = value
+
+    scenario.setdefault('provider', 'gcp')
+    scenario.setdefault('architecture', scenario.pop('architecture_variant', 'single_region_3az'))
+    scenario.setdefault('include_nonprod', True)
+    if 'customer_count' not in scenario or any(s in scenario for s in ('retail', 'sme', 'corporate')):
+        for segment, default in (('retail', 1000000), ('sme', 100000), ('corporate', 10000)):
+            scenario.setdefault(segment, default)
+        scenario.setdefault('volume_multiplier', 1.0)
+    return scenario
+
+def _pricing(provider: str, region: Optional[str]) -> Dict:
+    key = (provider, region)
+    if key not in _PRICING:
+        _PRICING[key] = load_cloud_pricing(provider, region)
+    return _PRICING[key]
+
+def evaluate_scenario(scenario: Dict[str, Any]) -> Dict[str, Any]:
+    """Price one normalised scenario"""
+    if 'retail' in scenario:
+        metrics, _ = calculate_segment_metrics(scenario['retail'], scenario['sme'], scenario['corporate'],
+                                               scenario['architecture'], scenario['include_nonprod'],
+                                               scenario['volume_multiplier'])
+    else:
+        metrics = calculate_complete_galaxy_metrics({
+            'customer_count': scenario['customer_count'],
+            'architecture_variant': scenario['architecture'],
+            'backup_retention_days': scenario.get('backup_retention_days', 30),
+            'log_retention_days': scenario.get('log_retention_days', 90),
+        })
+        metrics['include_nonprod'] = scenario['include_nonprod']
+
+    costs = calculate_with_cloud_pricing(metrics, _pricing(scenario['provider'], scenario.get('region')))
+    return {
+        'customer_count': metrics['customer_count'],
+        'total_monthly': costs['total_monthly'],
+        'total_annual': costs['total_annual'],
+        'cost_per_customer': costs['cost_per_customer'],
+        'components': costs['components'],
+    }
+
+def evaluate_chunk(chunk: List[Any]) -> List[Dict[str, Any]]:
+    """Evaluate (index, raw scenario) pairs; failures are returned per scenario, not raised"""
+    results = []
+    for index, raw in chunk:
+        result = {'index': index, 'id': index}
+        try:
+            if isinstance(raw, str):
+                raw = json.loads(raw)
+            if not isinstance(raw, dict):
+                raise ValueError(f"Scenario must be an object, got {type(raw).__name__}")
+            result['id'] = raw.get('id', index)
+            scenario = normalize_scenario(raw)
+            result.update({k: scenario.get(k) for k in INPUT_FIELDS})
+            result.update(evaluate_scenario(scenario))
+        except Exception as e:
+            result['error'] = f"{type(e).__name__}: {e}"
+        results.append(result)
+    return results
+
+def _chunks(scenarios: Iterable[Dict], chunk_size: int) -> Iterator[List]:
+    chunk = []
+    for index, scenario in enumerate(scenarios):
+        chunk.append((index, scenario))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def run_batch(scenarios: Iterable[Dict], workers: int = 4, chunk_size: int = 100,
+              max_pending: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """Yield results in input order.
+
+    At most max_pending chunks (default 2 per worker) are in flight, so memory
+    is bounded by chunk_size x max_pending whatever the input size. With
+    workers=0 scenarios are evaluated in this process.
+    """
+    if workers <= 0:
+        for chunk in _chunks(scenarios, chunk_size):
+            yield from evaluate_chunk(chunk)
+        return
+
+    max_pending = max_pending or workers * 2
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in _chunks(scenarios, chunk_size):
+            pending.append(pool.submit(evaluate_chunk, chunk))
+            if len(pending) >= max_pending:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+class ResultWriter:
+    """Streams results as JSONL or flattened CSV"""
+
+    def __init__(self, output: TextIO, fmt: str):
+        self.output = output
+        self.fmt = fmt
+        if fmt == 'csv':
+            self.writer = csv.DictWriter(output, RESULT_FIELDS + COMPONENT_FIELDS + ['error'], extrasaction='ignore')
+            self.writer.writeheader()
+
+    def write(self, result: Dict[str, Any]):
+        if self.fmt == 'csv':
+            self.writer.writerow({**result, **result.get('components', {})})
+        else:
+            self.output.write(json.dumps(result) + '\n')
+
+def _detect_format(path: str, fmt: Optional[str]) -> str:
+    if fmt:
+        return fmt
+    return 'csv' if path.lower().endswith('.csv') else 'jsonl'
+
+def _store_record(result: Dict[str, Any]) -> Dict[str, Any]:
+    from scenario_store import scenario_record
+    inputs = {k: result[k] for k in INPUT_FIELDS + ['customer_count'] if result.get(k) is not None}
+    pricing = _pricing(result['provider'], result.get('region'))
+    return scenario_record(inputs, result['components'], result['total_monthly'], 'batch', pricing)
+
+def main(argv=None):
+    """Main function for the batch scenario runner"""
+    parser = argparse.ArgumentParser(description='Galaxy Platform Batch Scenario Runner')
+    parser.add_argument('input', help='Scenario file (.csv or .jsonl), or - for stdin')
+    parser.add_argument('-o', '--output', default='-', help='Result file (.csv or .jsonl), default stdout')
+    parser.add_argument('--input-format', choices=['csv', 'jsonl'], help='Override input format detection')
+    parser.add_argument('--output-format', choices=['csv', 'jsonl'], help='Override output format detection')
+    parser.add_argument('--workers', type=int, default=4, help='Worker processes (0 = run in this process)')
+    parser.add_argument('--chunk-size', type=int, default=100, help='Scenarios per worker task')
+    parser.add_argument('--store', help='Also bulk-save results to this scenario store (scenario_store.py)')
+    parser.add_argument('--max-errors', type=int, default=20, help='Failures to list in the summary')
+
+    args = parser.parse_args(argv)
+
+    in_fmt = _detect_format(args.input, args.input_format)
+    out_fmt = _detect_format(args.output, args.output_format)
+    source = sys.stdin if args.input == '-' else open(args.input, newline='')
+    output = sys.stdout if args.output == '-' else open(args.output, 'w', newline='')
+
+    store = None
+    if args.store:
+        from scenario_store import ScenarioStore
+        store = ScenarioStore(args.store)
+
+    writer = ResultWriter(output, out_fmt)
+    processed, failures, records = 0, [], []
+    start = time.perf_counter()
+    try:
+        for result in run_batch(read_scenarios(source, in_fmt), args.workers, args.chunk_size):
+            writer.write(result)
+            processed += 1
+            if 'error' in result:
+                failures.append(result)
+            elif store:
+                records.append(_store_record(result))
+                if len(records) >= 1000:
+                    store.save_many(records)
+                    records = []
+        if store and records:
+            store.save_many(records)
+    except KeyboardInterrupt:
+        print("\nInterrupted", file=sys.stderr)
+    finally:
+        elapsed = time.perf_counter() - start
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+        if store:
+            store.close()
+
+    print(f"\nProcessed {processed:,} scenarios in {elapsed:.2f}s "
+          f"({processed / elapsed if elapsed > 0 else 0:,.1f}/s), {len(failures):,} failed", file=sys.stderr)
+    peak, worker_peak = peak_rss_bytes(), peak_rss_bytes(children=True)
+    if peak is not None:
+        print(f"Peak RSS {peak / 1048576:,.1f}MB" + (f", largest worker {worker_peak / 1048576:,.1f}MB"
+                                                      if args.workers > 0 and worker_peak else ''), file=sys.stderr)
+    for failure in failures[:args.max_errors]:
+        print(f"  #{failure['index']} ({failure['id']}): {failure['error']}", file=sys.stderr)
+    if len(failures) > args.max_errors:
+        print(f"  ... and {len(failures) - args.max_errors:,} more", file=sys.stderr)
+
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Calculation benchmark suite for Galaxy Platform
+Times the core calculators, pricing load, growth sweeps, batch runs and the
+main API routes on fixed scenario sets, appends every run to a JSON history
+and fails when latency or throughput regresses past a threshold against a
+stored baseline
+"""
+
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = ROOT / 'benchmarks' / 'results'
+HISTORY_FILE = RESULTS_DIR / 'history.jsonl'
+BASELINE_FILE = RESULTS_DIR / 'baseline.json'
+
+# Allowed slowdown of the median latency and drop in throughput versus the baseline
+LATENCY_THRESHOLD = 0.25
+THROUGHPUT_THRESHOLD = 0.20
+
+# Fixed scenario sets: (retail, sme, corporate)
+SEGMENT_MIXES = {
+    'small': (10000, 1000, 100),
+    'medium': (100000, 10000, 1000),
+    '1m': (1000000, 100000, 10000),
+}
+PROVIDERS = ['aws', 'gcp', 'azure']
+ARCHITECTURES = ['single_region_3az', 'multi_region_active_passive']
+GROWTH_SWEEP = [10000 * 2 ** i for i in range(10)]
+BATCH_SWEEP = [
+    {'retail': retail, 'sme': retail // 10, 'corporate': retail // 100, 'provider': provider,
+     'architecture': architecture}
+    for retail in (10000, 50000, 100000, 250000, 500000, 1000000, 2000000, 5000000)
+    for provider in PROVIDERS
+    for architecture in ARCHITECTURES
+]
+
+# name -> (setup returning the timed callable, work items per call)
+Case = Tuple[Callable[[], Callable[[], object]], int]
+
+def _calculator_cases() -> Dict[str, Case]:
+    from galaxy_cloud_calculator import calculate_segment_metrics, calculate_with_cloud_pricing, load_cloud_pricing
+    from galaxy_complete_cost_model import calculate_complete_galaxy_metrics
+    from segment_operations_model import calculate_total_volumes
+
+    cases: Dict[str, Case] = {}
+    for mix, (retail, sme, corporate) in SEGMENT_MIXES.items():
+        cases[f'total_volumes:{mix}'] = (
+            lambda r=retail, s=sme, c=corporate: lambda: calculate_total_volumes(r, s, c), 1)
+        cases[f'complete_metrics:{mix}'] = (
+            lambda n=retail + sme + corporate: lambda: calculate_complete_galaxy_metrics({
+                'customer_count': n, 'architecture_variant': 'single_region_3az'}), 1)
+
+        def pricing_setup(r=retail, s=sme, c=corporate):
+            metrics, _ = calculate_segment_metrics(r, s, c)
+            pricing = load_cloud_pricing('gcp')
+            return lambda: calculate_with_cloud_pricing(metrics, pricing)
+        cases[f'cloud_pricing:{mix}'] = (pricing_setup, 1)
+
+    def compare_setup():
+        pricing = {provider: load_cloud_pricing(provider) for provider in PROVIDERS}
+
+        def compare():
+            metrics, _ = calculate_segment_metrics(*SEGMENT_MIXES['1m'])
+            return {p: calculate_with_cloud_pricing(metrics, pricing[p]) for p in PROVIDERS}
+        return compare
+    cases['provider_comparison:1m'] = (compare_setup, len(PROVIDERS))
+    return cases
+
+def _pricing_cases() -> Dict[str, Case]:
+    import utils
+    from galaxy_cloud_calculator import load_cloud_pricing
+
+    def cold_setup():
+        def cold():
+            utils._YAML_CACHE.clear()
+            return load_cloud_pricing('gcp')
+        return cold
+    return {
+        'load_pricing:cold': (cold_setup, 1),
+        'load_pricing:warm': (lambda: lambda: load_cloud_pricing('gcp'), 1),
+    }
+
+def _growth_cases() -> Dict[str, Case]:
+    from growth_projection_model import calculate_costs_at_scale
+
+    def sweep_setup():
+        return lambda: [calculate_costs_at_scale(n, include_details=True) for n in GROWTH_SWEEP]
+    return {'costs_at_scale:sweep': (sweep_setup, len(GROWTH_SWEEP))}
+
+def _batch_cases() -> Dict[str, Case]:
+    from batch_runner import run_batch
+
+    def batch_setup():
+        return lambda: list(run_batch(BATCH_SWEEP, workers=0))
+    return {'batch:sweep': (batch_setup, len(BATCH_SWEEP))}
+
+def _route_cases(scratch: str) -> Dict[str, Case]:
+    import api_server_v2
+
+    # Keep benchmark scenarios out of the real scenario store
+    api_server_v2.SCENARIO_DB = Path(scratch) / 'scenarios.db'
+    client = api_server_v2.app.test_client()
+
+    def route(method: str, path: str, payload: Optional[Dict] = None):
+        def setup():
+            def call():
+                response = client.open(path, method=method, json=payload)
+                if response.status_code != 200:
+                    raise RuntimeError(f"{method} {path} returned {response.status_code}")
+                return response.close()
+            return call
+        return setup, 1
+
+    retail, sme, corporate = SEGMENT_MIXES['1m']
+    segment = {'retail': retail, 'sme': sme, 'corporate': corporate, 'provider': 'gcp', 'useCache': False}
+    return {
+        'route:health': route('GET', '/api/health'),
+        'route:operations': route('GET', '/api/operations'),
+        'route:services': route('GET', '/api/services/status'),
+        'route:calculate_segment': route('POST', '/api/calculate-segment', segment),
+        'route:calculate_segment_cached': route('POST', '/api/calculate-segment', {**segment, 'useCache': True}),
+        'route:compare_segment': route('POST', '/api/compare-segment', segment),
+    }
+
+def all_cases(scratch: str) -> Dict[str, Case]:
+    cases = {}
+    for group in (_calculator_cases, _pricing_cases, _growth_cases, _batch_cases):
+        cases.update(group())
+    cases.update(_route_cases(scratch))
+    return cases
+
+def time_case(func: Callable[[], object], items: int, min_time: float = 0.5,
+              min_runs: int = 5, max_runs: int = 100000) -> Dict:
+    """Call func repeatedly for at least min_time seconds after one warm-up call"""
+    func()
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < min_runs or (time.perf_counter() - started < min_time and len(samples) < max_runs):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    mean = statistics.fmean(samples)
+    return {
+        'runs': len(samples),
+        'median_ms': round(statistics.median(samples) * 1000, 4),
+        'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 4),
+        'min_ms': round(samples[0] * 1000, 4),
+        'throughput_per_s': round(items / mean, 2) if mean > 0 else None,
+    }
+
+def run_suite(patterns: List[str], min_time: float, verbose: bool = False) -> Dict[str, Dict]:
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='galaxy-bench-') as scratch:
+        for name, (setup, items) in all_cases(scratch).items():
+            if patterns and not any(fnmatch.fnmatch(name, p) for p in patterns):
+                continue
+            results[name] = time_case(setup(), items, min_time)
+            if verbose:
+                print(f"  {name}: {results[name]['median_ms']:.3f}ms", file=sys.stderr)
+    return results
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict],
+            latency_threshold: float = LATENCY_THRESHOLD,
+            throughput_threshold: float = THROUGHPUT_THRESHOLD) -> Dict[str, Dict]:
+    """Per case: change versus the baseline and whether it is a regression"""
+    comparison = {}
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        latency = result['median_ms'] / base['median_ms'] - 1 if base['median_ms'] else 0.0
+        throughput = (result['throughput_per_s'] / base['throughput_per_s'] - 1
+                      if base.get('throughput_per_s') and result['throughput_per_s'] else 0.0)
+        comparison[name] = {
+            'latency_change': round(latency, 4),
+            'throughput_change': round(throughput, 4),
+            'regressed': latency > latency_threshold or throughput < -throughput_threshold,
+        }
+    return comparison
+
+def _commit() -> Optional[str]:
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, timeout=10)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return result.stdout.strip() or None
+
+def record_run(results: Dict[str, Dict], comparison: Dict[str, Dict]) -> Dict:
+    record = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': _commit(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': results,
+        'comparison': comparison,
+    }
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    with open(HISTORY_FILE, 'a') as f:
+        f.write(json.dumps(record) + '\n')
+    return record
+
+def main():
+    """Main function for the calculation benchmark suite"""
+    parser = argparse.ArgumentParser(description='Galaxy Platform Calculation Benchmarks')
+    parser.add_argument('cases', nargs='*', help='Case name patterns, e.g. "route:*" (default: all)')
+    parser.add_argument('--min-time', type=float, default=0.5, help='Seconds to time each case for')
+    parser.add_argument('--baseline', default=str(BASELINE_FILE), help='Baseline results file')
+    parser.add_argument('--save-baseline', action='store_true', help='Store this run as the baseline')
+    parser.add_argument('--latency-threshold', type=float, default=LATENCY_THRESHOLD,
+                        help='Allowed median latency increase, as a fraction')
+    parser.add_argument('--throughput-threshold', type=float, default=THROUGHPUT_THRESHOLD,
+                        help='Allowed throughput decrease, as a fraction')
+    parser.add_argument('--no-history', action='store_true', help=f'Do not append to {HISTORY_FILE.name}')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Report progress on stderr')
+
+    args = parser.parse_args()
+
+    # Models resolve pricing and configuration files relative to the repository root
+    os.chdir(ROOT)
+    sys.path.insert(0, str(ROOT))
+
+    results = run_suite(args.cases, args.min_time, args.verbose)
+    if not results:
+        print("No benchmark cases matched", file=sys.stderr)
+        return 2
+
+    baseline_path = Path(args.baseline)
+    baseline = json.loads(baseline_path.read_text())['results'] if baseline_path.exists() else {}
+    comparison = compare(results, baseline, args.latency_threshold, args.throughput_threshold)
+    record = (record_run(results, comparison) if not args.no_history
+              else {'results': results, 'comparison': comparison})
+
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(
+            {k: record.get(k) for k in ('timestamp', 'commit', 'python', 'machine', 'results')}, indent=2))
+
+    if args.json:
+        print(json.dumps(record, indent=2))
+    else:
+        print(f"{'Case':<34} {'Median':>11} {'p95':>11} {'Throughput':>12} {'Runs':>6}  vs baseline")
+        for name, r in results.items():
+            change = comparison.get(name)
+            versus = (f"{change['latency_change']:+.1%} latency, {change['throughput_change']:+.1%} throughput"
+                      + ('  FAIL' if change['regressed'] else '')) if change else '-'
+            print(f"{name:<34} {r['median_ms']:>9.3f}ms {r['p95_ms']:>9.3f}ms {r['throughput_per_s']:>10.1f}/s "
+                  f"{r['runs']:>6}  {versus}")
+
+    failed = [name for name, change in comparison.items() if change['regressed']]
+    if failed and not args.save_baseline:
+        print(f"\nPerformance regression in: {', '.join(failed)}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark for Galaxy Platform entry points
+Imports each entry point in a fresh interpreter under -X importtime, reports
+the median cumulative import time and fails when an entry point exceeds its
+budget or pulls in a heavy dependency it should only load on first use
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Median cumulative import time allowed per entry point, in milliseconds
+BUDGETS_MS = {
+    'galaxy_cloud_calculator': 80,
+    'galaxy_complete_cost_model': 60,
+    'galaxy_cost_model': 60,
+    'cost_model': 60,
+    'batch_runner': 100,
+    'report_pipeline': 100,
+    'api_server_v2': 400,
+}
+
+# Loaded only when a chart is drawn, a surface is built or a database is inspected
+HEAVY_MODULES = ['matplotlib', 'numpy', 'pandas', 'psycopg2']
+
+def measure(module: str) -> Dict:
+    """One fresh-interpreter import: cumulative microseconds per imported module"""
+    code = f"import {module}"
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT,
+                            capture_output=True, text=True)
+    if result.returncode:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr.strip()[-2000:]}")
+
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cum, name = line.split('|')
+        cumulative[name.strip()] = int(cum)
+    return cumulative
+
+def benchmark(modules: List[str], runs: int = 5) -> List[Dict]:
+    results = []
+    for module in modules:
+        samples, loaded = [], set()
+        for _ in range(runs):
+            cumulative = measure(module)
+            samples.append(cumulative.get(module, 0) / 1000)
+            loaded |= {name.split('.')[0] for name in cumulative}
+        median = statistics.median(samples)
+        budget = BUDGETS_MS.get(module)
+        heavy = sorted(m for m in HEAVY_MODULES if m in loaded)
+        results.append({
+            'module': module,
+            'median_ms': round(median, 1),
+            'min_ms': round(min(samples), 1),
+            'budget_ms': budget,
+            'heavy_imports': heavy,
+            'ok': (budget is None or median <= budget) and not heavy,
+        })
+    return results
+
+def main():
+    """Main function for the import-time benchmark"""
+    parser = argparse.ArgumentParser(description='Galaxy Platform Import-Time Benchmark')
+    parser.add_argument('modules', nargs='*', help='Entry points to measure (default: all budgeted)')
+    parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters per entry point')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+
+    args = parser.parse_args()
+
+    results = benchmark(args.modules or list(BUDGETS_MS), args.runs)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'Entry point':<30} {'Median':>9} {'Min':>9} {'Budget':>9}  Heavy imports")
+        for r in results:
+            budget = f"{r['budget_ms']}ms" if r['budget_ms'] is not None else '-'
+            status = '' if r['ok'] else '  FAIL'
+            print(f"{r['module']:<30} {r['median_ms']:>7.1f}ms {r['min_ms']:>7.1f}ms {budget:>9}  "
+                  f"{', '.join(r['heavy_imports']) or '-'}{status}")
+
+    failed = [r['module'] for r in results if not r['ok']]
+    if failed:
+        print(f"\nImport-time regression in: {', '.join(failed)}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
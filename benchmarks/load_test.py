@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+HTTP load test for the Galaxy API server
+Starts api_server_v2 locally (with a throwaway scenario store) and stub
+services on the health-check ports. It replays the dashboard's weighted
+request mix at fixed open-loop rates and reports latency percentiles, error
+rates, server CPU / RSS and the highest rate the server sustains, as a JSON
+report that can be compared against an earlier one.
+
+Requests are sent on schedule whether or not earlier ones have completed, and
+latency is measured from the scheduled send time, so a server that falls
+behind shows up as queueing latency rather than a lower request rate.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = ROOT / 'benchmarks' / 'results'
+
+DEFAULT_PORT = 5091
+DEFAULT_RATES = [10, 25, 50, 100]
+DEFAULT_DURATION_SECONDS = 15
+REQUEST_TIMEOUT_SECONDS = 10
+
+# A rate is sustained when the server keeps up and stays within these limits
+SLO_P99_MS = 500
+MAX_ERROR_RATE = 0.01
+MIN_ACHIEVED_FRACTION = 0.95
+
+# Health-check targets stood in for by stub services (ports from galaxy_services_ports.json)
+STUB_SERVICES = ['titan', 'orion', 'proxima']
+
+SEGMENT_MIXES = [
+    {'retail': 10000, 'sme': 1000, 'corporate': 100},
+    {'retail': 100000, 'sme': 10000, 'corporate': 1000},
+    {'retail': 1000000, 'sme': 100000, 'corporate': 10000},
+    {'retail': 2500000, 'sme': 150000, 'corporate': 12000},
+]
+
+# Dashboard traffic: name -> (weight, method, path)
+REQUEST_MIX = {
+    'calculate_segment': (30, 'POST', '/api/calculate-segment'),
+    'compare_segment': (10, 'POST', '/api/compare-segment'),
+    'services': (15, 'GET', '/api/services'),
+    'services_status': (10, 'GET', '/api/services/status'),
+    'operations': (10, 'GET', '/api/operations'),
+    'health': (10, 'GET', '/api/health'),
+    'service_health': (15, 'GET', '/api/services/health/{service}'),
+}
+
+def build_request(name: str, rng: random.Random) -> Tuple[str, str, Optional[bytes]]:
+    """(method, path, JSON body) for one request of the named kind"""
+    _, method, path = REQUEST_MIX[name]
+    if name == 'service_health':
+        return method, path.format(service=rng.choice(STUB_SERVICES).title()), None
+    if method == 'POST':
+        payload = {**rng.choice(SEGMENT_MIXES), 'provider': rng.choice(['aws', 'gcp', 'azure'])}
+        return method, path, json.dumps(payload).encode('utf-8')
+    return method, path, None
+
+# Stub services
+
+class _StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = json.dumps({'status': 'UP', 'service': self.server.service}).encode('utf-8')
+        self.send_response(200 if self.path.startswith('/health') else 404)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_stub_services(services: List[str]) -> List[ThreadingHTTPServer]:
+    """Answer /health on each service's configured port; ports already in use are left alone"""
+    ports = json.loads((ROOT / 'galaxy_services_ports.json').read_text())['services']
+    servers = []
+    for service in services:
+        port = ports[service]['port']
+        try:
+            server = ThreadingHTTPServer(('localhost', port), _StubHandler)
+        except OSError as e:
+            print(f"Stub {service} not started on port {port}: {e}", file=sys.stderr)
+            continue
+        server.service = service
+        threading.Thread(target=server.serve_forever, daemon=True, name=f'stub-{service}').start()
+        servers.append(server)
+    return servers
+
+# Server under test
+
+def serve(port: int, scenario_db: str):
+    """Run api_server_v2 on Werkzeug's threaded server, as app.run does in production mode"""
+    from werkzeug.serving import make_server
+
+    os.chdir(ROOT)
+    sys.path.insert(0, str(ROOT))
+    import api_server_v2
+
+    api_server_v2.SCENARIO_DB = Path(scenario_db)
+    server = make_server('127.0.0.1', port, api_server_v2.app, threaded=True)
+    print(f"Load test server on port {port} (pid {os.getpid()})", flush=True)
+    server.serve_forever()
+
+def start_server(port: int, scenario_db: str, log_path: str) -> subprocess.Popen:
+    # Werkzeug logs every request to stderr; an undrained pipe would fill and stall the server
+    with open(log_path, 'w') as log:
+        process = subprocess.Popen([sys.executable, __file__, 'serve', '--port', str(port), '--scenario-db', scenario_db],
+                                   cwd=ROOT, stdout=subprocess.DEVNULL, stderr=log, text=True)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"API server exited during start-up:\n{Path(log_path).read_text()[-2000:]}")
+        try:
+            if send('127.0.0.1', port, 'GET', '/api/health', None, 1)[0] == 200:
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"API server did not answer on port {port} within 60s")
+
+class ProcessSampler:
+    """Samples a process's CPU use and resident memory from /proc while active (Linux only)"""
+
+    def __init__(self, pid: int, interval: float = 0.5):
+        self.pid = pid
+        self.interval = interval
+        self.rss: List[int] = []
+        self.cpu_seconds: Optional[float] = None
+        self.wall_seconds = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _cpu(self) -> Optional[float]:
+        try:
+            fields = Path(f'/proc/{self.pid}/stat').read_text().rsplit(')', 1)[1].split()
+        except OSError:
+            return None
+        # utime and stime, fields 14 and 15 of stat
+        return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+
+    def _rss_kb(self) -> Optional[int]:
+        try:
+            for line in Path(f'/proc/{self.pid}/status').read_text().splitlines():
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+        except OSError:
+            pass
+        return None
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            rss = self._rss_kb()
+            if rss is not None:
+                self.rss.append(rss)
+
+    def __enter__(self):
+        self._cpu_start, self._wall_start = self._cpu(), time.monotonic()
+        self._thread = threading.Thread(target=self._sample, daemon=True, name='proc-sampler')
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        cpu_end = self._cpu()
+        self.wall_seconds = time.monotonic() - self._wall_start
+        if cpu_end is not None and self._cpu_start is not None:
+            self.cpu_seconds = cpu_end - self._cpu_start
+
+    def summary(self) -> Dict:
+        return {
+            'cpu_percent': (round(100 * self.cpu_seconds / self.wall_seconds, 1)
+                            if self.cpu_seconds is not None and self.wall_seconds else None),
+            'rss_mb': round(statistics.median(self.rss) / 1024, 1) if self.rss else None,
+            'peak_rss_mb': round(max(self.rss) / 1024, 1) if self.rss else None,
+        }
+
+# Load generation
+
+def send(host: str, port: int, method: str, path: str, body: Optional[bytes],
+         timeout: float = REQUEST_TIMEOUT_SECONDS) -> Tuple[int, int]:
+    """One request on a fresh connection; returns (status, response bytes)"""
+    connection = http.client.HTTPConnection(host, port, timeout=timeout)
+    try:
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        connection.request(method, path, body=body, headers=headers)
+        response = connection.getresponse()
+        return response.status, len(response.read())
+    finally:
+        connection.close()
+
+def _percentiles(latencies: List[float]) -> Dict[str, Optional[float]]:
+    if not latencies:
+        return {'p50': None, 'p90': None, 'p99': None, 'max': None}
+    ordered = sorted(latencies)
+
+    def pick(q):
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 2)
+    return {'p50': pick(0.50), 'p90': pick(0.90), 'p99': pick(0.99), 'max': round(ordered[-1] * 1000, 2)}
+
+def run_step(host: str, port: int, rate: float, duration: float, rng: random.Random,
+             pid: Optional[int] = None, max_concurrency: int = 256) -> Dict:
+    """Send requests at a fixed rate for duration seconds and summarise them"""
+    names = list(REQUEST_MIX)
+    weights = [REQUEST_MIX[name][0] for name in names]
+    total = int(rate * duration)
+    schedule = [(i / rate, name, *build_request(name, rng))
+                for i, name in enumerate(rng.choices(names, weights, k=total))]
+    records: List[Tuple[str, float, bool]] = []
+    lock = threading.Lock()
+
+    def fire(scheduled_at: float, name: str, method: str, path: str, body: Optional[bytes]):
+        try:
+            failed = send(host, port, method, path, body)[0] >= 400
+        except (OSError, http.client.HTTPException):
+            failed = True
+        latency = time.perf_counter() - scheduled_at
+        with lock:
+            records.append((name, latency, failed))
+
+    sampler = ProcessSampler(pid) if pid else None
+    if sampler:
+        sampler.__enter__()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='load') as pool:
+        for offset, name, method, path, body in schedule:
+            delay = start + offset - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(fire, start + offset, name, method, path, body)
+    elapsed = time.perf_counter() - start
+    if sampler:
+        sampler.__exit__(None, None, None)
+
+    latencies = [latency for _, latency, _ in records]
+    errors = sum(failed for _, _, failed in records)
+    by_request = {}
+    for name in names:
+        own = [(latency, failed) for n, latency, failed in records if n == name]
+        if own:
+            by_request[name] = {'requests': len(own), 'errors': sum(f for _, f in own),
+                                **_percentiles([latency for latency, _ in own])}
+
+    step = {
+        'target_rps': rate,
+        'achieved_rps': round(len(records) / elapsed, 2) if elapsed else 0.0,
+        'requests': len(records),
+        'errors': errors,
+        'error_rate': round(errors / len(records), 4) if records else 0.0,
+        'latency_ms': _percentiles(latencies),
+        'by_request': by_request,
+        'server': sampler.summary() if sampler else None,
+    }
+    step['sustained'] = bool(records) and (step['achieved_rps'] >= MIN_ACHIEVED_FRACTION * rate and
+                                           step['error_rate'] <= MAX_ERROR_RATE and
+                                           step['latency_ms']['p99'] <= SLO_P99_MS)
+    return step
+
+def compare_reports(report: Dict, previous: Dict) -> List[str]:
+    """Lines describing how each rate step moved since the previous report"""
+    lines = []
+    earlier = {step['target_rps']: step for step in previous.get('steps', [])}
+    for step in report['steps']:
+        before = earlier.get(step['target_rps'])
+        if not before:
+            continue
+        changes = []
+        for q in ('p50', 'p99'):
+            now, then = step['latency_ms'][q], before['latency_ms'][q]
+            if now is not None and then:
+                changes.append(f"{q} {now:.1f}ms ({now / then - 1:+.1%})")
+        changes.append(f"errors {before['error_rate']:.2%} -> {step['error_rate']:.2%}")
+        lines.append(f"{step['target_rps']:>7g} rps: " + ', '.join(changes))
+    lines.append(f"max sustained: {previous.get('max_sustained_rps')} -> {report['max_sustained_rps']} rps")
+    return lines
+
+def run(args) -> int:
+    rates = [float(r) for r in args.rates.split(',')]
+    rng = random.Random(args.seed)
+    stubs = [] if args.no_stubs else start_stub_services(STUB_SERVICES)
+    process = None
+    with tempfile.TemporaryDirectory(prefix='galaxy-load-') as scratch:
+        try:
+            if args.url:
+                target = urlsplit(args.url)
+                host, port, pid = target.hostname, target.port or 80, args.pid
+            else:
+                process = start_server(args.port, os.path.join(scratch, 'scenarios.db'), os.path.join(scratch, 'server.log'))
+                host, port, pid = '127.0.0.1', args.port, process.pid
+
+            # Warm pricing, profiles and the scenario store before measuring
+            for name in REQUEST_MIX:
+                send(host, port, *build_request(name, rng))
+
+            steps = []
+            for rate in rates:
+                step = run_step(host, port, rate, args.duration, rng, pid, args.concurrency)
+                steps.append(step)
+                latency = step['latency_ms']
+                print(f"{rate:>7g} rps: achieved {step['achieved_rps']:.1f}, p50 {latency['p50']}ms, "
+                      f"p99 {latency['p99']}ms, errors {step['error_rate']:.2%}"
+                      + (f", server CPU {step['server']['cpu_percent']}% RSS {step['server']['rss_mb']}MB"
+                         if step['server'] else '')
+                      + ('' if step['sustained'] else '  (not sustained)'), file=sys.stderr)
+                if not step['sustained'] and args.stop_on_failure:
+                    break
+        finally:
+            if process:
+                process.terminate()
+                process.wait(10)
+            for stub in stubs:
+                stub.shutdown()
+
+    sustained = [step['target_rps'] for step in steps if step['sustained']]
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'target': args.url or f'api_server_v2 (local, port {args.port})',
+        'duration_seconds': args.duration,
+        'seed': args.seed,
+        'mix': {name: weight for name, (weight, _, _) in REQUEST_MIX.items()},
+        'slo': {'p99_ms': SLO_P99_MS, 'max_error_rate': MAX_ERROR_RATE,
+                'min_achieved_fraction': MIN_ACHIEVED_FRACTION},
+        'steps': steps,
+        'max_sustained_rps': max(sustained) if sustained else None,
+    }
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"load_{datetime.now():%Y%m%d_%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Max sustained rate: {report['max_sustained_rps'] or 'none'} rps; report written to {output}")
+
+    if args.compare:
+        for line in compare_reports(report, json.loads(Path(args.compare).read_text())):
+            print(line)
+    return 0
+
+def main():
+    """Main function for the API load test"""
+    parser = argparse.ArgumentParser(description='Galaxy Platform API Load Test')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='Run the load test')
+    run_parser.add_argument('--rates', default=','.join(str(r) for r in DEFAULT_RATES),
+                            help='Comma-separated request rates to step through, per second')
+    run_parser.add_argument('--duration', type=float, default=DEFAULT_DURATION_SECONDS,
+                            help='Seconds per rate step')
+    run_parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='Port for the local server')
+    run_parser.add_argument('--url', help='Test an already running server instead of starting one')
+    run_parser.add_argument('--pid', type=int, help='Process to sample CPU / RSS of, with --url')
+    run_parser.add_argument('--concurrency', type=int, default=256, help='Maximum requests in flight')
+    run_parser.add_argument('--seed', type=int, default=1, help='Random seed for the request mix')
+    run_parser.add_argument('--no-stubs', action='store_true', help='Do not start stub health-check services')
+    run_parser.add_argument('--stop-on-failure', action='store_true', help='Stop at the first unsustained rate')
+    run_parser.add_argument('-o', '--output', help='Report file (default: benchmarks/results/load_<time>.json)')
+    run_parser.add_argument('--compare', help='Earlier report to compare against')
+
+    serve_parser = subparsers.add_parser('serve', help='Run the API server under test (used by run)')
+    serve_parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument('--scenario-db', required=True)
+
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        serve(args.port, args.scenario_db)
+        return 0
+    return run(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Calculation daemon for Galaxy Platform
+Keeps the models, pricing and operation profiles loaded and serves CLI runs
+over a local Unix socket. Each run executes in a process forked from the warm
+daemon, so it skips interpreter start-up, imports and YAML parsing but cannot
+leak state into the next run. The CLIs forward to the daemon automatically
+when it is listening.
+
+This module is imported by the CLIs before anything else, so it only uses
+the standard library and keeps its own imports light.
+"""
+
+import hashlib
+import json
+import os
+import socket
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+CONFIG_DIR = Path(__file__).parent
+
+# Models the daemon will run; each has main(argv)
+MODULES = [
+    'galaxy_cloud_calculator',
+    'segment_operations_model',
+    'growth_projection_model',
+    'galaxy_complete_cost_model',
+    'galaxy_cost_model',
+    'cost_model',
+]
+
+# Set to 0 to make the CLIs always run in-process
+DISABLE_ENV = 'GALAXY_CALC_DAEMON'
+
+CONNECT_TIMEOUT_SECONDS = 0.5
+
+def socket_path() -> str:
+    """Per user and per checkout, so a CLI never reaches a daemon running another checkout's code"""
+    checkout = hashlib.sha256(str(CONFIG_DIR.resolve()).encode('utf-8')).hexdigest()[:12]
+    return os.environ.get('GALAXY_CALC_SOCKET', f"/tmp/galaxy-calc-{os.getuid()}-{checkout}.sock")
+
+def source_stamp() -> float:
+    """Latest modification time of the model sources; a running daemon is stale once it changes"""
+    return max(path.stat().st_mtime for path in CONFIG_DIR.glob('*.py'))
+
+# Client
+
+def _request(message: Dict[str, Any], path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Send one request; None when no daemon is listening"""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT_SECONDS)
+        sock.connect(path or socket_path())
+        sock.settimeout(None)
+        sock.sendall(json.dumps(message).encode('utf-8') + b'\n')
+        sock.shutdown(socket.SHUT_WR)
+        with sock.makefile('rb') as f:
+            line = f.readline()
+        return json.loads(line) if line else None
+    except OSError:
+        return None
+    finally:
+        sock.close()
+
+def run_remote(module: str, argv: List[str], path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Run module.main(argv) on the daemon from this working directory.
+
+    Returns {'code', 'stdout', 'stderr'}, or None if the daemon is not
+    running, serves another checkout, or its loaded code is older than the
+    sources.
+    """
+    response = _request({'command': 'run', 'module': module, 'argv': argv, 'cwd': os.getcwd(),
+                         'root': str(CONFIG_DIR.resolve())}, path)
+    if response is None or response.get('stale'):
+        return None
+    return response
+
+def forward_cli(module_file: str):
+    """Hand this CLI invocation to the daemon and exit with its status; returns if there is none"""
+    if os.environ.get(DISABLE_ENV) == '0':
+        return
+    response = run_remote(Path(module_file).stem, sys.argv[1:])
+    if response is None:
+        return
+    sys.stdout.write(response['stdout'])
+    sys.stderr.write(response['stderr'])
+    sys.exit(response['code'])
+
+# Server
+
+def preload():
+    """Import the models and parse pricing and configuration once, in the parent"""
+    import importlib
+    from utils import load_yaml
+
+    for module in MODULES + ['report_pipeline']:
+        importlib.import_module(module)
+    for path in CONFIG_DIR.glob('*.yaml'):
+        try:
+            load_yaml(path)
+        except Exception:
+            pass
+    from galaxy_cloud_calculator import load_cloud_pricing
+    for provider in ('aws', 'gcp', 'azure', 'generic'):
+        try:
+            load_cloud_pricing(provider)
+        except Exception:
+            pass
+
+def run_request(request: Dict[str, Any], stamp: float) -> Dict[str, Any]:
+    """Execute one run in this (forked) process"""
+    module = request.get('module')
+    if module not in MODULES:
+        return {'code': 2, 'stdout': '', 'stderr': f"calc_daemon: unknown module {module!r}\n"}
+    if request.get('root') != str(CONFIG_DIR.resolve()) or source_stamp() != stamp:
+        return {'stale': True}
+
+    from report_pipeline import run_model_main
+
+    os.chdir(request.get('cwd') or CONFIG_DIR)
+    sys.argv = [f"{module}.py"] + list(request.get('argv', []))
+    code, stdout, stderr = run_model_main(module, sys.argv[1:])
+    return {'code': code, 'stdout': stdout, 'stderr': stderr}
+
+def serve(path: Optional[str] = None):
+    """Listen on the Unix socket until stopped"""
+    import signal
+    import socketserver
+
+    path = path or socket_path()
+    if _request({'command': 'status'}, path) is not None:
+        print(f"A calculation daemon is already listening on {path}", file=sys.stderr)
+        return 1
+    if os.path.exists(path):
+        os.unlink(path)
+
+    start = time.perf_counter()
+    preload()
+    stamp = source_stamp()
+    started = time.time()
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            try:
+                request = json.loads(self.rfile.readline())
+                command = request.get('command', 'run')
+                if command == 'status':
+                    response = {'pid': os.getppid(), 'started': started, 'socket': path,
+                                'root': str(CONFIG_DIR.resolve()), 'modules': MODULES,
+                                'stale': source_stamp() != stamp}
+                elif command == 'stop':
+                    os.kill(os.getppid(), signal.SIGTERM)
+                    response = {'stopping': True}
+                else:
+                    response = run_request(request, stamp)
+            except Exception as e:
+                response = {'code': 1, 'stdout': '', 'stderr': f"calc_daemon: {type(e).__name__}: {e}\n"}
+            self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+
+    class Server(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+        pass
+
+    old_umask = os.umask(0o077)  # Only this user may connect
+    try:
+        server = Server(path, Handler)
+    finally:
+        os.umask(old_umask)
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+    signal.signal(signal.SIGTERM, stop)
+
+    print(f"Calculation daemon ready on {path} (pid {os.getpid()}, warmed in {time.perf_counter() - start:.2f}s)")
+    sys.stdout.flush()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(path):
+            os.unlink(path)
+    print("Calculation daemon stopped")
+    return 0
+
+def main(argv=None):
+    """Main function for the calculation daemon and its client"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Galaxy Platform Calculation Daemon')
+    parser.add_argument('--socket', help='Unix socket path (default: $GALAXY_CALC_SOCKET or /tmp)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('serve', help='Run the daemon in the foreground')
+    subparsers.add_parser('status', help='Show whether a daemon is listening')
+    subparsers.add_parser('stop', help='Stop the running daemon')
+    run_parser = subparsers.add_parser('run', help='Run a model CLI on the daemon')
+    run_parser.add_argument('module', choices=MODULES)
+    run_parser.add_argument('args', nargs=argparse.REMAINDER, help='Arguments for the model CLI')
+
+    args = parser.parse_args(argv)
+    path = args.socket or socket_path()
+
+    if args.command == 'serve':
+        return serve(path)
+    if args.command == 'run':
+        response = run_remote(args.module, args.args, path)
+        if response is None:
+            print("No current calculation daemon; running in-process", file=sys.stderr)
+            from report_pipeline import run_model_main
+            response = dict(zip(('code', 'stdout', 'stderr'), run_model_main(args.module, args.args)))
+        sys.stdout.write(response['stdout'])
+        sys.stderr.write(response['stderr'])
+        return response['code']
+
+    response = _request({'command': args.command}, path)
+    if response is None:
+        print(f"No calculation daemon listening on {path}")
+        return 1
+    if args.command == 'status':
+        print(f"Calculation daemon pid {response['pid']} for {response['root']} on {response['socket']}, up "
+              f"{time.time() - response['started']:.0f}s" + (" (stale: sources changed, restart it)"
+                                                             if response['stale'] else ""))
+    else:
+        print("Calculation daemon stopping")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+On-demand profiling for Galaxy Platform calculations
+Runs one calculation under cProfile (top functions by cumulative time), a
+stack sampler (flamegraph-compatible collapsed stacks) or tracemalloc (top
+allocation growth by source line and peak RSS, see memory_tracer.py). The
+API exposes it per request only when a profiling token is configured, and
+rate-limits it so it can stay enabled in production; the CLIs are profiled
+through this module's command line.
+"""
+
+import argparse
+import cProfile
+import hmac
+import importlib
+import inspect
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+MODES = ('cprofile', 'sample', 'memory')
+
+DEFAULT_TOP = 25
+
+# Stack sampling period for mode 'sample'
+SAMPLE_INTERVAL_SECONDS = 0.001
+
+# API profiling is off unless this token is set; clients send it as X-Profile-Token
+TOKEN_ENV = 'GALAXY_PROFILE_TOKEN'
+
+# Profiled API requests allowed per minute across the server
+RATE_ENV = 'GALAXY_PROFILE_RATE'
+DEFAULT_RATE_PER_MINUTE = 6
+
+def top_functions(profile: cProfile.Profile, limit: int = DEFAULT_TOP) -> List[Dict[str, Any]]:
+    """The functions with the most cumulative time"""
+    stats = pstats.Stats(profile).stats
+    rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    return [{
+        'function': name,
+        'location': f"{os.path.basename(filename)}:{line}" if line else filename,
+        'calls': calls,
+        'totalMs': round(total * 1000, 3),
+        'cumulativeMs': round(cumulative * 1000, 3),
+    } for (filename, line, name), (_, calls, total, cumulative, _) in rows]
+
+class StackSampler:
+    """Samples one thread's Python stack on a background thread while active.
+
+    Stacks are cut at root (exclusive), so frames of the caller, e.g. the web
+    server, are left out.
+    """
+
+    def __init__(self, thread_id: Optional[int] = None, interval: float = SAMPLE_INTERVAL_SECONDS, root=None):
+        self.thread_id = thread_id or threading.get_ident()
+        self.root = root
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None and frame is not self.root:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+                self.samples += 1
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._sample, daemon=True, name='stack-sampler')
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's collapsed-stack format: 'frame;frame;frame count' per line"""
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+def profile_call(func: Callable[[], Any], mode: str = 'cprofile', top: int = DEFAULT_TOP) -> Tuple[Any, Dict]:
+    """Run func() under the chosen profiler; returns (result, report)"""
+    if mode not in MODES:
+        raise ValueError(f"Unknown profiling mode: {mode} (expected one of {', '.join(MODES)})")
+    start = time.perf_counter()
+    if mode == 'cprofile':
+        profile = cProfile.Profile()
+        result = profile.runcall(func)
+        report = {'mode': mode, 'top': top_functions(profile, top)}
+    elif mode == 'memory':
+        from memory_tracer import trace_call
+        result, report = trace_call(func, top)
+    else:
+        with StackSampler(root=sys._getframe()) as sampler:
+            result = func()
+        report = {'mode': mode, 'samples': sampler.samples, 'intervalMs': sampler.interval * 1000,
+                  'collapsed': sampler.collapsed()}
+    report['wallMs'] = round((time.perf_counter() - start) * 1000, 3)
+    return result, report
+
+class ProfileGate:
+    """Access control and rate limiting for profiled requests.
+
+    Disabled without a token. A token bucket refilled at rate_per_minute
+    bounds profiling overhead, and only one request is profiled at a time.
+    """
+
+    def __init__(self, token: Optional[str] = None, rate_per_minute: float = DEFAULT_RATE_PER_MINUTE):
+        self.token = token
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1.0, min(2.0, rate_per_minute))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+        self.running = threading.Lock()
+        self.stats = {'profiled': 0, 'rateLimited': 0, 'denied': 0}
+
+    @classmethod
+    def from_env(cls) -> 'ProfileGate':
+        return cls(os.environ.get(TOKEN_ENV) or None, float(os.environ.get(RATE_ENV, DEFAULT_RATE_PER_MINUTE)))
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.token)
+
+    def authorize(self, presented: Optional[str]) -> bool:
+        allowed = self.enabled and presented is not None and hmac.compare_digest(presented, self.token)
+        if not allowed:
+            with self.lock:
+                self.stats['denied'] += 1
+        return allowed
+
+    def acquire(self) -> Optional[float]:
+        """Take a profiling slot; returns None on success, else seconds until one may be free"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1 or not self.running.acquire(blocking=False):
+                self.stats['rateLimited'] += 1
+                return max((1 - self.tokens) / self.rate, 1.0) if self.rate else 60.0
+            self.tokens -= 1
+            self.stats['profiled'] += 1
+            return None
+
+    def release(self):
+        self.running.release()
+
+def profiled_view(gate: ProfileGate, top: int = DEFAULT_TOP):
+    """Flask view decorator: ?profile=cprofile|sample|memory adds a 'profile' report to the JSON response"""
+    from flask import jsonify, make_response, request
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            mode = request.args.get('profile')
+            if not mode:
+                return view(*args, **kwargs)
+            if not gate.enabled:
+                return jsonify({'error': f'Profiling is not enabled (set {TOKEN_ENV})'}), 404
+            if not gate.authorize(request.headers.get('X-Profile-Token')):
+                return jsonify({'error': 'Invalid or missing X-Profile-Token'}), 403
+            if mode not in MODES:
+                return jsonify({'error': f"profile must be one of {', '.join(MODES)}"}), 400
+
+            retry_after = gate.acquire()
+            if retry_after is not None:
+                response = make_response(view(*args, **kwargs))
+                report = {'skipped': 'rate limited', 'retryAfterSeconds': round(retry_after, 1)}
+            else:
+                try:
+                    response, report = profile_call(lambda: make_response(view(*args, **kwargs)), mode, top)
+                finally:
+                    gate.release()
+
+            payload = response.get_json(silent=True)
+            if not isinstance(payload, dict):
+                return response
+            response.set_data(jsonify({**payload, 'profile': report}).get_data())
+            return response
+        return wrapper
+    return decorator
+
+def main():
+    """Main function for profiling a model CLI"""
+    parser = argparse.ArgumentParser(description='Galaxy Platform Calculation Profiler',
+                                     usage='%(prog)s [options] <model.py> [model arguments]')
+    parser.add_argument('--mode', choices=MODES, default='cprofile', help='cProfile, stack sampling or allocation tracing')
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP,
+                        help='Functions (cprofile) or source lines (memory) to list')
+    parser.add_argument('-o', '--output', help='Write collapsed stacks here (sample mode; default stderr)')
+    parser.add_argument('model', help='Model CLI to run, e.g. galaxy_cloud_calculator.py')
+    parser.add_argument('args', nargs=argparse.REMAINDER, help='Arguments for the model CLI')
+
+    args = parser.parse_args()
+
+    name = os.path.splitext(os.path.basename(args.model))[0]
+    module = importlib.import_module(name)
+    if not callable(getattr(module, 'main', None)):
+        parser.error(f"{args.model} has no main() to profile")
+    sys.argv = [args.model] + args.args
+    # Older CLIs define main() with no parameters and parse sys.argv themselves
+    takes_argv = bool(inspect.signature(module.main).parameters)
+
+    def run():
+        try:
+            return (module.main(args.args) if takes_argv else module.main()) or 0
+        except SystemExit as e:
+            return e.code if isinstance(e.code, int) else 1
+
+    code, report = profile_call(run, args.mode, args.top)
+
+    err = sys.stderr
+    print(f"\nProfiled {args.model} ({args.mode}) in {report['wallMs']:.1f}ms", file=err)
+    if args.mode == 'cprofile':
+        print(f"{'cumulative':>12} {'total':>10} {'calls':>8}  function", file=err)
+        for row in report['top']:
+            print(f"{row['cumulativeMs']:>10.2f}ms {row['totalMs']:>8.2f}ms {row['calls']:>8}  "
+                  f"{row['function']} ({row['location']})", file=err)
+    elif args.mode == 'memory':
+        print(f"Traced peak {report['tracedPeakMb']}MB, retained {report['retainedMb']}MB, "
+              f"peak RSS {report['peakRssMb']}MB", file=err)
+        print(f"{'growth':>12} {'live':>12} {'blocks':>8}  location", file=err)
+        for row in report['top']:
+            print(f"{row['sizeDiffKb']:>10.1f}KB {row['sizeKb']:>10.1f}KB {row['countDiff']:>+8}  {row['location']}",
+                  file=err)
+    elif args.output:
+        with open(args.output, 'w') as f:
+            f.write(report['collapsed'])
+        print(f"{report['samples']} samples written to {args.output} (collapsed stacks, e.g. for flamegraph.pl)",
+              file=err)
+    else:
+        err.write(report['collapsed'])
+    return code
+
+if __name__ == "__main__":
+    sys.exit(main())
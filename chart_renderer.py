@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Chart rendering for Galaxy Platform
+Draws charts with matplotlib's object-oriented Agg API (no pyplot global
+state), renders batches across worker processes and caches the PNG / SVG
+bytes by a hash of the chart kind, data and style
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+FORMATS = {'png': 'image/png', 'svg': 'image/svg+xml'}
+
+DEFAULT_STYLE = {'dpi': 150}
+
+# Style keys a caller may set, with upper bounds on the raster size a request can ask for
+MAX_FIGURE_INCHES = 30
+MAX_DPI = 300
+STYLE_LIMITS = {'width': MAX_FIGURE_INCHES, 'height': MAX_FIGURE_INCHES, 'dpi': MAX_DPI}
+STYLE_KEYS = set(STYLE_LIMITS) | {'title'}
+
+# Rendered bytes kept in memory by ChartCache
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+
+ChartSpec = Tuple[str, Dict[str, Any], Optional[Dict[str, Any]], str]
+
+def _format_cost(cost: float) -> str:
+    from utils import format_cost
+    return format_cost(cost)
+
+def draw_cost_breakdown(fig, data: Dict[str, Any], style: Dict[str, Any]):
+    """Pie chart of {'costs': {component: monthly cost}}"""
+    import numpy as np
+    from matplotlib import colormaps
+
+    costs = {k: v for k, v in data['costs'].items() if v > 0}
+    labels = list(costs.keys())
+    sizes = list(costs.values())
+
+    ax = fig.add_subplot()
+    colors = colormaps['Set3'](np.linspace(0, 1, len(labels)))
+    wedges, texts, autotexts = ax.pie(sizes, labels=labels, colors=colors,
+                                      autopct='%1.1f%%', startangle=90)
+    for text in texts:
+        text.set_fontsize(10)
+    for autotext in autotexts:
+        autotext.set_color('white')
+        autotext.set_fontsize(9)
+        autotext.set_weight('bold')
+
+    ax.set_title(style.get('title', 'Infrastructure Cost Breakdown'), fontsize=14, fontweight='bold')
+    legend_labels = [f"{label}: {_format_cost(cost)}" for label, cost in zip(labels, sizes)]
+    ax.legend(legend_labels, loc='center left', bbox_to_anchor=(1, 0.5))
+
+def draw_scaling(fig, data: Dict[str, Any], style: Dict[str, Any]):
+    """Line chart of {'results': [{scenario, customer_count, total_monthly_cost}]}"""
+    from matplotlib.ticker import FuncFormatter
+
+    results = data['results']
+    scenarios = [r['scenario'] for r in results]
+    customer_counts = [r['customer_count'] for r in results]
+    total_costs = [r['total_monthly_cost'] for r in results]
+
+    ax = fig.add_subplot()
+    ax.plot(customer_counts, total_costs, marker='o', linewidth=2, markersize=8)
+    for x, y, scenario in zip(customer_counts, total_costs, scenarios):
+        ax.annotate(f"{scenario}\n{_format_cost(y)}",
+                    xy=(x, y), xytext=(0, 10),
+                    textcoords='offset points', ha='center',
+                    fontsize=9, bbox=dict(boxstyle='round,pad=0.3', facecolor='yellow', alpha=0.3))
+
+    ax.set_xlabel('Number of Customers', fontsize=12)
+    ax.set_ylabel('Monthly Cost (USD)', fontsize=12)
+    ax.set_title(style.get('title', 'Infrastructure Cost Scaling Analysis'), fontsize=14, fontweight='bold')
+    ax.grid(True, alpha=0.3)
+    ax.yaxis.set_major_formatter(FuncFormatter(lambda x, p: _format_cost(x)))
+    ax.xaxis.set_major_formatter(FuncFormatter(lambda x, p: f"{int(x):,}"))
+
+def draw_growth(fig, data: Dict[str, Any], style: Dict[str, Any]):
+    """Four-panel growth projection; data as built by growth_chart_data()"""
+    from matplotlib.ticker import FuncFormatter
+
+    months = data['months']
+    (ax1, ax2), (ax3, ax4) = fig.subplots(2, 2)
+
+    ax1.plot(months, data['customers'], 'b-', linewidth=2)
+    ax1.set_xlabel('Month')
+    ax1.set_ylabel('Customers')
+    ax1.set_title('Customer Growth')
+    ax1.grid(True, alpha=0.3)
+    ax1.yaxis.set_major_formatter(FuncFormatter(lambda x, p: f'{x/1000:.0f}K'))
+
+    ax2.plot(months, data['total_monthly'], 'g-', linewidth=2)
+    ax2.set_xlabel('Month')
+    ax2.set_ylabel('Monthly Cost ($)')
+    ax2.set_title('Total Cost Growth')
+    ax2.grid(True, alpha=0.3)
+    ax2.yaxis.set_major_formatter(FuncFormatter(lambda x, p: f'${x/1000:.0f}K'))
+
+    ax3.plot(months, data['cost_per_customer'], 'r-', linewidth=2)
+    ax3.set_xlabel('Month')
+    ax3.set_ylabel('Cost per Customer ($)')
+    ax3.set_title('Cost per Customer (Economies of Scale)')
+    ax3.grid(True, alpha=0.3)
+
+    ax4.stackplot(months, data['compute'], data['database'], data['observability'], data['other'],
+                  labels=['Compute', 'Database', 'Observability', 'Other'],
+                  alpha=0.8)
+    ax4.set_xlabel('Month')
+    ax4.set_ylabel('Monthly Cost ($)')
+    ax4.set_title('Cost Components Over Time')
+    ax4.legend(loc='upper left')
+    ax4.grid(True, alpha=0.3)
+    ax4.yaxis.set_major_formatter(FuncFormatter(lambda x, p: f'${x/1000:.0f}K'))
+
+    fig.suptitle(style.get('title', 'Galaxy Platform - Cost Growth Projection'), fontsize=16, fontweight='bold')
+
+# kind -> (draw function, default figure size in inches)
+CHARTS: Dict[str, Tuple[Callable, Tuple[float, float]]] = {
+    'cost_breakdown': (draw_cost_breakdown, (10, 8)),
+    'scaling': (draw_scaling, (10, 6)),
+    'growth': (draw_growth, (15, 10)),
+}
+
+# kind -> data keys the draw function reads; checked up front so bad input is a ValueError, not a render failure
+REQUIRED_DATA: Dict[str, Tuple[Tuple[str, type], ...]] = {
+    'cost_breakdown': (('costs', dict),),
+    'scaling': (('results', list),),
+    'growth': tuple((name, list) for name in ('months', 'customers', 'total_monthly', 'cost_per_customer',
+                                              'compute', 'database', 'observability', 'other')),
+}
+SCALING_RESULT_KEYS = ('scenario', 'customer_count', 'total_monthly_cost')
+
+def growth_chart_data(projections: List[Dict]) -> Dict[str, List]:
+    """The series draw_growth needs from growth_projection_model projections"""
+    return {
+        'months': [p['month'] for p in projections],
+        'customers': [p['details']['customer_count'] for p in projections],
+        'total_monthly': [p['total_monthly'] for p in projections],
+        'cost_per_customer': [p['cost_per_customer'] for p in projections],
+        'compute': [p['compute'] for p in projections],
+        'database': [p['database'] for p in projections],
+        'observability': [p['observability'] for p in projections],
+        'other': [p['other'] for p in projections],
+    }
+
+def chart_format(path: str) -> str:
+    """Output format from a file name; PNG unless it ends in .svg"""
+    return 'svg' if str(path).lower().endswith('.svg') else 'png'
+
+def _resolve(kind: str, style: Optional[Dict[str, Any]], fmt: str) -> Tuple[Callable, Dict[str, Any]]:
+    if kind not in CHARTS:
+        raise ValueError(f"Unknown chart kind: {kind} (expected one of {', '.join(CHARTS)})")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown chart format: {fmt} (expected one of {', '.join(FORMATS)})")
+    if style is not None:
+        if not isinstance(style, dict):
+            raise ValueError("Chart style must be an object")
+        unknown = set(style) - STYLE_KEYS
+        if unknown:
+            raise ValueError(f"Unknown chart style keys: {', '.join(sorted(unknown))} "
+                             f"(expected {', '.join(sorted(STYLE_KEYS))})")
+        for key, limit in STYLE_LIMITS.items():
+            value = style.get(key)
+            if key in style and (isinstance(value, bool) or not isinstance(value, (int, float))
+                                 or not 0 < value <= limit):
+                raise ValueError(f"Chart style '{key}' must be a number above 0 and at most {limit}")
+        if not isinstance(style.get('title', ''), str):
+            raise ValueError("Chart style 'title' must be a string")
+    draw, size = CHARTS[kind]
+    return draw, {**DEFAULT_STYLE, 'width': size[0], 'height': size[1], **(style or {})}
+
+def _check_data(kind: str, data: Dict[str, Any]):
+    if not isinstance(data, dict):
+        raise ValueError("Chart data must be an object")
+    for name, expected in REQUIRED_DATA[kind]:
+        if name not in data:
+            raise ValueError(f"{kind} chart data is missing '{name}'")
+        if not isinstance(data[name], expected):
+            raise ValueError(f"{kind} chart data '{name}' must be a{'n object' if expected is dict else ' list'}")
+    if kind == 'cost_breakdown':
+        if not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in data['costs'].values()):
+            raise ValueError("cost_breakdown chart costs must be numbers")
+    if kind == 'scaling':
+        for result in data['results']:
+            missing = [k for k in SCALING_RESULT_KEYS if not isinstance(result, dict) or k not in result]
+            if missing:
+                raise ValueError(f"scaling chart results need {', '.join(SCALING_RESULT_KEYS)}")
+
+def chart_key(kind: str, data: Dict[str, Any], style: Optional[Dict[str, Any]] = None, fmt: str = 'png') -> str:
+    """Content hash identifying the rendered bytes"""
+    _, style = _resolve(kind, style, fmt)
+    _check_data(kind, data)
+    canonical = json.dumps([kind, data, style, fmt], sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def render_chart(kind: str, data: Dict[str, Any], style: Optional[Dict[str, Any]] = None, fmt: str = 'png') -> bytes:
+    """Render one chart to PNG or SVG bytes on a private Agg canvas"""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    draw, style = _resolve(kind, style, fmt)
+    fig = Figure(figsize=(style['width'], style['height']))
+    FigureCanvasAgg(fig)
+    draw(fig, data, style)
+    fig.tight_layout()
+
+    buffer = io.BytesIO()
+    # No creation date, so the same chart always renders to the same bytes
+    metadata = {'Date': None} if fmt == 'svg' else None
+    fig.savefig(buffer, format=fmt, dpi=style['dpi'], bbox_inches='tight', metadata=metadata)
+    return buffer.getvalue()
+
+def save_chart(kind: str, data: Dict[str, Any], output_file: str, style: Optional[Dict[str, Any]] = None):
+    """Render a chart to a file, choosing PNG or SVG from its extension"""
+    content = render_chart(kind, data, style, chart_format(output_file))
+    with open(output_file, 'wb') as f:
+        f.write(content)
+
+def show_chart(kind: str, data: Dict[str, Any], style: Optional[Dict[str, Any]] = None):
+    """Display a chart in an interactive pyplot window"""
+    import matplotlib.pyplot as plt
+
+    draw, style = _resolve(kind, style, 'png')
+    fig = plt.figure(figsize=(style['width'], style['height']))
+    draw(fig, data, style)
+    fig.tight_layout()
+    plt.show()
+
+def _render_spec(spec: ChartSpec) -> bytes:
+    return render_chart(*spec)
+
+class ChartCache:
+    """Rendered chart bytes by content key: an LRU in memory, optionally backed by a directory"""
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES, directory: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.directory = Path(directory) if directory else None
+        self.entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self.lock:
+            content = self.entries.get(key)
+            if content is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return content
+        if self.directory and (self.directory / key).exists():
+            content = (self.directory / key).read_bytes()
+            self._remember(key, content)
+            with self.lock:
+                self.hits += 1
+            return content
+        with self.lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, content: bytes):
+        self._remember(key, content)
+        if self.directory:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp = self.directory / f"{key}.tmp"
+            tmp.write_bytes(content)
+            tmp.replace(self.directory / key)
+
+    def _remember(self, key: str, content: bytes):
+        with self.lock:
+            if key in self.entries:
+                return
+            self.entries[key] = content
+            self.size += len(content)
+            while self.size > self.max_bytes and len(self.entries) > 1:
+                self.size -= len(self.entries.popitem(last=False)[1])
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {'entries': len(self.entries), 'bytes': self.size, 'hits': self.hits, 'misses': self.misses}
+
+class ChartRenderer:
+    """Renders charts on a worker process pool, deduplicating identical in-flight requests.
+
+    Callers get a Future; threads waiting on one hold no matplotlib state, so
+    a web server's request threads never contend for the plotting library.
+    With workers=0 charts are rendered in the calling thread.
+    """
+
+    def __init__(self, cache: Optional[ChartCache] = None, workers: int = 2):
+        self.cache = cache if cache is not None else ChartCache()
+        self.workers = workers
+        self.pool = None
+        self.pending: Dict[str, Future] = {}
+        self.lock = threading.Lock()
+
+    def _executor(self):
+        if self.pool is None:
+            from concurrent.futures import ProcessPoolExecutor
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self.pool
+
+    def submit(self, kind: str, data: Dict[str, Any], style: Optional[Dict[str, Any]] = None,
+               fmt: str = 'png') -> Tuple[str, Future]:
+        """Start rendering a chart; returns (content key, future of the bytes)"""
+        key = chart_key(kind, data, style, fmt)
+        content = self.cache.get(key)
+        if content is not None:
+            future = Future()
+            future.set_result(content)
+            return key, future
+
+        with self.lock:
+            future = self.pending.get(key)
+            if future is not None:
+                return key, future
+            if self.workers <= 0:
+                future = Future()
+                try:
+                    future.set_result(render_chart(kind, data, style, fmt))
+                except Exception as e:
+                    future.set_exception(e)
+            else:
+                future = self._executor().submit(_render_spec, (kind, data, style, fmt))
+                self.pending[key] = future
+
+        def done(f: Future):
+            with self.lock:
+                self.pending.pop(key, None)
+            if not f.cancelled() and f.exception() is None:
+                self.cache.put(key, f.result())
+        future.add_done_callback(done)
+        return key, future
+
+    def render(self, kind: str, data: Dict[str, Any], style: Optional[Dict[str, Any]] = None,
+               fmt: str = 'png', timeout: Optional[float] = None) -> bytes:
+        return self.submit(kind, data, style, fmt)[1].result(timeout)
+
+    def render_many(self, specs: List[ChartSpec]) -> List[bytes]:
+        """Render a batch of (kind, data, style, format) specs concurrently, in order"""
+        futures = [self.submit(*spec)[1] for spec in specs]
+        return [future.result() for future in futures]
+
+    def close(self):
+        with self.lock:
+            pool, self.pool = self.pool, None
+        if pool is not None:
+            pool.shutdown()
+
+def main():
+    """Main function for rendering charts from JSON specs"""
+    parser = argparse.ArgumentParser(description='Galaxy Platform Chart Renderer')
+    parser.add_argument('specs', help='JSON file with a list of {kind, data, style, output} charts')
+    parser.add_argument('--workers', type=int, default=2, help='Worker processes (0 = render in this process)')
+    parser.add_argument('--cache-dir', help='Reuse rendered charts from this directory')
+
+    args = parser.parse_args()
+
+    with open(args.specs) as f:
+        charts = json.load(f)
+
+    renderer = ChartRenderer(ChartCache(directory=args.cache_dir), args.workers)
+    try:
+        contents = renderer.render_many([(c['kind'], c['data'], c.get('style'), chart_format(c['output']))
+                                         for c in charts])
+    finally:
+        renderer.close()
+    for chart, content in zip(charts, contents):
+        with open(chart['output'], 'wb') as f:
+            f.write(content)
+        print(f"Chart saved to {chart['output']}")
+    stats = renderer.cache.stats()
+    print(f"{len(charts)} charts, {stats['hits']} from cache")
+    return 0
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Commitment optimizer for Galaxy Platform
+Chooses reserved / committed-use levels that minimise expected cost over a
+demand projection, using the commitment tiers in the pricing files
+"""
+
+import argparse
+from typing import Dict, Optional, Tuple
+import numpy as np
+
+HOURS_PER_MONTH = 730
+
+# Demand shortfall used to stress-test a commitment (20% less usage than projected)
+DEFAULT_DOWNSIDE = 0.2
+
+def commitment_cost_curve(demand: np.ndarray, discount: float,
+                          weights: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Total cost at every candidate commitment level.
+
+    demand is on-demand spend per hour and weights the number of hours each
+    value applies for. With a commitment of c $/hour the cost is
+        c * (1 - discount) * H + sum(w * max(d - c, 0))
+    which is convex and piecewise linear in c, so the optimum lies on one of
+    the demand values. All breakpoints are evaluated in one sorted pass.
+    """
+    demand = np.asarray(demand, dtype=float)
+    weights = np.ones_like(demand) if weights is None else np.asarray(weights, dtype=float)
+
+    order = np.argsort(demand)
+    levels = np.concatenate(([0.0], demand[order]))
+    w = np.concatenate(([0.0], weights[order]))
+    total_hours = w.sum()
+
+    # Hours and spend strictly above each breakpoint
+    hours_above = total_hours - np.cumsum(w)
+    spend_above = (w * levels).sum() - np.cumsum(w * levels)
+
+    costs = levels * (1 - discount) * total_hours + spend_above - levels * hours_above
+    return levels, costs
+
+def evaluate_commitment(demand: np.ndarray, weights: np.ndarray, level: float, discount: float) -> Dict:
+    """Cost, savings and utilisation of a fixed commitment level against a demand series"""
+    total_hours = weights.sum()
+    on_demand = float((weights * demand).sum())
+    overflow = float((weights * np.maximum(demand - level, 0)).sum())
+    committed = level * (1 - discount) * total_hours
+    used = float((weights * np.minimum(demand, level)).sum())
+    total = committed + overflow
+
+    return {
+        'on_demand_cost': on_demand,
+        'committed_cost': committed,
+        'overflow_cost': overflow,
+        'total_cost': total,
+        'savings': on_demand - total,
+        'savings_pct': (on_demand - total) / on_demand * 100 if on_demand > 0 else 0,
+        'utilization': used / (level * total_hours) if level > 0 else 0,
+        'unused_commitment_cost': (level * total_hours - used) * (1 - discount),
+        'hours_under_committed_pct': float(weights[demand < level].sum() / total_hours * 100),
+    }
+
+def optimize_commitment(demand: np.ndarray, discount: float, weights: Optional[np.ndarray] = None,
+                        downside: float = DEFAULT_DOWNSIDE) -> Dict:
+    """Find the commitment level that minimises total cost for one tier"""
+    demand = np.asarray(demand, dtype=float)
+    weights = np.ones_like(demand) if weights is None else np.asarray(weights, dtype=float)
+
+    levels, costs = commitment_cost_curve(demand, discount, weights)
+    best = int(np.argmin(costs))
+    level = float(levels[best])
+
+    result = evaluate_commitment(demand, weights, level, discount)
+    result['commitment_per_hour'] = level
+    result['commitment_per_month'] = level * HOURS_PER_MONTH
+    result['discount'] = discount
+
+    # Utilisation risk: what the same commitment does if demand falls short
+    stressed = evaluate_commitment(demand * (1 - downside), weights, level, discount)
+    result['downside'] = {
+        'demand_shortfall_pct': downside * 100,
+        'savings': stressed['savings'],
+        'utilization': stressed['utilization'],
+        'unused_commitment_cost': stressed['unused_commitment_cost'],
+    }
+    return result
+
+def fit_to_term(values: np.ndarray, weights: np.ndarray, term_months: int,
+                hours_per_value: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Trim or extend a demand series so it spans exactly the commitment term.
+
+    Monthly projections shorter than the term are extended flat at their last
+    value; a single simulated year is repeated for multi-year terms.
+    """
+    term_hours = term_months * HOURS_PER_MONTH
+    covered = weights.sum()
+
+    if covered >= term_hours:
+        cumulative = np.cumsum(weights)
+        keep = cumulative - weights < term_hours
+        values, weights = values[keep], weights[keep].copy()
+        weights[-1] -= weights.sum() - term_hours
+        return values, weights
+
+    if hours_per_value == 1:
+        return values, weights * (term_hours / covered)
+
+    return np.append(values, values[-1]), np.append(weights, term_hours - covered)
+
+def demand_from_growth_projection(initial_customers: int, growth_rate: float,
+                                  months: int) -> Dict[str, Tuple[np.ndarray, np.ndarray, float]]:
+    """On-demand $/hour per component from growth_projection_model, one value per month"""
+    from growth_projection_model import generate_growth_projection
+
+    projections = generate_growth_projection(initial_customers, growth_rate, months)
+    weights = np.full(len(projections), float(HOURS_PER_MONTH))
+    return {
+        'compute': (np.array([p['compute'] for p in projections]) / HOURS_PER_MONTH, weights, HOURS_PER_MONTH),
+        'database': (np.array([p['database'] for p in projections]) / HOURS_PER_MONTH, weights, HOURS_PER_MONTH),
+    }
+
+def demand_from_hourly_profile(retail_count: int, sme_count: int, corporate_count: int,
+                               pricing: Dict, volume_multiplier: float = 1.0) -> Dict[str, Tuple[np.ndarray, np.ndarray, float]]:
+    """On-demand $/hour per component from an autoscaling replay of the hourly load profile"""
+    from load_profile_model import simulate_hourly_demand
+    from autoscaling_model import default_policies, replay_autoscaling
+    from galaxy_complete_cost_model import GALAXY_SERVICES, estimate_database_instance_cost
+
+    demand = simulate_hourly_demand(retail_count, sme_count, corporate_count, volume_multiplier)
+    replay = replay_autoscaling(demand['ops'] / 3600, default_policies(), demand['services'])
+
+    hourly_rates = np.array([
+        GALAXY_SERVICES[s.lower()]['cpu_per_instance'] * pricing['compute']['vcpu_hour'] +
+        GALAXY_SERVICES[s.lower()]['memory_per_instance'] * pricing['compute']['memory_gb_hour']
+        for s in demand['services']
+    ])
+    compute = (replay['replicas'] * hourly_rates[:, None]).sum(axis=0)
+    database = np.full(compute.shape, estimate_database_instance_cost(pricing) / HOURS_PER_MONTH)
+    weights = np.ones_like(compute)
+
+    return {
+        'compute': (compute, weights, 1),
+        'database': (database, weights, 1),
+    }
+
+def optimize_commitments(demand: Dict[str, Tuple[np.ndarray, np.ndarray, float]], pricing: Dict,
+                         downside: float = DEFAULT_DOWNSIDE) -> Dict:
+    """Optimise every commitment tier for every component and pick the best per component"""
+    tiers_by_component = pricing.get('commitments', {})
+    results = {}
+
+    for component, (values, weights, hours_per_value) in demand.items():
+        tiers = tiers_by_component.get(component, {})
+        if not tiers:
+            continue
+
+        component_results = {}
+        for tier_name, tier in tiers.items():
+            term_values, term_weights = fit_to_term(values, weights, tier['term_months'], hours_per_value)
+            tier_result = optimize_commitment(term_values, tier['discount'], term_weights, downside)
+            tier_result['term_months'] = tier['term_months']
+            # Normalise to a monthly figure so tiers with different terms compare fairly
+            tier_result['monthly_savings'] = tier_result['savings'] / tier['term_months']
+            component_results[tier_name] = tier_result
+
+        best = max(component_results.items(), key=lambda x: x[1]['monthly_savings'])
+        results[component] = {
+            'tiers': component_results,
+            'recommended': best[0],
+            'monthly_savings': best[1]['monthly_savings'],
+        }
+
+    return {
+        'components': results,
+        'total_monthly_savings': sum(r['monthly_savings'] for r in results.values()),
+    }
+
+def print_commitment_report(result: Dict, provider: str, downside: float = DEFAULT_DOWNSIDE):
+    """Print recommended commitments and their risk"""
+    from utils import format_cost
+    stress = f"@-{downside * 100:.0f}%"
+
+    print("\n" + "="*100)
+    print(f"GALAXY PLATFORM - COMMITMENT OPTIMIZATION ({provider.upper()})")
+    print("="*100)
+
+    for component, data in result['components'].items():
+        print(f"\n{component.upper()}")
+        print("-"*100)
+        print(f"{'Tier':<20} {'Commit/Mo':>12} {'On-Demand':>12} {'With Commit':>12} {'Savings':>10} "
+              f"{'Save/Mo':>10} {'Util':>7} {'Util' + stress:>10} {'Save' + stress:>11}")
+        for tier_name, tier in data['tiers'].items():
+            marker = " *" if tier_name == data['recommended'] else ""
+            print(f"{tier_name + marker:<20} {format_cost(tier['commitment_per_month']):>12} "
+                  f"{format_cost(tier['on_demand_cost']):>12} {format_cost(tier['total_cost']):>12} "
+                  f"{tier['savings_pct']:>9.1f}% {format_cost(tier['monthly_savings']):>10} "
+                  f"{tier['utilization'] * 100:>6.1f}% {tier['downside']['utilization'] * 100:>9.1f}% "
+                  f"{format_cost(tier['downside']['savings']):>11}")
+
+    print("\n" + "-"*100)
+    print(f"{'Total Monthly Savings (recommended tiers)':.<50} {format_cost(result['total_monthly_savings']):>15}")
+    print("="*100)
+
+def main():
+    """Main function for commitment optimization"""
+    parser = argparse.ArgumentParser(description='Galaxy Platform Commitment Optimizer')
+    parser.add_argument('--provider', choices=['aws', 'gcp', 'azure', 'generic'], default='aws',
+                       help='Cloud provider for pricing and commitment tiers')
+    parser.add_argument('--source', choices=['growth', 'hourly'], default='growth',
+                       help='Demand projection to optimise against')
+    parser.add_argument('--initial-customers', type=int, default=100000, help='Initial customers (growth source)')
+    parser.add_argument('--growth-rate', type=float, default=0.03, help='Monthly growth rate (growth source)')
+    parser.add_argument('--months', type=int, default=36, help='Projection length in months (growth source)')
+    parser.add_argument('--retail', type=int, default=1000000, help='Number of retail customers (hourly source)')
+    parser.add_argument('--sme', type=int, default=100000, help='Number of SME customers (hourly source)')
+    parser.add_argument('--corporate', type=int, default=10000, help='Number of corporate customers (hourly source)')
+    parser.add_argument('--downside', type=float, default=DEFAULT_DOWNSIDE,
+                       help='Demand shortfall used for utilisation risk (default: 0.2)')
+
+    args = parser.parse_args()
+
+    from galaxy_cloud_calculator import load_cloud_pricing
+    pricing = load_cloud_pricing(args.provider)
+
+    if args.source == 'growth':
+        demand = demand_from_growth_projection(args.initial_customers, args.growth_rate, args.months)
+    else:
+        demand = demand_from_hourly_profile(args.retail, args.sme, args.corporate, pricing)
+
+    result = optimize_commitments(demand, pricing, args.downside)
+    print_commitment_report(result, args.provider, args.downside)
+    return 0
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Cost attribution (showback) model for Galaxy Platform
+Allocates every cost component back to segment x service x operation using
+configurable allocation keys, and derives unit costs per operation type
+"""
+
+import argparse
+from typing import Dict, Optional
+import numpy as np
+
+from segment_operations_model import get_operation_profiles
+from data_lifecycle_model import SERVICE_DATA_CLASS, build_data_classes
+
+SEGMENTS = ['retail', 'sme', 'corporate']
+
+# Relative CPU cost of one operation: writes validate, persist and replicate
+DEFAULT_CPU_WEIGHTS = {'read': 1.0, 'write': 3.0, 'per_kb': 0.5}
+
+# Retention used for storage share when a data class is kept indefinitely
+DEFAULT_RETENTION_MONTHS = 120
+
+# Allocation key per cost component. Keys:
+#   cpu_ops        operations weighted by CPU cost (DEFAULT_CPU_WEIGHTS)
+#   ops            plain operation counts
+#   bytes_written  bytes written per month
+#   storage_share  bytes written x retention of the operation's data class
+#   customers      customer counts, spread over each segment's operations
+DEFAULT_ALLOCATION_KEYS = {
+    'compute': 'cpu_ops',
+    'database': 'storage_share',
+    'observability': 'ops',
+    'cache_queue': 'ops',
+    'api_gateway': 'ops',
+    'security': 'ops',
+    'storage': 'storage_share',
+    'network': 'customers',
+    'backup_dr': 'storage_share',
+    'cicd': 'cpu_ops',
+    'non_production': 'cpu_ops',
+}
+
+def build_allocation_weights(retail_count: int, sme_count: int, corporate_count: int,
+                             volume_multiplier: float = 1.0, cpu_weights: Optional[Dict] = None,
+                             config: Optional[Dict] = None) -> Dict:
+    """Operation volumes and every allocation key as (operations x segments) arrays"""
+    cpu_weights = {**DEFAULT_CPU_WEIGHTS, **(cpu_weights or {})}
+    profiles = get_operation_profiles()
+    counts = np.array([retail_count, sme_count, corporate_count], dtype=float)
+
+    volumes = np.array([[p.retail_volume, p.sme_volume, p.corporate_volume] for p in profiles])
+    ops = volumes * counts[None, :] * volume_multiplier
+    is_write = np.array([p.is_write_operation for p in profiles])
+    bytes_per_op = np.array([p.bytes_per_operation for p in profiles], dtype=float)
+
+    classes = build_data_classes(config)
+    retention = np.array([classes[SERVICE_DATA_CLASS.get(p.service, 'transaction')]['retention_months']
+                          or DEFAULT_RETENTION_MONTHS for p in profiles], dtype=float)
+
+    cpu_per_op = (np.where(is_write, cpu_weights['write'], cpu_weights['read']) +
+                  cpu_weights['per_kb'] * bytes_per_op / 1024)
+    bytes_written = ops * np.where(is_write, bytes_per_op, 0)[:, None]
+
+    # Customers split over each segment's operations in proportion to its ops
+    segment_ops = ops.sum(axis=0)
+    customers = np.divide(ops * counts[None, :], segment_ops[None, :],
+                          out=np.zeros_like(ops), where=segment_ops[None, :] > 0)
+
+    return {
+        'profiles': profiles,
+        'counts': counts,
+        'ops': ops,
+        'keys': {
+            'cpu_ops': ops * cpu_per_op[:, None],
+            'ops': ops,
+            'bytes_written': bytes_written,
+            'storage_share': bytes_written * retention[:, None],
+            'customers': customers,
+        },
+    }
+
+def attribute_costs(components: Dict[str, float], weights: Dict,
+                    allocation_keys: Optional[Dict[str, str]] = None) -> Dict:
+    """Allocate component costs to (component x operation x segment) in one tensor product"""
+    allocation_keys = {**DEFAULT_ALLOCATION_KEYS, **(allocation_keys or {})}
+    names = list(components)
+    unknown = {allocation_keys.get(n, 'ops') for n in names} - set(weights['keys'])
+    if unknown:
+        raise ValueError(f"Unknown allocation key(s): {', '.join(sorted(unknown))}")
+
+    # (keys x operations x segments) shares, each summing to 1
+    key_names = list(weights['keys'])
+    stacked = np.stack([weights['keys'][k] for k in key_names])
+    totals = stacked.sum(axis=(1, 2), keepdims=True)
+    shares = np.divide(stacked, totals, out=np.zeros_like(stacked), where=totals > 0)
+
+    selector = np.array([key_names.index(allocation_keys.get(n, 'ops')) for n in names])
+    costs = np.array([components[n] for n in names], dtype=float)
+    by_component = costs[:, None, None] * shares[selector]
+
+    allocated = by_component.sum(axis=0)
+    ops = weights['ops']
+    unit_cost = np.divide(allocated, ops, out=np.zeros_like(allocated), where=ops > 0)
+
+    return {
+        'components': names,
+        'allocation_keys': {n: allocation_keys.get(n, 'ops') for n in names},
+        'by_component': by_component,
+        'allocated': allocated,
+        'unit_cost': unit_cost,
+        'weights': weights,
+    }
+
+def attribution_summary(result: Dict, top: Optional[int] = None) -> Dict:
+    """JSON-friendly rollups by segment, service and operation"""
+    weights = result['weights']
+    profiles = weights['profiles']
+    allocated = result['allocated']
+    counts = weights['counts']
+
+    services = list(dict.fromkeys(p.service for p in profiles))
+    by_service = np.array([[p.service == s for p in profiles] for s in services], dtype=float)
+    service_costs = by_service @ allocated  # (services x segments)
+    component_segments = result['by_component'].sum(axis=1)  # (components x segments)
+
+    segment_totals = allocated.sum(axis=0)
+    segments = {
+        segment: {
+            'monthlyCost': float(segment_totals[i]),
+            'costPerCustomer': float(segment_totals[i] / counts[i]) if counts[i] > 0 else 0,
+            'components': {name: float(component_segments[c, i]) for c, name in enumerate(result['components'])},
+        }
+        for i, segment in enumerate(SEGMENTS)
+    }
+
+    order = np.argsort(-allocated.sum(axis=1))
+    if top:
+        order = order[:top]
+    operations = [{
+        'service': profiles[i].service,
+        'operation': profiles[i].operation,
+        'monthlyCost': {segment: float(allocated[i, s]) for s, segment in enumerate(SEGMENTS)},
+        'unitCost': {segment: float(result['unit_cost'][i, s]) for s, segment in enumerate(SEGMENTS)},
+    } for i in order]
+
+    return {
+        'allocationKeys': result['allocation_keys'],
+        'segments': segments,
+        'services': {
+            service: {
+                'monthlyCost': float(service_costs[j].sum()),
+                'segments': {segment: float(service_costs[j, s]) for s, segment in enumerate(SEGMENTS)},
+            }
+            for j, service in enumerate(services)
+        },
+        'operations': operations,
+    }
+
+def price_customers(result: Dict, segment_index: np.ndarray, usage_scale: Optional[np.ndarray] = None) -> np.ndarray:
+    """Monthly showback charge for every customer at once.
+
+    segment_index holds 0/1/2 (retail/sme/corporate) per customer and
+    usage_scale an optional activity multiplier relative to the segment's
+    average customer.
+    """
+    counts = result['weights']['counts']
+    per_customer = np.divide(result['allocated'].sum(axis=0), counts,
+                             out=np.zeros(len(counts)), where=counts > 0)
+    charges = per_customer[segment_index]
+    return charges * usage_scale if usage_scale is not None else charges
+
+def print_attribution_report(summary: Dict, top: int = 15):
+    """Print showback by segment, service and most expensive operations"""
+    from utils import format_cost
+
+    print("\n" + "="*100)
+    print("GALAXY PLATFORM - COST ATTRIBUTION (SHOWBACK)")
+    print("="*100)
+    print(f"{'Segment':<12} {'Monthly Cost':>15} {'Per Customer':>15}")
+    print("-"*100)
+    for segment, data in summary['segments'].items():
+        print(f"{segment.title():<12} {format_cost(data['monthlyCost']):>15} {data['costPerCustomer']:>15.4f}")
+
+    print("\n" + "-"*100)
+    print(f"{'Service':<12} {'Monthly Cost':>15} " + " ".join(f"{s.title():>15}" for s in SEGMENTS))
+    print("-"*100)
+    for service, data in sorted(summary['services'].items(), key=lambda x: x[1]['monthlyCost'], reverse=True):
+        print(f"{service:<12} {format_cost(data['monthlyCost']):>15} " +
+              " ".join(f"{format_cost(data['segments'][s]):>15}" for s in SEGMENTS))
+
+    print("\n" + "-"*100)
+    print(f"{'Operation':<45} {'Monthly Cost':>13} " + " ".join(f"{s.title() + ' $/op':>13}" for s in SEGMENTS))
+    print("-"*100)
+    for op in summary['operations'][:top]:
+        name = f"{op['service']} / {op['operation']}"
+        print(f"{name[:45]:<45} {format_cost(sum(op['monthlyCost'].values())):>13} " +
+              " ".join(f"{op['unitCost'][s]:>13.2e}" for s in SEGMENTS))
+    print("="*100)
+
+def main():
+    """Main function for cost attribution"""
+    parser = argparse.ArgumentParser(description='Galaxy Platform Cost Attribution')
+    parser.add_argument('--retail', type=int, default=1000000, help='Number of retail customers')
+    parser.add_argument('--sme', type=int, default=100000, help='Number of SME customers')
+    parser.add_argument('--corporate', type=int, default=10000, help='Number of corporate customers')
+    parser.add_argument('--provider', choices=['aws', 'gcp', 'azure', 'generic'], default='gcp',
+                       help='Cloud provider for pricing')
+    parser.add_argument('--key', action='append', default=[], metavar='COMPONENT=KEY',
+                        help='Override an allocation key, e.g. database=bytes_written (repeatable)')
+    parser.add_argument('--top', type=int, default=15, help='Operations to list')
+
+    args = parser.parse_args()
+
+    from whatif_model import WhatIfSession
+
+    session = WhatIfSession(args.retail, args.sme, args.corporate, args.provider)
+    overrides = dict(k.split('=', 1) for k in args.key)
+    weights = build_allocation_weights(args.retail, args.sme, args.corporate)
+    result = attribute_costs(session.totals['components'], weights, overrides)
+    print_attribution_report(attribution_summary(result), args.top)
+    return 0
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Cost graph engine for Galaxy Platform
+Declares metrics and cost components as nodes with explicit inputs, evaluated
+lazily with per-node memoization. Many scenarios can be evaluated in one batch
+sharing every intermediate that does not depend on what varies between them.
+"""
+
+import argparse
+import inspect
+import sys
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+_REQUIRED = object()
+
+@dataclass
+class Node:
+    """A named value in the graph: an input (fn is None) or a function of other nodes"""
+    name: str
+    inputs: Tuple[str, ...] = ()
+    fn: Optional[Callable] = None
+    default: Any = _REQUIRED
+    doc: str = ''
+    leaves: Tuple[str, ...] = ()  # Graph inputs this node transitively depends on
+
+@dataclass
+class NodeStats:
+    """Evaluation counters for one node, for profiling"""
+    calls: int = 0
+    hits: int = 0
+    seconds: float = 0.0
+
+class CostGraph:
+    """Dependency graph of metrics and cost components"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.nodes: Dict[str, Node] = {}
+        self.stats: Dict[str, NodeStats] = {}
+        self._order: Optional[List[str]] = None
+
+    def input(self, name: str, default: Any = _REQUIRED, doc: str = '') -> 'CostGraph':
+        """Declare a scenario input, optionally with a default value"""
+        self.nodes[name] = Node(name, default=default, doc=doc)
+        self._order = None
+        return self
+
+    def add(self, name: str, fn: Callable, inputs: Iterable[str], doc: Optional[str] = None) -> 'CostGraph':
+        """Declare a computed node; fn is called with the input values in order"""
+        self.nodes[name] = Node(name, tuple(inputs), fn, doc=doc if doc is not None else (fn.__doc__ or '').strip())
+        self._order = None
+        return self
+
+    def node(self, name: Optional[str] = None, inputs: Optional[Iterable[str]] = None):
+        """Decorator form of add(); inputs default to the function's parameter names"""
+        def register(fn: Callable) -> Callable:
+            params = inputs if inputs is not None else inspect.signature(fn).parameters
+            self.add(name or fn.__name__, fn, params)
+            return fn
+        return register
+
+    def order(self) -> List[str]:
+        """Topological order of all nodes; validates inputs and rejects cycles"""
+        if self._order is not None:
+            return self._order
+
+        order, state = [], {}
+
+        def visit(name: str, path: Tuple[str, ...]):
+            if state.get(name) == 'done':
+                return
+            if state.get(name) == 'active':
+                raise ValueError(f"Cycle in {self.name} graph: {' -> '.join(path + (name,))}")
+            if name not in self.nodes:
+                raise KeyError(f"{path[-1]} depends on unknown node {name!r} in {self.name} graph")
+            state[name] = 'active'
+            node = self.nodes[name]
+            leaves = set() if node.fn else {name}
+            for dependency in node.inputs:
+                visit(dependency, path + (name,))
+                leaves.update(self.nodes[dependency].leaves)
+            node.leaves = tuple(sorted(leaves))
+            state[name] = 'done'
+            order.append(name)
+
+        for name in self.nodes:
+            visit(name, ())
+        self._order = order
+        return order
+
+    def outputs(self) -> List[str]:
+        """Computed nodes no other node depends on"""
+        used = {i for node in self.nodes.values() for i in node.inputs}
+        return [name for name in self.order() if self.nodes[name].fn and name not in used]
+
+    def evaluate(self, outputs: Optional[Iterable[str]] = None, cache: Optional[Dict] = None,
+                 **inputs) -> Dict[str, Any]:
+        """Evaluate the requested nodes (default: all outputs), computing only what they need"""
+        self.order()
+        evaluation = _Evaluation(self, inputs, {} if cache is None else cache)
+        return {name: evaluation.get(name) for name in (outputs or self.outputs())}
+
+    def batch(self, scenarios: List[Dict[str, Any]], outputs: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """Evaluate many scenarios sharing one memo.
+
+        A node's value is cached under the values of the graph inputs it
+        depends on, so a pricing-only node is computed once for a batch that
+        varies customer counts. Unhashable inputs are keyed by identity, so
+        scenarios should share the same pricing object where they can.
+        """
+        cache: Dict = {}
+        outputs = list(outputs or self.outputs())
+        return [self.evaluate(outputs, cache, **scenario) for scenario in scenarios]
+
+    def describe(self) -> Dict[str, Any]:
+        """Graph structure for introspection: nodes, edges, leaf inputs and evaluation order"""
+        return {
+            'name': self.name,
+            'order': self.order(),
+            'outputs': self.outputs(),
+            'nodes': {
+                name: {
+                    'kind': 'computed' if node.fn else 'input',
+                    'inputs': list(node.inputs),
+                    'depends_on_inputs': list(node.leaves),
+                    'doc': node.doc,
+                }
+                for name, node in self.nodes.items()
+            },
+        }
+
+    def profile(self) -> List[Dict[str, Any]]:
+        """Per-node call counts, cache hits and time, slowest first"""
+        rows = [{'node': name, 'calls': s.calls, 'hits': s.hits, 'seconds': s.seconds}
+                for name, s in self.stats.items()]
+        return sorted(rows, key=lambda r: r['seconds'], reverse=True)
+
+    def reset_stats(self):
+        self.stats.clear()
+
+    def to_dot(self) -> str:
+        """Graphviz representation of the graph"""
+        lines = [f'digraph "{self.name}" {{', '  rankdir=LR;']
+        for name, node in self.nodes.items():
+            shape = 'box' if node.fn else 'ellipse'
+            lines.append(f'  "{name}" [shape={shape}];')
+            lines.extend(f'  "{dependency}" -> "{name}";' for dependency in node.inputs)
+        lines.append('}')
+        return '\n'.join(lines)
+
+def _cache_key(value: Any) -> Any:
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return ('id', id(value))
+
+class _Evaluation:
+    """One scenario's lazy evaluation against a (possibly shared) memo"""
+
+    def __init__(self, graph: CostGraph, inputs: Dict[str, Any], cache: Dict):
+        unknown = set(inputs) - set(graph.nodes)
+        if unknown:
+            raise KeyError(f"Unknown inputs for {graph.name} graph: {', '.join(sorted(unknown))}")
+        self.graph = graph
+        self.inputs = inputs
+        self.cache = cache
+        self.values: Dict[str, Any] = {}
+
+    def _input(self, node: Node) -> Any:
+        if node.name in self.inputs:
+            return self.inputs[node.name]
+        if node.default is _REQUIRED:
+            raise KeyError(f"Missing input {node.name!r} for {self.graph.name} graph")
+        return node.default
+
+    def get(self, name: str) -> Any:
+        if name in self.values:
+            return self.values[name]
+
+        node = self.graph.nodes[name]
+        if node.fn is None:
+            value = self._input(node)
+        else:
+            stats = self.graph.stats.setdefault(name, NodeStats())
+            key = (name,) + tuple(_cache_key(self._input(self.graph.nodes[leaf])) for leaf in node.leaves)
+            if key in self.cache:
+                stats.hits += 1
+                value = self.cache[key]
+            else:
+                args = [self.get(dependency) for dependency in node.inputs]
+                start = time.perf_counter()
+                value = node.fn(*args)
+                stats.seconds += time.perf_counter() - start
+                stats.calls += 1
+                self.cache[key] = value
+
+        self.values[name] = value
+        return value
+
+def cloud_cost_graph() -> CostGraph:
+    """The complete 12-service model priced with calculate_with_cloud_pricing, as a graph"""
+    from galaxy_complete_cost_model import calculate_complete_galaxy_metrics
+    from galaxy_cloud_calculator import CLOUD_COMPONENTS
+
+    graph = CostGraph('cloud')
+    graph.input('customer_count', doc='Total customers')
+    graph.input('pricing', doc='Pricing dict from load_cloud_pricing')
+    graph.input('architecture_variant', 'single_region_3az')
+    graph.input('backup_retention_days', 30)
+    graph.input('log_retention_days', 90)
+    graph.input('include_nonprod', True)
+
+    @graph.node()
+    def metrics(customer_count, architecture_variant, backup_retention_days, log_retention_days):
+        """Shared sizing metrics (data volumes, TPS) from calculate_complete_galaxy_metrics"""
+        return calculate_complete_galaxy_metrics({
+            'customer_count': customer_count,
+            'architecture_variant': architecture_variant,
+            'backup_retention_days': backup_retention_days,
+            'log_retention_days': log_retention_days,
+        })
+
+    # Components that only read pricing are declared without metrics so they
+    # are shared across scenarios with different customer counts
+    pricing_only = {'cache_queue', 'security', 'cicd'}
+    for name, estimate in CLOUD_COMPONENTS.items():
+        if name in pricing_only:
+            graph.add(name, lambda pricing, variant, estimate=estimate: estimate({}, pricing, variant),
+                      ['pricing', 'architecture_variant'], doc=f"{name} cost")
+        else:
+            graph.add(name, estimate, ['metrics', 'pricing', 'architecture_variant'], doc=f"{name} cost")
+
+    graph.add('production_total', lambda *costs: sum(costs), list(CLOUD_COMPONENTS),
+              doc='Sum of production components')
+    graph.add('non_production', lambda total, include: total * 0.4 if include else 0,
+              ['production_total', 'include_nonprod'], doc='Dev / staging / UAT environments')
+    graph.add('total_monthly', lambda total, include: total * 1.4 if include else total,
+              ['production_total', 'include_nonprod'])
+    graph.add('cost_per_customer', lambda total, customers: total / customers if customers > 0 else 0,
+              ['total_monthly', 'customer_count'])
+    return graph
+
+def main():
+    """Main function for cost graph introspection"""
+    parser = argparse.ArgumentParser(description='Galaxy Platform Cost Graph')
+    parser.add_argument('--graph', choices=['cloud', 'growth'], default='cloud', help='Graph to inspect')
+    parser.add_argument('--dot', action='store_true', help='Print Graphviz DOT instead of a summary')
+    parser.add_argument('--provider', choices=['aws', 'gcp', 'azure', 'generic'], default='generic',
+                       help='Cloud provider for pricing (cloud graph)')
+    parser.add_argument('--customers', type=int, nargs='+', default=[10000, 100000, 1000000],
+                        help='Customer counts to batch-evaluate')
+
+    args = parser.parse_args()
+
+    from utils import format_cost
+
+    if args.graph == 'cloud':
+        from galaxy_cloud_calculator import load_cloud_pricing
+        graph = cloud_cost_graph()
+        pricing = load_cloud_pricing(args.provider)
+        scenarios = [{'customer_count': c, 'pricing': pricing} for c in args.customers]
+    else:
+        from growth_projection_model import GROWTH_GRAPH as graph
+        scenarios = [{'customer_count': c} for c in args.customers]
+
+    if args.dot:
+        print(graph.to_dot())
+        return 0
+
+    description = graph.describe()
+    print(f"\n{graph.name} graph: {len(description['nodes'])} nodes, outputs: {', '.join(description['outputs'])}")
+    for name in description['order']:
+        node = description['nodes'][name]
+        if node['kind'] == 'computed':
+            print(f"  {name:<20} <- {', '.join(node['inputs'])}")
+
+    graph.reset_stats()
+    results = graph.batch(scenarios, ['total_monthly'])
+    print()
+    for scenario, result in zip(scenarios, results):
+        print(f"  {scenario['customer_count']:>12,} customers: {format_cost(result['total_monthly'])}/month")
+
+    print(f"\n{'Node':<20} {'Calls':>6} {'Hits':>6} {'Time (ms)':>10}")
+    for row in graph.profile():
+        print(f"{row['node']:<20} {row['calls']:>6} {row['hits']:>6} {row['seconds'] * 1000:>10.3f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -346,7 +346,7 @@ def calculate_all_costs(metrics: Dict, pricing: Dict) -> Dict:
     
     return costs
 
-def main():
+def main(argv=None):
     """Main function to run the cost estimation model"""
     parser = argparse.ArgumentParser(description='Core Banking Infrastructure Cost Estimation Model')
     parser.add_argument('config', help='Path to configuration file (YAML or JSON)')
@@ -355,7 +355,7 @@ def main():
     parser.add_argument('--charts', action='store_true', help='Generate visualization charts')
     parser.add_argument('--include-nonprod', action='store_true', help='Include non-production environment costs')
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     try:
         # Load configuration
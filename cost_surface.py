@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Cost-surface cache for Galaxy Platform
+Precomputes segment costs over a grid of retail / SME / corporate counts and
+volume multipliers per (provider, architecture, includeNonProd), and answers
+interactive queries by multilinear interpolation with an error estimate
+"""
+
+import argparse
+import itertools
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+from galaxy_cloud_calculator import (
+    CLOUD_COMPONENTS,
+    calculate_segment_metrics,
+    calculate_with_cloud_pricing,
+    load_cloud_pricing
+)
+
+CONFIG_DIR = Path(__file__).parent
+
+# Grid nodes per axis; denser where costs bend (small fleets)
+DEFAULT_GRID = {
+    'retail': [0, 10000, 50000, 100000, 500000, 1000000, 2500000, 5000000, 10000000],
+    'sme': [0, 1000, 5000, 10000, 50000, 100000, 250000, 500000, 1000000],
+    'corporate': [0, 100, 500, 1000, 5000, 10000, 25000, 50000, 100000],
+    'volume_multiplier': [0.5, 1.0, 1.5, 2.0, 3.0],
+}
+
+# Interpolated answers from cells whose estimated error exceeds this are refused
+DEFAULT_MAX_RELATIVE_ERROR = 0.02
+
+# Floor for the error estimate, covering floating-point rounding between nodes
+RELATIVE_ERROR_FLOOR = 1e-9
+
+OUTPUTS = list(CLOUD_COMPONENTS) + ['non_production', 'total_monthly']
+
+SurfaceKey = Tuple[str, str, bool]
+
+def source_stamp(provider: str) -> Tuple:
+    """Modification times of the files a surface was built from"""
+    sources = [CONFIG_DIR / 'volume_config.yaml']
+    if provider != 'generic':
+        sources.append(CONFIG_DIR / f'pricing_{provider}.yaml')
+    return tuple(path.stat().st_mtime_ns if path.exists() else None for path in sources)
+
+def _exact(retail: float, sme: float, corporate: float, multiplier: float, pricing: Dict,
+           architecture: str, include_nonprod: bool) -> 'np.ndarray':
+    import numpy as np
+    metrics, _ = calculate_segment_metrics(int(round(retail)), int(round(sme)), int(round(corporate)),
+                                           architecture, include_nonprod, multiplier)
+    costs = calculate_with_cloud_pricing(metrics, pricing)
+    return np.array([costs['components'].get(name, 0) for name in OUTPUTS[:-1]] + [costs['total_monthly']])
+
+class CostSurface:
+    """Costs on a 4-D grid with a per-cell relative error estimate"""
+
+    def __init__(self, key: SurfaceKey, grid: Optional[Dict[str, List[float]]] = None):
+        # numpy is imported when the first surface is built, not with the API server
+        import numpy as np
+
+        provider, architecture, include_nonprod = key
+        self.key = key
+        self.stamp = source_stamp(provider)
+        self.axes = [np.array(values, dtype=float) for values in (grid or DEFAULT_GRID).values()]
+        pricing = load_cloud_pricing(provider)
+
+        start = time.perf_counter()
+        self.values = np.empty([len(a) for a in self.axes] + [len(OUTPUTS)])
+        for index in itertools.product(*(range(len(a)) for a in self.axes)):
+            point = [a[i] for a, i in zip(self.axes, index)]
+            self.values[index] = _exact(*point, pricing, architecture, include_nonprod)
+
+        # Check every cell at its centre, where linear interpolation of a
+        # smooth cost is furthest from the nodes
+        self.cell_error = np.empty([len(a) - 1 for a in self.axes])
+        for index in itertools.product(*(range(len(a) - 1) for a in self.axes)):
+            centre = [(a[i] + a[i + 1]) / 2 for a, i in zip(self.axes, index)]
+            exact = _exact(*centre, pricing, architecture, include_nonprod)[-1]
+            approx = self._interpolate(centre)[0][-1]
+            self.cell_error[index] = max(abs(approx - exact) / exact if exact else 0.0, RELATIVE_ERROR_FLOOR)
+
+        self.points = self.values[..., 0].size + self.cell_error.size
+        self.build_seconds = time.perf_counter() - start
+        self.built_at = time.time()
+
+    def _interpolate(self, point: List[float]) -> Tuple['np.ndarray', Tuple[int, ...]]:
+        """Multilinear interpolation over the 2^4 corners of the enclosing cell"""
+        import numpy as np
+
+        cell, weights = [], []
+        for axis, x in zip(self.axes, point):
+            i = min(max(int(np.searchsorted(axis, x, side='right')) - 1, 0), len(axis) - 2)
+            cell.append(i)
+            weights.append((x - axis[i]) / (axis[i + 1] - axis[i]))
+
+        result = np.zeros(len(OUTPUTS))
+        for corner in itertools.product((0, 1), repeat=len(self.axes)):
+            w = 1.0
+            for bit, t in zip(corner, weights):
+                w *= t if bit else 1 - t
+            if w:
+                result += w * self.values[tuple(i + bit for i, bit in zip(cell, corner))]
+        return result, tuple(cell)
+
+    def contains(self, point: List[float]) -> bool:
+        return all(axis[0] <= x <= axis[-1] for axis, x in zip(self.axes, point))
+
+    def query(self, retail: int, sme: int, corporate: int, volume_multiplier: float = 1.0) -> Optional[Dict]:
+        """Interpolated costs, or None if the point lies outside the grid"""
+        point = [retail, sme, corporate, volume_multiplier]
+        if not self.contains(point):
+            return None
+        values, cell = self._interpolate(point)
+        total = values[-1]
+        relative_error = float(self.cell_error[cell])
+        customers = retail + sme + corporate
+        return {
+            'components': {name: float(v) for name, v in zip(OUTPUTS[:-1], values[:-1])
+                           if name != 'non_production' or self.key[2]},
+            'total_monthly': float(total),
+            'total_annual': float(total * 12),
+            'cost_per_customer': float(total / customers) if customers > 0 else 0,
+            'relative_error': relative_error,
+            'error_bound': float(total * relative_error),
+        }
+
+class CostSurfaceCache:
+    """Cost surfaces per (provider, architecture, includeNonProd), rebuilt in the background.
+
+    A query for a surface that is missing or built from files that have since
+    changed starts a rebuild and returns None, so the caller computes the
+    exact cost in the meantime.
+    """
+
+    def __init__(self, grid: Optional[Dict[str, List[float]]] = None,
+                 max_relative_error: float = DEFAULT_MAX_RELATIVE_ERROR):
+        self.grid = grid
+        self.max_relative_error = max_relative_error
+        self.surfaces: Dict[SurfaceKey, CostSurface] = {}
+        self.building: Dict[SurfaceKey, threading.Thread] = {}
+        self.errors: Dict[SurfaceKey, str] = {}
+        self.lock = threading.Lock()
+
+    def _build(self, key: SurfaceKey):
+        try:
+            surface = CostSurface(key, self.grid)
+            with self.lock:
+                self.surfaces[key] = surface
+                self.errors.pop(key, None)
+        except Exception as e:
+            with self.lock:
+                self.errors[key] = str(e)
+        finally:
+            with self.lock:
+                self.building.pop(key, None)
+
+    def rebuild(self, key: SurfaceKey, wait: bool = False) -> threading.Thread:
+        """Start (or join) a background build of one surface"""
+        with self.lock:
+            thread = self.building.get(key)
+            if thread is None:
+                thread = threading.Thread(target=self._build, args=(key,), daemon=True,
+                                          name=f"cost-surface-{'-'.join(map(str, key))}")
+                self.building[key] = thread
+                thread.start()
+        if wait:
+            thread.join()
+        return thread
+
+    def get(self, key: SurfaceKey) -> Optional[CostSurface]:
+        """The current surface for key, starting a rebuild if it is missing or stale"""
+        with self.lock:
+            surface = self.surfaces.get(key)
+        if surface is not None and surface.stamp == source_stamp(key[0]):
+            return surface
+        self.rebuild(key)
+        return None
+
+    def query(self, provider: str, architecture: str, include_nonprod: bool, retail: int, sme: int,
+              corporate: int, volume_multiplier: float = 1.0) -> Optional[Dict]:
+        """Interpolated costs, or None when the caller should compute exactly"""
+        surface = self.get((provider, architecture, bool(include_nonprod)))
+        if surface is None:
+            return None
+        result = surface.query(retail, sme, corporate, volume_multiplier)
+        if result is None or result['relative_error'] > self.max_relative_error:
+            return None
+        return result
+
+    def invalidate(self, provider: Optional[str] = None):
+        """Drop surfaces (for one provider, or all) so the next query rebuilds them"""
+        with self.lock:
+            for key in [k for k in self.surfaces if provider is None or k[0] == provider]:
+                del self.surfaces[key]
+
+    def status(self) -> List[Dict]:
+        with self.lock:
+            keys = set(self.surfaces) | set(self.building) | set(self.errors)
+            return [{
+                'provider': key[0],
+                'architecture': key[1],
+                'includeNonProd': key[2],
+                'ready': key in self.surfaces,
+                'building': key in self.building,
+                'error': self.errors.get(key),
+                'points': self.surfaces[key].points if key in self.surfaces else None,
+                'buildSeconds': self.surfaces[key].build_seconds if key in self.surfaces else None,
+                'maxRelativeError': float(self.surfaces[key].cell_error.max()) if key in self.surfaces else None,
+            } for key in sorted(keys)]
+
+def main():
+    """Main function for cost-surface accuracy checks"""
+    parser = argparse.ArgumentParser(description='Galaxy Platform Cost Surface')
+    parser.add_argument('--provider', choices=['aws', 'gcp', 'azure', 'generic'], default='gcp',
+                       help='Cloud provider for pricing')
+    parser.add_argument('--architecture', default='single_region_3az', help='Architecture variant')
+    parser.add_argument('--no-nonprod', action='store_true', help='Exclude non-production costs')
+    parser.add_argument('--samples', type=int, default=200, help='Random points to check against exact costs')
+
+    args = parser.parse_args()
+
+    import numpy as np
+    from utils import format_cost
+
+    key = (args.provider, args.architecture, not args.no_nonprod)
+    surface = CostSurface(key)
+    print(f"Built {surface.points:,} points in {surface.build_seconds:.2f}s; "
+          f"largest cell error estimate {surface.cell_error.max():.3%}")
+
+    rng = np.random.default_rng(0)
+    pricing = load_cloud_pricing(args.provider)
+    errors, within = [], 0
+    for _ in range(args.samples):
+        point = [rng.uniform(axis[0], axis[-1]) for axis in surface.axes]
+        point[:3] = [int(x) for x in point[:3]]
+        approx = surface.query(*point)
+        exact = _exact(*point, pricing, args.architecture, not args.no_nonprod)[-1]
+        error = abs(approx['total_monthly'] - exact)
+        errors.append(error / exact)
+        within += error <= approx['error_bound']
+
+    print(f"{args.samples} random points: mean error {np.mean(errors):.3%}, max {np.max(errors):.3%}, "
+          f"{within} within the reported bound")
+    example = surface.query(1000000, 100000, 10000)
+    print(f"1M / 100K / 10K customers: {format_cost(example['total_monthly'])} "
+          f"± {format_cost(example['error_bound'])}")
+    return 0
+
+if __name__ == "__main__":
+    main()
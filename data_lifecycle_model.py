@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Data lifecycle model for Galaxy Platform
+Simulates month-by-month data accumulation per service and operation with
+retention, expiry and hot/warm/cold tier transitions
+"""
+
+import argparse
+import math
+from typing import Dict, List, Optional
+import numpy as np
+
+from segment_operations_model import get_operation_profiles
+
+# Age boundaries in months: data is hot while age < hot_months, warm until
+# warm_months, cold until retention_months and expired afterwards.
+# None means the data never leaves that tier.
+DEFAULT_DATA_CLASSES = {
+    'ledger':      {'hot_months': 24, 'warm_months': 60, 'retention_months': 120},  # 10y regulatory
+    'transaction': {'hot_months': 13, 'warm_months': 36, 'retention_months': 120},
+    'customer':    {'hot_months': 36, 'warm_months': 84, 'retention_months': 120},
+    'interaction': {'hot_months': 12, 'warm_months': 36, 'retention_months': 84},
+    'audit':       {'hot_months': 12, 'warm_months': 24, 'retention_months': 84},
+    'event':       {'hot_months': 3,  'warm_months': 12, 'retention_months': None},  # from log_retention_days
+    'config':      {'hot_months': None, 'warm_months': None, 'retention_months': None},
+}
+
+SERVICE_DATA_CLASS = {
+    'PROXIMA': 'ledger',
+    'TITAN': 'transaction',
+    'ORION': 'customer',
+    'QUASAR': 'customer',
+    'KRYPTON': 'customer',
+    'ASTER': 'customer',
+    'NEBULA': 'interaction',
+    'APHELION': 'event',
+    'PULSAR': 'event',
+    'HORIZON': 'event',
+    'POLARIS': 'config',
+    'DRACO': 'audit',
+}
+
+# Pricing keys per tier, first one present in the provider file wins
+TIER_PRICE_KEYS = {
+    'hot': [('database', 'storage_gb')],
+    'warm': [('storage', 'object_infrequent_gb'), ('storage', 'object_nearline_gb'),
+             ('storage', 'object_cool_gb'), ('storage', 'object_standard_gb')],
+    'cold': [('storage', 'object_archive_gb'), ('storage', 'object_coldline_gb')],
+}
+
+# Indexes, WAL and bloat on data held in the database (same as the complete model)
+HOT_INDEX_OVERHEAD = 1.5
+
+def get_tier_prices(pricing: Dict) -> Dict[str, float]:
+    """Resolve a per GB-month price for each storage tier from a provider pricing dict"""
+    prices = {}
+    for tier, keys in TIER_PRICE_KEYS.items():
+        for section, key in keys:
+            if key in pricing.get(section, {}):
+                prices[tier] = pricing[section][key]
+                break
+        else:
+            raise KeyError(f"No price found for {tier} tier (tried {', '.join(k for _, k in keys)})")
+    prices['backup'] = pricing['database'].get('backup_gb', pricing['backup_dr']['snapshot_gb'])
+    return prices
+
+def build_data_classes(config: Optional[Dict] = None) -> Dict[str, Dict]:
+    """Apply retention settings from a cost config to the default data classes"""
+    config = config or {}
+    classes = {name: dict(rule) for name, rule in DEFAULT_DATA_CLASSES.items()}
+    for name, rule in config.get('data_classes', {}).items():
+        classes.setdefault(name, {}).update(rule)
+
+    log_months = math.ceil(config.get('log_retention_days', 90) / 30.4)
+    event = classes['event']
+    if event.get('retention_months') is None:
+        event['retention_months'] = log_months
+    event['warm_months'] = min(event['warm_months'] or log_months, event['retention_months'])
+    event['hot_months'] = min(event['hot_months'] or log_months, event['warm_months'])
+    return classes
+
+def _window(cumulative: np.ndarray, months: int, lo: Optional[int], hi: Optional[int]) -> np.ndarray:
+    """GB written with an age in [lo, hi) at every month, from a left-padded cumulative sum.
+
+    cumulative has shape (rows, months + 1) with a leading zero column, so
+    cumulative[:, k + 1] is everything written up to and including month k.
+    """
+    month_index = np.arange(months)
+    if lo is None:
+        return np.zeros((cumulative.shape[0], months))
+
+    upper = np.clip(month_index - lo + 1, 0, months)
+    total = cumulative[:, upper]
+    if hi is not None:
+        lower = np.clip(month_index - hi + 1, 0, months)
+        total = total - cumulative[:, lower]
+    return total
+
+def simulate_data_lifecycle(retail_count: int, sme_count: int, corporate_count: int,
+                            pricing: Dict, months: int = 120, growth_rate: float = 0.0,
+                            volume_multiplier: float = 1.0, config: Optional[Dict] = None) -> Dict:
+    """Simulate accumulated GB and storage cost per tier for every month of the horizon.
+
+    Every write operation is a row; all rows and months are processed as
+    matrices so a 10 year horizon costs a handful of numpy operations.
+    """
+    config = config or {}
+    classes = build_data_classes(config)
+    prices = get_tier_prices(pricing)
+    backup_factor = 1 + config.get('backup_retention_days', 30) / 7
+
+    profiles = [p for p in get_operation_profiles() if p.is_write_operation]
+    counts = np.array([retail_count, sme_count, corporate_count], dtype=float) * volume_multiplier
+    volumes = np.array([[p.retail_volume, p.sme_volume, p.corporate_volume] for p in profiles])
+    bytes_per_op = np.array([p.bytes_per_operation for p in profiles], dtype=float)
+    monthly_gb = (volumes @ counts) * bytes_per_op / (1024**3)
+
+    growth = (1 + growth_rate) ** np.arange(months)
+    written = monthly_gb[:, None] * growth[None, :]
+    cumulative = np.concatenate([np.zeros((len(profiles), 1)), np.cumsum(written, axis=1)], axis=1)
+
+    row_classes = [SERVICE_DATA_CLASS.get(p.service, 'transaction') for p in profiles]
+    hot = np.zeros_like(written)
+    warm = np.zeros_like(written)
+    cold = np.zeros_like(written)
+    for name in set(row_classes):
+        rows = np.array([c == name for c in row_classes])
+        rule = classes[name]
+        sub = cumulative[rows]
+        hot[rows] = _window(sub, months, 0, rule['hot_months'])
+        warm[rows] = _window(sub, months, rule['hot_months'], rule['warm_months'])
+        cold[rows] = _window(sub, months, rule['warm_months'], rule['retention_months'])
+
+    total_written = cumulative[:, 1:]
+    expired = total_written - hot - warm - cold
+
+    hot_billed = hot * HOT_INDEX_OVERHEAD
+    tier_costs = {
+        'hot': hot_billed.sum(axis=0) * prices['hot'],
+        'warm': warm.sum(axis=0) * prices['warm'],
+        'cold': cold.sum(axis=0) * prices['cold'],
+        'backup': hot_billed.sum(axis=0) * backup_factor * prices['backup'],
+    }
+    monthly_cost = sum(tier_costs.values())
+
+    services = list(dict.fromkeys(p.service for p in profiles))
+    # (services x rows) indicator, so per-service totals are one matrix product
+    by_service = np.array([[p.service == s for p in profiles] for s in services], dtype=float)
+
+    return {
+        'months': months,
+        'services': services,
+        'operations': [(p.service, p.operation, c) for p, c in zip(profiles, row_classes)],
+        'classes': classes,
+        'prices': prices,
+        'written_gb': written.sum(axis=0),
+        'hot_gb': hot.sum(axis=0),
+        'warm_gb': warm.sum(axis=0),
+        'cold_gb': cold.sum(axis=0),
+        'expired_gb': expired.sum(axis=0),
+        'tier_costs': tier_costs,
+        'monthly_cost': monthly_cost,
+        'total_cost': float(monthly_cost.sum()),
+        'service_hot_gb': by_service @ hot,
+        'service_stored_gb': by_service @ (hot + warm + cold),
+        'operation_stored_gb': hot + warm + cold,
+    }
+
+def lifecycle_summary(result: Dict, month: Optional[int] = None) -> Dict:
+    """JSON-friendly snapshot of the simulation at a 1-based month (default: last)"""
+    m = result['months'] - 1 if month is None else max(0, min(month, result['months']) - 1)
+    return {
+        'month': m + 1,
+        'hot_gb': float(result['hot_gb'][m]),
+        'warm_gb': float(result['warm_gb'][m]),
+        'cold_gb': float(result['cold_gb'][m]),
+        'expired_gb': float(result['expired_gb'][m]),
+        'monthly_cost': float(result['monthly_cost'][m]),
+        'tier_costs': {tier: float(cost[m]) for tier, cost in result['tier_costs'].items()},
+        'cumulative_cost': float(result['monthly_cost'][:m + 1].sum()),
+        'services': {
+            service: {
+                'hot_gb': float(result['service_hot_gb'][i, m]),
+                'stored_gb': float(result['service_stored_gb'][i, m]),
+            }
+            for i, service in enumerate(result['services'])
+        },
+    }
+
+def print_lifecycle_report(result: Dict, checkpoints: List[int]):
+    """Print stored volume and storage cost at yearly checkpoints"""
+    from utils import format_cost
+
+    print("\n" + "="*100)
+    print("GALAXY PLATFORM - DATA LIFECYCLE SIMULATION")
+    print("="*100)
+    print(f"Horizon: {result['months']} months")
+    print("Tier prices ($/GB-month): " +
+          ", ".join(f"{tier} {price}" for tier, price in result['prices'].items()))
+
+    print("\n" + "-"*100)
+    print(f"{'Month':<7} {'Written/Mo':>12} {'Hot GB':>12} {'Warm GB':>12} {'Cold GB':>12} "
+          f"{'Expired GB':>12} {'Cost/Mo':>12} {'Cumulative':>12}")
+    print("-"*100)
+    for m in checkpoints:
+        i = m - 1
+        print(f"{m:<7} {result['written_gb'][i]:>12,.1f} {result['hot_gb'][i]:>12,.1f} "
+              f"{result['warm_gb'][i]:>12,.1f} {result['cold_gb'][i]:>12,.1f} "
+              f"{result['expired_gb'][i]:>12,.1f} {format_cost(result['monthly_cost'][i]):>12} "
+              f"{format_cost(result['monthly_cost'][:m].sum()):>12}")
+
+    last = lifecycle_summary(result)
+    print("\n" + "-"*100)
+    print(f"STORED DATA BY SERVICE (month {last['month']})")
+    print("-"*100)
+    for service, data in sorted(last['services'].items(), key=lambda x: x[1]['stored_gb'], reverse=True):
+        print(f"  {service:<12} hot {data['hot_gb']:>12,.1f} GB   total {data['stored_gb']:>12,.1f} GB")
+    print("="*100)
+
+def main():
+    """Main function for data lifecycle simulation"""
+    parser = argparse.ArgumentParser(description='Galaxy Platform Data Lifecycle Simulator')
+    parser.add_argument('--retail', type=int, default=1000000, help='Number of retail customers')
+    parser.add_argument('--sme', type=int, default=100000, help='Number of SME customers')
+    parser.add_argument('--corporate', type=int, default=10000, help='Number of corporate customers')
+    parser.add_argument('--multiplier', type=float, default=1.0, help='Volume multiplier for all operations')
+    parser.add_argument('--years', type=int, default=10, help='Simulation horizon in years')
+    parser.add_argument('--growth-rate', type=float, default=0.0, help='Monthly customer growth rate')
+    parser.add_argument('--provider', choices=['aws', 'gcp', 'azure', 'generic'], default='generic',
+                       help='Cloud provider for pricing')
+    parser.add_argument('--config', help='Cost config with backup/log retention settings')
+
+    args = parser.parse_args()
+
+    from galaxy_cloud_calculator import load_cloud_pricing
+    config = {}
+    if args.config:
+        from utils import load_config
+        config = load_config(args.config)
+
+    result = simulate_data_lifecycle(args.retail, args.sme, args.corporate, load_cloud_pricing(args.provider),
+                                     months=args.years * 12, growth_rate=args.growth_rate,
+                                     volume_multiplier=args.multiplier, config=config)
+    checkpoints = sorted(set([1, 6] + list(range(12, args.years * 12 + 1, 12))))
+    print_lifecycle_report(result, checkpoints)
+    return 0
+
+if __name__ == "__main__":
+    main()
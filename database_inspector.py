@@ -3,8 +3,6 @@ PostgreSQL Database Inspector
 Queries real PostgreSQL databases to get statistics and metadata
 """
 
-import psycopg2
-from psycopg2.extras import RealDictCursor
 import os
 from typing import Dict, List, Any
 import logging
@@ -27,6 +25,9 @@ class DatabaseInspector:
         config = self.default_config.copy()
         config['database'] = database
         try:
+            # psycopg2 is imported on first connection so importing this module stays cheap
+            import psycopg2
+            from psycopg2.extras import RealDictCursor
             return psycopg2.connect(**config, cursor_factory=RealDictCursor)
         except Exception as e:
             logger.error(f"Failed to connect to database {database}: {e}")
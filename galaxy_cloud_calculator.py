@@ -4,10 +4,14 @@ Galaxy Platform Multi-Cloud Cost Calculator
 Supports AWS, GCP, and Azure pricing
 """
 
+if __name__ == "__main__":
+    # Hand the run to a warm calculation daemon (calc_daemon.py) when one is listening
+    from calc_daemon import forward_cli
+    forward_cli(__file__)
+
 import argparse
-import yaml
 import sys
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 from pathlib import Path
 
 # Import the complete model functions
@@ -19,10 +23,17 @@ from galaxy_complete_cost_model import (
     estimate_complete_observability_cost,
     print_complete_galaxy_report
 )
-from utils import format_cost, load_config
+from segment_operations_model import calculate_total_volumes
+from utils import format_cost, load_config, load_yaml
+
+SECONDS_PER_MONTH = 30 * 24 * 3600
+
+def load_cloud_pricing(provider: str, region: Optional[str] = None) -> Dict[str, Any]:
+    """Load pricing configuration for specified cloud provider.
 
-def load_cloud_pricing(provider: str) -> Dict[str, Any]:
-    """Load pricing configuration for specified cloud provider"""
+    With a region, pricing is generated from the ingested price lists (see
+    pricing_ingest.py) instead of the single-region pricing file.
+    """
     pricing_files = {
         'aws': 'pricing_aws.yaml',
         'gcp': 'pricing_gcp.yaml',
@@ -33,6 +44,10 @@ def load_cloud_pricing(provider: str) -> Dict[str, Any]:
     if provider.lower() not in pricing_files:
         raise ValueError(f"Unsupported cloud provider: {provider}. Choose from: aws, gcp, azure, generic")
     
+    if region and provider.lower() != 'generic':
+        from pricing_ingest import generate_pricing
+        return generate_pricing(provider.lower(), region)
+    
     if provider.lower() == 'generic':
         # Use the default pricing from pricing_tables.py
         from pricing_tables import PRICING
@@ -44,10 +59,12 @@ def load_cloud_pricing(provider: str) -> Dict[str, Any]:
     if not pricing_path.exists():
         raise FileNotFoundError(f"Pricing file not found: {pricing_file}")
     
-    with open(pricing_path, 'r') as f:
-        pricing_data = yaml.safe_load(f)
+    pricing_data = load_yaml(pricing_path)
     
-    # Convert YAML structure to match expected format
+    return pricing_from_config(pricing_data, provider)
+
+def pricing_from_config(pricing_data: Dict[str, Any], provider: str) -> Dict[str, Any]:
+    """Convert a pricing YAML structure to the format the calculators expect"""
     return {
         'provider': pricing_data.get('provider', provider.upper()),
         'region': pricing_data.get('region', 'default'),
@@ -62,28 +79,45 @@ def load_cloud_pricing(provider: str) -> Dict[str, Any]:
         'observability': pricing_data.get('observability', {}),
         'backup_dr': pricing_data.get('backup_dr', {}),
         'cicd': pricing_data.get('cicd', {}),
+        'commitments': pricing_data.get('commitments', {}),
     }
 
+# metrics['compute_model'] values: a fixed fleet, or an hourly autoscaling replay
+COMPUTE_MODELS = ('fixed', 'autoscaling')
+
+def estimate_cloud_compute_cost(metrics: Dict, pricing: Dict, variant: str) -> float:
+    """Compute cost from the fixed fleet, or from an autoscaling replay when requested"""
+    if metrics.get('compute_model') == 'autoscaling' and metrics.get('hourly_demand'):
+        from autoscaling_model import estimate_autoscaled_compute_cost
+        return estimate_autoscaled_compute_cost(metrics, pricing, variant)
+    return estimate_complete_compute_cost(metrics, pricing, variant)
+
+# Production cost components, in report order. Each takes (metrics, pricing, variant).
+# The simplified entries would use the full estimation functions in production.
+CLOUD_COMPONENTS = {
+    'compute': estimate_cloud_compute_cost,
+    'database': estimate_complete_database_cost,
+    'observability': estimate_complete_observability_cost,
+    'cache_queue': lambda metrics, pricing, variant: len([s for s in GALAXY_SERVICES.values() if s.get('cache') or s.get('queue')]) * 100,
+    'api_gateway': lambda metrics, pricing, variant: (metrics['customer_api_tps'] * 86400 * 30 / 1000000) * pricing['api_gateway']['million_requests'],
+    'security': lambda metrics, pricing, variant: 30 * pricing['security']['kms_key'] + pricing['security'].get('ddos_protection_advanced', 3000),
+    'storage': lambda metrics, pricing, variant: metrics['total_data_gb'] * pricing['storage'].get('object_standard_gb', 0.023),
+    'network': lambda metrics, pricing, variant: (metrics['customer_count'] / 1000) * 5,
+    'backup_dr': lambda metrics, pricing, variant: metrics['total_data_gb'] * 30 * pricing['backup_dr']['snapshot_gb'],
+    'cicd': lambda metrics, pricing, variant: 800 * pricing['cicd']['build_minutes'] + 300 * pricing['cicd']['artifact_storage_gb'],
+}
+
 def calculate_with_cloud_pricing(metrics: Dict, pricing: Dict) -> Dict:
     """Calculate costs using cloud-specific pricing"""
+    # An explicit region layout replaces the flat architecture multiplier
+    if metrics.get('topology'):
+        from topology_model import calculate_topology_costs
+        return calculate_topology_costs(metrics, pricing)
+    
     variant = metrics['architecture_variant']
     
     # Calculate costs for each component
-    component_costs = {
-        'compute': estimate_complete_compute_cost(metrics, pricing, variant),
-        'database': estimate_complete_database_cost(metrics, pricing, variant),
-        'observability': estimate_complete_observability_cost(metrics, pricing, variant),
-    }
-    
-    # Simplified calculations for other components
-    # (In production, these would use the full estimation functions)
-    component_costs['cache_queue'] = len([s for s in GALAXY_SERVICES.values() if s.get('cache') or s.get('queue')]) * 100
-    component_costs['api_gateway'] = (metrics['customer_api_tps'] * 86400 * 30 / 1000000) * pricing['api_gateway']['million_requests']
-    component_costs['security'] = 30 * pricing['security']['kms_key'] + pricing['security'].get('ddos_protection_advanced', 3000)
-    component_costs['storage'] = metrics['total_data_gb'] * pricing['storage'].get('object_standard_gb', 0.023)
-    component_costs['network'] = (metrics['customer_count'] / 1000) * 5
-    component_costs['backup_dr'] = metrics['total_data_gb'] * 30 * pricing['backup_dr']['snapshot_gb']
-    component_costs['cicd'] = 800 * pricing['cicd']['build_minutes'] + 300 * pricing['cicd']['artifact_storage_gb']
+    component_costs = {name: estimate(metrics, pricing, variant) for name, estimate in CLOUD_COMPONENTS.items()}
     
     total_monthly = sum(component_costs.values())
     
@@ -101,6 +135,30 @@ def calculate_with_cloud_pricing(metrics: Dict, pricing: Dict) -> Dict:
         'cost_per_customer': total_monthly / metrics['customer_count'] if metrics['customer_count'] > 0 else 0,
     }
 
+def calculate_segment_metrics(retail_count: int, sme_count: int, corporate_count: int,
+                              architecture: str = 'single_region_3az', include_nonprod: bool = True,
+                              volume_multiplier: float = 1.0) -> Tuple[Dict, Dict]:
+    """Metrics sized on segment operation volumes, as /api/calculate-segment prices them.
+
+    Returns (metrics, totals) where totals is the calculate_total_volumes result.
+    """
+    totals = calculate_total_volumes(retail_count, sme_count, corporate_count, volume_multiplier)
+    metrics = calculate_complete_galaxy_metrics({
+        'customer_count': retail_count + sme_count + corporate_count,
+        'architecture_variant': architecture,
+        'backup_retention_days': 30,
+        'log_retention_days': 30  # Reduced for cost optimization
+    })
+    
+    # Transaction rate and data volume based on actual operation volumes
+    total_transactions = totals['services'].get('TITAN', {}).get('write_ops', 0) / SECONDS_PER_MONTH
+    metrics['transaction_tps'] = total_transactions
+    metrics['ledger_tps'] = total_transactions  # Ledger entries match transactions
+    metrics['customer_api_tps'] = totals['total_operations_month'] / SECONDS_PER_MONTH
+    metrics['total_data_gb'] = totals['total_data_gb_month'] * 12  # Annual data
+    metrics['include_nonprod'] = include_nonprod
+    return metrics, totals
+
 def compare_cloud_providers(config: Dict[str, Any]) -> None:
     """Compare costs across AWS, GCP, and Azure"""
     metrics = calculate_complete_galaxy_metrics(config)
@@ -230,7 +288,7 @@ def print_cloud_specific_report(costs: Dict, metrics: Dict):
     print(f"{'Cost per Customer/Month':.<30} ${costs['cost_per_customer']:.2f}")
     print("="*70)
 
-def main():
+def main(argv=None):
     """Main function for multi-cloud cost calculator"""
     parser = argparse.ArgumentParser(description='Galaxy Platform Multi-Cloud Cost Calculator')
     parser.add_argument('config', help='Path to configuration file')
@@ -238,8 +296,15 @@ def main():
                        default='generic', help='Cloud provider for pricing')
     parser.add_argument('--compare', action='store_true', help='Compare all cloud providers')
     parser.add_argument('--no-nonprod', action='store_true', help='Exclude non-production costs')
+    parser.add_argument('--region', help='Price a specific region from the ingested price lists (pricing_ingest.py)')
+    parser.add_argument('--store', metavar='PATH',
+                       help='Save the run to this scenario store (scenario_store.py); not saved by default')
+    parser.add_argument('--cached', action='store_true',
+                       help='Reuse a result from --store for identical config, pricing and model version')
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+    if args.cached and not args.store:
+        parser.error('--cached needs --store PATH')
     
     try:
         # Load configuration
@@ -255,10 +320,29 @@ def main():
         metrics['include_nonprod'] = not args.no_nonprod
         
         # Load pricing for specified provider
-        pricing = load_cloud_pricing(args.provider)
+        pricing = load_cloud_pricing(args.provider, args.region)
         
-        # Calculate costs
-        costs = calculate_with_cloud_pricing(metrics, pricing)
+        # Calculate costs, or reuse a stored result for the same inputs
+        from scenario_store import ScenarioStore, scenario_record, model_fingerprint
+        inputs = {'config': config, 'provider': args.provider, 'region': args.region,
+                  'include_nonprod': metrics['include_nonprod'], 'customer_count': metrics['customer_count'],
+                  'architecture': metrics['architecture_variant']}
+        store_config = {'model': model_fingerprint()}
+        cached = None
+        if args.cached:
+            with ScenarioStore(args.store) as store:
+                cached = store.find_cached(inputs, pricing, store_config)
+        
+        if cached and cached['response']:
+            costs = cached['response']
+            print(f"Using stored scenario {cached['id']}")
+        else:
+            costs = calculate_with_cloud_pricing(metrics, pricing)
+            if args.store:
+                with ScenarioStore(args.store) as store:
+                    scenario_id = store.save(scenario_record(inputs, costs['components'], costs['total_monthly'],
+                                                             'cli', pricing, store_config, costs))
+                print(f"Saved scenario {scenario_id} to {args.store}")
         
         # Print report
         print_cloud_specific_report(costs, metrics)
@@ -217,6 +217,10 @@ def calculate_complete_galaxy_metrics(config: Dict[str, Any]) -> Dict[str, Any]:
     ])
     metrics['total_data_gb'] = raw_data_gb * 1.5  # 50% overhead
     
+    # Optional explicit region layout (see topology_model.py)
+    if config.get('topology'):
+        metrics['topology'] = config['topology']
+    
     return metrics
 
 def estimate_complete_compute_cost(metrics: Dict, pricing: Dict, variant: str) -> float:
@@ -224,15 +228,21 @@ def estimate_complete_compute_cost(metrics: Dict, pricing: Dict, variant: str) -
     total_cost = 0
     hours_per_month = 730
     
+    # Fleet sized on simulated hourly peaks (load_profile_model.apply_peak_metrics), if any
+    peak_instances = metrics.get('peak_instances') or {}
+    
     for service_id, service in GALAXY_SERVICES.items():
+        instances = peak_instances.get(service_id, service['instances'])
+        
         # Base compute cost
-        vcpu_cost = (service['instances'] * service['cpu_per_instance'] * 
+        vcpu_cost = (instances * service['cpu_per_instance'] * 
                     pricing['compute']['vcpu_hour'] * hours_per_month)
-        memory_cost = (service['instances'] * service['memory_per_instance'] * 
+        memory_cost = (instances * service['memory_per_instance'] * 
                       pricing['compute']['memory_gb_hour'] * hours_per_month)
         
-        # Scale customer-facing and core services based on customer count
-        if service['tier'] in ['customer_facing', 'core']:
+        # Scale customer-facing and core services based on customer count,
+        # unless the fleet is already sized on peak demand
+        if service['tier'] in ['customer_facing', 'core'] and service_id not in peak_instances:
             scale_factor = 1 + (metrics['customer_count'] / 200000)  # Scale with customers
             vcpu_cost *= scale_factor
             memory_cost *= scale_factor
@@ -248,8 +258,8 @@ def estimate_complete_compute_cost(metrics: Dict, pricing: Dict, variant: str) -
     
     return apply_architecture_multiplier(total_cost, variant)
 
-def estimate_complete_database_cost(metrics: Dict, pricing: Dict, variant: str) -> float:
-    """Estimate database costs for all 12 services"""
+def estimate_database_instance_cost(pricing: Dict) -> float:
+    """Monthly cost of database instances (primaries and read replicas) for all services"""
     total_cost = 0
     
     db_size_map = {
@@ -271,6 +281,12 @@ def estimate_complete_database_cost(metrics: Dict, pricing: Dict, variant: str)
             
             total_cost += base_cost
     
+    return total_cost
+
+def estimate_complete_database_cost(metrics: Dict, pricing: Dict, variant: str) -> float:
+    """Estimate database costs for all 12 services"""
+    total_cost = estimate_database_instance_cost(pricing)
+    
     # Storage costs
     storage_cost = metrics['total_data_gb'] * pricing['database']['storage_gb']
     
@@ -394,14 +410,14 @@ def print_complete_galaxy_report(costs: Dict, metrics: Dict):
     print(f"{'Cost per Service/Month':.<30} {format_cost(costs['cost_per_service']):>15}")
     print("="*70)
 
-def main():
+def main(argv=None):
     """Main function for complete Galaxy cost estimation"""
     parser = argparse.ArgumentParser(description='Complete Galaxy Platform Cost Model (12 Services)')
     parser.add_argument('config', help='Path to configuration file')
     parser.add_argument('--compare', action='store_true', help='Compare architecture variants')
     parser.add_argument('--no-nonprod', action='store_true', help='Exclude non-production costs')
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     try:
         # Load config
@@ -409,14 +409,14 @@ def print_galaxy_report(costs: Dict, metrics: Dict):
     print(f"{'Cost per Customer/Month':.<30} {format_cost(costs['cost_per_customer']):>12}")
     print("="*60)
 
-def main():
+def main(argv=None):
     """Main function for Galaxy cost estimation"""
     parser = argparse.ArgumentParser(description='Galaxy Platform Cost Estimation Model')
     parser.add_argument('config', help='Path to configuration file')
     parser.add_argument('--compare', action='store_true', help='Compare architecture variants')
     parser.add_argument('--no-nonprod', action='store_true', help='Exclude non-production costs')
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     try:
         # Load config
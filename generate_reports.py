@@ -3,21 +3,20 @@
 Generate comprehensive cost reports in multiple formats
 """
 
-import json
-import subprocess
 from datetime import datetime
 from pathlib import Path
 import matplotlib.pyplot as plt
 import numpy as np
 
+from report_pipeline import DEFAULT_CACHE_DIR, ArtifactCache, build_reports, run_model_main
+
 def run_model(config_file, args="", use_complete=True):
-    """Run the cost model and capture output"""
-    model_script = "galaxy_complete_cost_model.py" if use_complete else "galaxy_cost_model.py"
-    cmd = f"source venv/bin/activate && python3 {model_script} {config_file} {args}"
-    result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-    return result.stdout
+    """Run the cost model in-process and capture its output"""
+    model = "galaxy_complete_cost_model" if use_complete else "galaxy_cost_model"
+    _, output, _ = run_model_main(model, [config_file] + args.split())
+    return output
 
-def generate_all_reports():
+def generate_all_reports(workers=None, cache_dir=DEFAULT_CACHE_DIR):
     """Generate all report formats"""
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     report_dir = Path(f"cost_reports_{timestamp}")
@@ -25,78 +24,8 @@ def generate_all_reports():
     
     print(f"Generating reports in {report_dir}/")
     
-    # 1. Complete Galaxy model report (12 services)
-    print("Running COMPLETE Galaxy model (12 services, 100K customers, single region)...")
-    output = run_model("galaxy_config.yaml", use_complete=True)
-    with open(report_dir / "galaxy_complete_100k_single_region.txt", "w") as f:
-        f.write(output)
-    
-    # 2. Complete Galaxy model with comparison
-    print("Running COMPLETE Galaxy model with architecture comparison...")
-    output = run_model("galaxy_config.yaml", "--compare", use_complete=True)
-    with open(report_dir / "galaxy_complete_architecture_comparison.txt", "w") as f:
-        f.write(output)
-    
-    # 3. Multi-region configuration
-    print("Running Galaxy model (500K customers, multi-region)...")
-    output = run_model("config_multiregion.yaml")
-    with open(report_dir / "galaxy_500k_multi_region.txt", "w") as f:
-        f.write(output)
-    
-    # 4. Generic model for comparison
-    print("Running generic model for comparison...")
-    cmd = "source venv/bin/activate && python3 cost_model.py config.yaml --sensitivity"
-    result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-    with open(report_dir / "generic_model_comparison.txt", "w") as f:
-        f.write(result.stdout)
-    
-    # 5. Create summary JSON
-    summary = {
-        "generated": timestamp,
-        "models": {
-            "complete_galaxy_100k_single": {
-                "customer_count": 100000,
-                "architecture": "single_region_3az",
-                "services": 12,
-                "monthly_cost": "$71.33K",
-                "annual_cost": "$855.91K",
-                "cost_per_customer": "$0.71"
-            },
-            "complete_galaxy_100k_multi": {
-                "customer_count": 100000,
-                "architecture": "multi_region_3az",
-                "services": 12,
-                "monthly_cost": "$183.90K",
-                "annual_cost": "$2.21M",
-                "cost_per_customer": "$1.84"
-            },
-            "partial_galaxy_100k_single": {
-                "customer_count": 100000,
-                "architecture": "single_region_3az",
-                "services": 7,
-                "monthly_cost": "$53.32K",
-                "annual_cost": "$639.83K",
-                "cost_per_customer": "$0.53"
-            }
-        },
-        "all_services": [
-            "proxima (Core Banking Ledger)",
-            "titan (Transaction Processing)",
-            "orion (Retail Customer Service)",
-            "quasar (Customer Verification)",
-            "krypton (Collateral Management)",
-            "aster (Approval Workflow)",
-            "polaris (Configuration Service)",
-            "draco (RBAC Service)",
-            "nebula (Contact Log Service)",
-            "aphelion (Analytics Service)",
-            "pulsar (Webhook Service)",
-            "horizon (BackOffice Application)"
-        ]
-    }
-    
-    with open(report_dir / "summary.json", "w") as f:
-        json.dump(summary, f, indent=2)
+    # Text reports run concurrently and are reused when unchanged; summary.json is built from their results
+    build_reports(report_dir, workers, cache=ArtifactCache(cache_dir) if cache_dir else None)
     
     print(f"\n✓ All reports generated in {report_dir}/")
     print("\nGenerated files:")
@@ -444,6 +373,6 @@ if __name__ == "__main__":
     print(f"All reports saved in: {report_dir}/")
     print(f"Open the HTML report: open {html_file}")
     print("\nTo view specific reports:")
-    print(f"  cat {report_dir}/galaxy_100k_single_region.txt")
-    print(f"  cat {report_dir}/galaxy_architecture_comparison.txt")
+    print(f"  cat {report_dir}/galaxy_complete_100k_single_region.txt")
+    print(f"  cat {report_dir}/galaxy_complete_architecture_comparison.txt")
     print(f"  cat {report_dir}/summary.json | python3 -m json.tool")
\ No newline at end of file
@@ -4,32 +4,46 @@ Growth projection model for Galaxy Platform
 Shows how costs evolve over time with customer growth
 """
 
-import yaml
+if __name__ == "__main__":
+    # Hand the run to a warm calculation daemon (calc_daemon.py) when one is listening
+    from calc_daemon import forward_cli
+    forward_cli(__file__)
+
 import argparse
-import matplotlib.pyplot as plt
-from typing import Dict, List
-import numpy as np
+from typing import Dict, List, Optional
+
+from chart_renderer import growth_chart_data, save_chart
+from cost_graph import CostGraph
 
 def load_config(config_file: str) -> Dict:
     """Load configuration from YAML file"""
-    with open(config_file, 'r') as f:
-        return yaml.safe_load(f)
+    from utils import load_yaml
+    return load_yaml(config_file)
 
-def calculate_costs_at_scale(customer_count: int, include_details: bool = False) -> Dict:
-    """Calculate costs for a given customer count"""
-    
-    # Data sizing (158KB per customer)
+# The model as a cost graph: each sizing figure and cost is a node, so
+# intermediates are computed once and batches of customer counts share work.
+GROWTH_GRAPH = CostGraph('growth')
+GROWTH_GRAPH.input('customer_count', doc='Total customers')
+
+@GROWTH_GRAPH.node()
+def total_data_gb(customer_count):
+    """Data sizing (158KB per customer, 50% overhead)"""
     data_per_customer_kb = 158
-    total_data_gb = (customer_count * data_per_customer_kb) / (1024 * 1024) * 1.5  # 50% overhead
-    
-    # Transaction rates
+    return (customer_count * data_per_customer_kb) / (1024 * 1024) * 1.5
+
+@GROWTH_GRAPH.node()
+def tps(customer_count):
+    """Transaction rate (2 transactions per customer per day)"""
     transactions_per_customer_per_day = 2
-    tps = (customer_count * transactions_per_customer_per_day) / 86400
-    api_tps = tps * 5
-    
-    costs = {}
-    
-    # COMPUTE COSTS - scales with tiers
+    return (customer_count * transactions_per_customer_per_day) / 86400
+
+@GROWTH_GRAPH.node()
+def api_tps(tps):
+    return tps * 5
+
+@GROWTH_GRAPH.node()
+def compute(customer_count):
+    """COMPUTE COSTS - scales with tiers"""
     if customer_count <= 10000:
         # Minimal setup
         compute_base = 500  # Small instances
@@ -51,9 +65,11 @@ def calculate_costs_at_scale(customer_count: int, include_details: bool = False)
         compute_base = 5000
         compute_scale = customer_count * 0.010
     
-    costs['compute'] = compute_base + compute_scale
-    
-    # DATABASE COSTS - scales with data and transactions
+    return compute_base + compute_scale
+
+@GROWTH_GRAPH.node()
+def database(customer_count, total_data_gb, tps):
+    """DATABASE COSTS - scales with data and transactions"""
     if customer_count <= 10000:
         db_base = 200  # Small RDS instances
     elif customer_count <= 50000:
@@ -73,13 +89,17 @@ def calculate_costs_at_scale(customer_count: int, include_details: bool = False)
     iops = tps * 20
     iops_cost = iops * 0.10 if customer_count > 100000 else 0  # IOPS charges kick in at scale
     
-    costs['database'] = db_base + storage_cost + backup_cost + iops_cost
-    
-    # OBSERVABILITY - scales with infrastructure
-    num_instances = 12 if customer_count <= 10000 else \
-                   24 if customer_count <= 100000 else \
-                   48 if customer_count <= 500000 else 96
-    
+    return db_base + storage_cost + backup_cost + iops_cost
+
+@GROWTH_GRAPH.node()
+def num_instances(customer_count):
+    return 12 if customer_count <= 10000 else \
+           24 if customer_count <= 100000 else \
+           48 if customer_count <= 500000 else 96
+
+@GROWTH_GRAPH.node()
+def observability(customer_count, num_instances, api_tps):
+    """OBSERVABILITY - scales with infrastructure"""
     metrics_cost = num_instances * 10 * 0.30  # 10 metrics per instance
     logs_gb = num_instances * 0.1 * 30  # 100MB per instance per day
     logs_cost = logs_gb * 0.50
@@ -91,9 +111,11 @@ def calculate_costs_at_scale(customer_count: int, include_details: bool = False)
         trace_millions = (api_tps * 86400 * 30) / 1000000
         trace_cost = trace_millions * 2.00
     
-    costs['observability'] = metrics_cost + logs_cost + apm_cost + trace_cost
-    
-    # OTHER COSTS
+    return metrics_cost + logs_cost + apm_cost + trace_cost
+
+@GROWTH_GRAPH.node()
+def other(customer_count, api_tps):
+    """OTHER COSTS - API gateway, cache, network, load balancers, queue/CI"""
     api_calls_millions = (api_tps * 86400 * 30) / 1000000
     api_gateway_cost = api_calls_millions * 3.50
     
@@ -114,30 +136,53 @@ def calculate_costs_at_scale(customer_count: int, include_details: bool = False)
     # Load balancer scales
     lb_cost = 20 if customer_count <= 100000 else 40 if customer_count <= 500000 else 80
     
-    costs['other'] = api_gateway_cost + cache_cost + network_cost + lb_cost + 25  # +25 for queue/CI
-    
-    # Total production
-    costs['production_total'] = sum([costs['compute'], costs['database'], 
-                                     costs['observability'], costs['other']])
-    
-    # Non-production (scales down as you grow)
-    nonprod_pct = 0.4 if customer_count <= 10000 else \
-                  0.3 if customer_count <= 100000 else \
-                  0.2 if customer_count <= 500000 else 0.15
-    
-    costs['nonproduction'] = costs['production_total'] * nonprod_pct
-    costs['total_monthly'] = costs['production_total'] + costs['nonproduction']
-    costs['total_annual'] = costs['total_monthly'] * 12
-    costs['cost_per_customer'] = costs['total_monthly'] / customer_count if customer_count > 0 else 0
+    return api_gateway_cost + cache_cost + network_cost + lb_cost + 25  # +25 for queue/CI
+
+@GROWTH_GRAPH.node()
+def production_total(compute, database, observability, other):
+    return sum([compute, database, observability, other])
+
+@GROWTH_GRAPH.node()
+def nonprod_pct(customer_count):
+    """Non-production share (scales down as you grow)"""
+    return 0.4 if customer_count <= 10000 else \
+           0.3 if customer_count <= 100000 else \
+           0.2 if customer_count <= 500000 else 0.15
+
+@GROWTH_GRAPH.node()
+def nonproduction(production_total, nonprod_pct):
+    return production_total * nonprod_pct
+
+@GROWTH_GRAPH.node()
+def total_monthly(production_total, nonproduction):
+    return production_total + nonproduction
+
+@GROWTH_GRAPH.node()
+def total_annual(total_monthly):
+    return total_monthly * 12
+
+@GROWTH_GRAPH.node()
+def cost_per_customer(total_monthly, customer_count):
+    return total_monthly / customer_count if customer_count > 0 else 0
+
+COST_NODES = ['compute', 'database', 'observability', 'other', 'production_total',
+              'nonproduction', 'total_monthly', 'total_annual', 'cost_per_customer']
+DETAIL_NODES = ['total_data_gb', 'tps', 'api_tps', 'num_instances', 'nonprod_pct']
+
+def calculate_costs_at_scale(customer_count: int, include_details: bool = False, cache: Optional[Dict] = None) -> Dict:
+    """Calculate costs for a given customer count"""
+    values = GROWTH_GRAPH.evaluate(COST_NODES + (DETAIL_NODES if include_details else []), cache,
+                                   customer_count=customer_count)
+    costs = {name: values[name] for name in COST_NODES}
     
     if include_details:
         costs['details'] = {
             'customer_count': customer_count,
-            'data_gb': total_data_gb,
-            'tps': tps,
-            'api_tps': api_tps,
-            'instances': num_instances,
-            'nonprod_pct': nonprod_pct * 100
+            'data_gb': values['total_data_gb'],
+            'tps': values['tps'],
+            'api_tps': values['api_tps'],
+            'instances': values['num_instances'],
+            'nonprod_pct': values['nonprod_pct'] * 100
         }
     
     return costs
@@ -145,6 +190,7 @@ def calculate_costs_at_scale(customer_count: int, include_details: bool = False)
 def generate_growth_projection(initial_customers: int, growth_rate: float, months: int) -> List[Dict]:
     """Generate month-by-month growth projection"""
     projections = []
+    cache = {}  # Shared across months; repeated customer counts are evaluated once
     
     for month in range(months + 1):
         # Calculate customer count for this month
@@ -155,7 +201,7 @@ def generate_growth_projection(initial_customers: int, growth_rate: float, month
             customers = int(initial_customers * ((1 + growth_rate) ** month))
         
         # Calculate costs
-        costs = calculate_costs_at_scale(customers, include_details=True)
+        costs = calculate_costs_at_scale(customers, include_details=True, cache=cache)
         costs['month'] = month
         projections.append(costs)
     
@@ -231,59 +277,10 @@ def print_growth_report(projections: List[Dict], growth_rate: float):
 
 def create_growth_charts(projections: List[Dict], output_file: str = 'growth_projection.png'):
     """Create visualization of growth projections"""
-    months = [p['month'] for p in projections]
-    customers = [p['details']['customer_count'] for p in projections]
-    total_costs = [p['total_monthly'] for p in projections]
-    per_customer_costs = [p['cost_per_customer'] for p in projections]
-    
-    # Component costs
-    compute_costs = [p['compute'] for p in projections]
-    database_costs = [p['database'] for p in projections]
-    observability_costs = [p['observability'] for p in projections]
-    other_costs = [p['other'] for p in projections]
-    
-    fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(15, 10))
-    
-    # Customer growth
-    ax1.plot(months, customers, 'b-', linewidth=2)
-    ax1.set_xlabel('Month')
-    ax1.set_ylabel('Customers')
-    ax1.set_title('Customer Growth')
-    ax1.grid(True, alpha=0.3)
-    ax1.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'{x/1000:.0f}K'))
-    
-    # Total cost growth
-    ax2.plot(months, total_costs, 'g-', linewidth=2)
-    ax2.set_xlabel('Month')
-    ax2.set_ylabel('Monthly Cost ($)')
-    ax2.set_title('Total Cost Growth')
-    ax2.grid(True, alpha=0.3)
-    ax2.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${x/1000:.0f}K'))
-    
-    # Cost per customer
-    ax3.plot(months, per_customer_costs, 'r-', linewidth=2)
-    ax3.set_xlabel('Month')
-    ax3.set_ylabel('Cost per Customer ($)')
-    ax3.set_title('Cost per Customer (Economies of Scale)')
-    ax3.grid(True, alpha=0.3)
-    
-    # Stacked area chart of components
-    ax4.stackplot(months, compute_costs, database_costs, observability_costs, other_costs,
-                  labels=['Compute', 'Database', 'Observability', 'Other'],
-                  alpha=0.8)
-    ax4.set_xlabel('Month')
-    ax4.set_ylabel('Monthly Cost ($)')
-    ax4.set_title('Cost Components Over Time')
-    ax4.legend(loc='upper left')
-    ax4.grid(True, alpha=0.3)
-    ax4.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${x/1000:.0f}K'))
-    
-    plt.suptitle('Galaxy Platform - Cost Growth Projection', fontsize=16, fontweight='bold')
-    plt.tight_layout()
-    plt.savefig(output_file, dpi=150, bbox_inches='tight')
+    save_chart('growth', growth_chart_data(projections), output_file)
     print(f"\nChart saved to: {output_file}")
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(description='Galaxy Platform Growth Projection Model')
     parser.add_argument('--initial-customers', type=int, default=10000, 
                        help='Initial customer count (default: 10000)')
@@ -294,7 +291,7 @@ def main():
     parser.add_argument('--chart', action='store_true',
                        help='Generate growth charts')
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     # Generate projections
     projections = generate_growth_projection(
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Live recalculation sessions for Galaxy Platform
+Clients push input changes; each session debounces and coalesces them,
+computes only the latest state on its own worker, and publishes results to
+Server-Sent Events subscribers. Superseded computations are dropped, so load
+is bounded by the number of sessions rather than the rate of input.
+"""
+
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+# Quiet period after the last change before computing
+DEBOUNCE_SECONDS = 0.05
+
+# Upper bound on debouncing under continuous input, so results keep flowing
+MAX_DEBOUNCE_SECONDS = 0.25
+
+# Idle sessions are closed after this long
+SESSION_TTL_SECONDS = 600
+
+# Comment line sent to SSE subscribers when there is nothing new
+KEEPALIVE_SECONDS = 15
+
+MAX_SESSIONS = 100
+
+Compute = Callable[[Dict[str, Any]], Tuple[Dict[str, Any], int]]
+
+class LiveSession:
+    """Latest-state-wins recalculation for one client"""
+
+    def __init__(self, compute: Compute, inputs: Optional[Dict[str, Any]] = None):
+        self.id = uuid.uuid4().hex
+        self.compute = compute
+        self.inputs: Dict[str, Any] = dict(inputs or {})
+        self.version = 0           # Bumped by every push
+        self.computed_version = 0  # Version of the latest published result
+        self.result: Optional[Dict[str, Any]] = None
+        self.stats = {'pushes': 0, 'computed': 0, 'superseded': 0}
+        self.closed = False
+        self.last_active = time.monotonic()
+        self.changed_at = 0.0
+        self.condition = threading.Condition()
+        self.worker: Optional[threading.Thread] = None
+
+    def push(self, changes: Dict[str, Any], replace: bool = False) -> int:
+        """Merge (or replace) inputs and schedule a recalculation; returns the new version"""
+        with self.condition:
+            if self.closed:
+                raise RuntimeError(f"Live session {self.id} is closed")
+            self.inputs = dict(changes) if replace else {**self.inputs, **changes}
+            self.version += 1
+            self.stats['pushes'] += 1
+            self.changed_at = self.last_active = time.monotonic()
+            if self.worker is None:
+                self.worker = threading.Thread(target=self._run, daemon=True, name=f"live-{self.id[:8]}")
+                self.worker.start()
+            self.condition.notify_all()
+            return self.version
+
+    def _next_state(self) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """Wait for pending input and its debounce window; None once the session closes"""
+        with self.condition:
+            while not self.closed and self.version == self.computed_version:
+                self.condition.wait(KEEPALIVE_SECONDS)
+            first_pending = time.monotonic()
+            while not self.closed:
+                quiet = time.monotonic() - self.changed_at
+                waited = time.monotonic() - first_pending
+                if quiet >= DEBOUNCE_SECONDS or waited >= MAX_DEBOUNCE_SECONDS:
+                    break
+                self.condition.wait(min(DEBOUNCE_SECONDS - quiet, MAX_DEBOUNCE_SECONDS - waited))
+            if self.closed:
+                return None
+            return self.version, dict(self.inputs)
+
+    def _run(self):
+        while True:
+            state = self._next_state()
+            if state is None:
+                return
+            version, inputs = state
+            try:
+                payload, status = self.compute(inputs)
+            except Exception as e:
+                payload, status = {'error': str(e)}, 500
+
+            with self.condition:
+                # A result for inputs that have since changed is never shown
+                if self.version != version:
+                    self.stats['superseded'] += 1
+                    continue
+                self.stats['computed'] += 1
+                self.computed_version = version
+                self.result = {'version': version, 'status': status, 'result': payload}
+                self.condition.notify_all()
+
+    def events(self, last_version: int = 0) -> Iterator[str]:
+        """SSE stream of results newer than last_version, with keepalive comments"""
+        yield f"event: session\ndata: {json.dumps({'sessionId': self.id, 'version': self.version})}\n\n"
+        while True:
+            with self.condition:
+                # Pushes also notify the condition; only a new result or the keepalive interval ends the wait
+                self.condition.wait_for(
+                    lambda: self.closed or (self.result is not None and self.result['version'] > last_version),
+                    KEEPALIVE_SECONDS)
+                if self.closed:
+                    return
+                result = self.result
+                self.last_active = time.monotonic()
+
+            if result is None or result['version'] <= last_version:
+                yield ": keepalive\n\n"
+                continue
+            last_version = result['version']
+            yield f"id: {last_version}\nevent: result\ndata: {json.dumps(result, default=str)}\n\n"
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def status(self) -> Dict[str, Any]:
+        with self.condition:
+            return {
+                'sessionId': self.id,
+                'version': self.version,
+                'computedVersion': self.computed_version,
+                'inputs': self.inputs,
+                **self.stats,
+            }
+
+class LiveSessionManager:
+    """Bounded registry of live sessions; the oldest and idle ones are closed"""
+
+    def __init__(self, compute: Compute, max_sessions: int = MAX_SESSIONS, ttl: float = SESSION_TTL_SECONDS):
+        self.compute = compute
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.sessions: "OrderedDict[str, LiveSession]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    def create(self, inputs: Optional[Dict[str, Any]] = None) -> LiveSession:
+        session = LiveSession(self.compute, inputs)
+        with self.lock:
+            self._expire()
+            self.sessions[session.id] = session
+            while len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)[1].close()
+        if inputs:
+            session.push({})
+        return session
+
+    def get(self, session_id: str) -> Optional[LiveSession]:
+        with self.lock:
+            self._expire()
+            session = self.sessions.get(session_id)
+            if session is not None:
+                self.sessions.move_to_end(session_id)
+            return session
+
+    def close(self, session_id: str) -> bool:
+        with self.lock:
+            session = self.sessions.pop(session_id, None)
+        if session is None:
+            return False
+        session.close()
+        return True
+
+    def _expire(self):
+        now = time.monotonic()
+        for session_id in [sid for sid, s in self.sessions.items() if now - s.last_active > self.ttl]:
+            self.sessions.pop(session_id).close()
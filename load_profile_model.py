@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Hourly load profile model for Galaxy Platform
+Expands monthly operation volumes into an 8760-hour demand curve per service
+so capacity can be sized on real peaks instead of flat monthly averages
+"""
+
+import argparse
+from typing import Dict, Optional
+import numpy as np
+
+from segment_operations_model import get_operation_profiles
+
+HOURS_PER_DAY = 24
+
+# Default traffic shape for a retail/commercial bank.
+# All weights are relative - they are normalised so every month still sums
+# to the monthly volume defined in the operation profiles.
+DEFAULT_LOAD_SHAPE = {
+    # Relative weight per hour of day (00:00-23:00 local time)
+    'diurnal': [0.20, 0.15, 0.12, 0.10, 0.12, 0.20, 0.45, 0.85,
+                1.30, 1.60, 1.70, 1.65, 1.60, 1.55, 1.50, 1.45,
+                1.45, 1.50, 1.55, 1.40, 1.15, 0.85, 0.55, 0.30],
+    # Relative weight per day of week (Monday first)
+    'weekly': [1.10, 1.05, 1.05, 1.05, 1.20, 0.80, 0.75],
+    # Relative weight per month of year (January first)
+    'seasonal': [0.95, 0.92, 1.00, 0.98, 1.00, 1.00,
+                 0.97, 0.95, 1.00, 1.02, 1.06, 1.15],
+    # Salary runs, statements and batch settlements at month end
+    'month_end_days': 3,
+    'month_end_multiplier': 1.6,
+    # Per-service overrides, e.g. {'APHELION': {'diurnal': [...]}}
+    'services': {},
+}
+
+# Capacity assumptions (same as pricing_tables.get_compute_instances)
+DEFAULT_TPS_PER_INSTANCE = 100
+DEFAULT_IOPS_PER_WRITE_TPS = 20
+DEFAULT_IOPS_PER_READ_TPS = 2
+
+SHAPE_CURVES = (('diurnal', 24), ('weekly', 7), ('seasonal', 12))
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and np.isfinite(value)
+
+def _check_shape(shape: Dict, label: str):
+    for key, length in SHAPE_CURVES:
+        curve = shape[key]
+        if not isinstance(curve, list) or len(curve) != length:
+            raise ValueError(f"{label} '{key}' must be a list of {length} values")
+        if not all(_is_number(v) and v >= 0 for v in curve) or not sum(curve) > 0:
+            raise ValueError(f"{label} '{key}' must be non-negative numbers, not all zero")
+    if not isinstance(shape['month_end_days'], int) or isinstance(shape['month_end_days'], bool) \
+            or not 0 <= shape['month_end_days'] <= 31:
+        raise ValueError(f"{label} 'month_end_days' must be a whole number of days between 0 and 31")
+    if not _is_number(shape['month_end_multiplier']) or shape['month_end_multiplier'] <= 0:
+        raise ValueError(f"{label} 'month_end_multiplier' must be a positive number")
+
+def merge_load_shape(overrides: Optional[Dict] = None) -> Dict:
+    """Merge user supplied shape settings over the default load shape; ValueError if malformed"""
+    shape = {key: (dict(value) if isinstance(value, dict) else value)
+             for key, value in DEFAULT_LOAD_SHAPE.items()}
+    if overrides:
+        if not isinstance(overrides, dict):
+            raise ValueError("Load shape must be an object")
+        unknown = set(overrides) - set(DEFAULT_LOAD_SHAPE)
+        if unknown:
+            raise ValueError(f"Unknown load shape settings: {', '.join(sorted(unknown))}")
+        for key, value in overrides.items():
+            if key == 'services':
+                if value is not None and not isinstance(value, dict):
+                    raise ValueError("Load shape 'services' must be an object of per-service overrides")
+                shape['services'].update(value or {})
+            else:
+                shape[key] = value
+
+    _check_shape(shape, 'Load shape')
+    for service, service_shape in shape['services'].items():
+        if not isinstance(service_shape, dict) or 'services' in service_shape \
+                or set(service_shape) - set(DEFAULT_LOAD_SHAPE):
+            raise ValueError(f"Load shape for {service} must be an object of load shape settings")
+        _check_shape({**shape, **service_shape}, f"Load shape for {service}")
+
+    return shape
+
+def build_calendar(year: int = 2025) -> Dict[str, np.ndarray]:
+    """Build hour-of-day, weekday, month and month-end indices for every hour of a year"""
+    hours = np.arange(f'{year}-01-01T00', f'{year + 1}-01-01T00', dtype='datetime64[h]')
+    days = hours.astype('datetime64[D]')
+    months = hours.astype('datetime64[M]')
+
+    # 1970-01-01 was a Thursday, so shift by 3 to make Monday == 0
+    weekday = (days.astype(np.int64) + 3) % 7
+    days_to_month_end = ((months + 1).astype('datetime64[D]') - days).astype(np.int64)
+
+    return {
+        'hours': hours,
+        'hour_of_day': hours.astype(np.int64) % HOURS_PER_DAY,
+        'weekday': weekday,
+        'month': months.astype(np.int64) % 12,
+        'days_to_month_end': days_to_month_end,
+    }
+
+def build_hourly_weights(shape: Dict, calendar: Dict[str, np.ndarray]) -> np.ndarray:
+    """Return the fraction of monthly volume that lands in each hour.
+
+    Weights sum to 1 within every calendar month and are then scaled by the
+    seasonal factor, so a year sums to sum(seasonal) / mean(seasonal) == 12.
+    """
+    weights = (np.asarray(shape['diurnal'], dtype=float)[calendar['hour_of_day']] *
+               np.asarray(shape['weekly'], dtype=float)[calendar['weekday']])
+
+    month_end = calendar['days_to_month_end'] <= shape['month_end_days']
+    weights = np.where(month_end, weights * shape['month_end_multiplier'], weights)
+
+    month = calendar['month']
+    month_totals = np.bincount(month, weights=weights, minlength=12)
+    seasonal = np.asarray(shape['seasonal'], dtype=float)
+    seasonal = seasonal / seasonal.mean()
+
+    return weights / month_totals[month] * seasonal[month]
+
+def simulate_hourly_demand(retail_count: int, sme_count: int, corporate_count: int,
+                           volume_multiplier: float = 1.0, shape: Optional[Dict] = None,
+                           year: int = 2025) -> Dict:
+    """Expand monthly operation volumes into hourly demand per service.
+
+    Returns a dict with the ordered service list and (services x hours)
+    arrays of total, read and write operations per hour.
+    """
+    shape = merge_load_shape(shape)
+    calendar = build_calendar(year)
+    profiles = get_operation_profiles()
+
+    services = list(dict.fromkeys(p.service for p in profiles))
+    service_index = {service: i for i, service in enumerate(services)}
+
+    counts = np.array([retail_count, sme_count, corporate_count], dtype=float) * volume_multiplier
+    volumes = np.array([[p.retail_volume, p.sme_volume, p.corporate_volume] for p in profiles])
+    monthly_ops = volumes @ counts
+    is_write = np.array([p.is_write_operation for p in profiles])
+    rows = np.array([service_index[p.service] for p in profiles])
+
+    monthly_writes = np.bincount(rows, weights=monthly_ops * is_write, minlength=len(services))
+    monthly_reads = np.bincount(rows, weights=monthly_ops * ~is_write, minlength=len(services))
+
+    default_weights = build_hourly_weights(shape, calendar)
+    weights = np.tile(default_weights, (len(services), 1))
+    for service, service_shape in shape['services'].items():
+        if service in service_index:
+            merged = {**shape, **service_shape, 'services': {}}
+            weights[service_index[service]] = build_hourly_weights(merged, calendar)
+
+    write_ops = monthly_writes[:, None] * weights
+    read_ops = monthly_reads[:, None] * weights
+
+    return {
+        'services': services,
+        'hours': calendar['hours'],
+        'monthly_ops': monthly_writes + monthly_reads,
+        'write_ops': write_ops,
+        'read_ops': read_ops,
+        'ops': write_ops + read_ops,
+    }
+
+def calculate_peak_metrics(demand: Dict, min_instances: Optional[Dict[str, int]] = None,
+                           tps_per_instance: float = DEFAULT_TPS_PER_INSTANCE,
+                           iops_per_write_tps: float = DEFAULT_IOPS_PER_WRITE_TPS,
+                           iops_per_read_tps: float = DEFAULT_IOPS_PER_READ_TPS) -> Dict:
+    """Calculate peak TPS, instance-hours and IOPS from an hourly demand curve"""
+    services = demand['services']
+    hours = demand['ops'].shape[1]
+    tps = demand['ops'] / 3600
+    write_tps = demand['write_ops'] / 3600
+    read_tps = demand['read_ops'] / 3600
+
+    floors = np.array([(min_instances or {}).get(s.lower(), 1) for s in services])
+    instances = np.maximum(np.ceil(tps / tps_per_instance), floors[:, None])
+    iops = write_tps * iops_per_write_tps + read_tps * iops_per_read_tps
+
+    avg_tps = tps.mean(axis=1)
+    peak_tps = tps.max(axis=1)
+    peak_iops = iops.max(axis=1)
+    instance_hours = instances.sum(axis=1)
+
+    platform_tps = tps.sum(axis=0)
+    platform_iops = iops.sum(axis=0)
+    platform_avg = platform_tps.mean()
+
+    per_service = {}
+    for i, service in enumerate(services):
+        per_service[service] = {
+            'avg_tps': float(avg_tps[i]),
+            'peak_tps': float(peak_tps[i]),
+            'peak_write_tps': float(write_tps[i].max()),
+            'peak_multiplier': float(peak_tps[i] / avg_tps[i]) if avg_tps[i] > 0 else 0,
+            'peak_iops': float(peak_iops[i]),
+            'peak_instances': int(instances[i].max()),
+            'instance_hours': float(instance_hours[i]),
+            'avg_instances': float(instance_hours[i] / hours),
+        }
+
+    return {
+        'hours': hours,
+        'services': per_service,
+        'avg_tps': float(platform_avg),
+        'peak_tps': float(platform_tps.max()),
+        'p95_tps': float(np.percentile(platform_tps, 95)),
+        'peak_multiplier': float(platform_tps.max() / platform_avg) if platform_avg > 0 else 0,
+        'peak_iops': float(platform_iops.max()),
+        'p95_iops': float(np.percentile(platform_iops, 95)),
+        'instance_hours': float(instance_hours.sum()),
+        'peak_hour': str(demand['hours'][int(platform_tps.argmax())]),
+    }
+
+def apply_peak_metrics(metrics: Dict, peaks: Dict) -> Dict:
+    """Size transaction rates and the compute fleet in a galaxy metrics dict on simulated peaks.
+
+    metrics['peak_instances'] makes estimate_complete_compute_cost provision
+    each service for its peak hour instead of scaling it by customer count.
+    """
+    services = peaks['services']
+    titan_peak = services.get('TITAN', {}).get('peak_write_tps', 0)
+    proxima_peak = services.get('PROXIMA', {}).get('peak_write_tps', 0)
+
+    metrics['transaction_tps'] = titan_peak
+    metrics['ledger_tps'] = max(proxima_peak, titan_peak)
+    metrics['peak_tps'] = peaks['peak_tps']
+    metrics['peak_multiplier'] = peaks['peak_multiplier']
+    metrics['peak_instances'] = {service.lower(): data['peak_instances'] for service, data in services.items()}
+    return metrics
+
+def print_load_profile_report(peaks: Dict):
+    """Print per-service peak and capacity summary"""
+    print("\n" + "="*90)
+    print("GALAXY PLATFORM - HOURLY LOAD PROFILE")
+    print("="*90)
+    print(f"Simulated Hours: {peaks['hours']:,}")
+    print(f"Platform Average TPS: {peaks['avg_tps']:,.1f}")
+    print(f"Platform Peak TPS:    {peaks['peak_tps']:,.1f} (at {peaks['peak_hour']})")
+    print(f"Platform P95 TPS:     {peaks['p95_tps']:,.1f}")
+    print(f"Peak Multiplier:      {peaks['peak_multiplier']:.2f}x")
+    print(f"Platform Peak IOPS:   {peaks['peak_iops']:,.0f}")
+
+    print("\n" + "-"*90)
+    print(f"{'Service':<12} {'Avg TPS':>12} {'Peak TPS':>12} {'Peak/Avg':>10} {'Peak IOPS':>12} "
+          f"{'Max Inst':>10} {'Inst-Hours':>14}")
+    print("-"*90)
+    for service, data in sorted(peaks['services'].items(), key=lambda x: x[1]['peak_tps'], reverse=True):
+        print(f"{service:<12} {data['avg_tps']:>12,.1f} {data['peak_tps']:>12,.1f} "
+              f"{data['peak_multiplier']:>9.2f}x {data['peak_iops']:>12,.0f} "
+              f"{data['peak_instances']:>10} {data['instance_hours']:>14,.0f}")
+    print("-"*90)
+    print(f"{'TOTAL':<12} {'':>12} {'':>12} {'':>10} {'':>12} {'':>10} {peaks['instance_hours']:>14,.0f}")
+    print("="*90)
+
+def main():
+    """Main function for hourly load profile simulation"""
+    parser = argparse.ArgumentParser(description='Galaxy Platform Hourly Load Profile Simulator')
+    parser.add_argument('--retail', type=int, default=1000000, help='Number of retail customers')
+    parser.add_argument('--sme', type=int, default=100000, help='Number of SME customers')
+    parser.add_argument('--corporate', type=int, default=10000, help='Number of corporate customers')
+    parser.add_argument('--multiplier', type=float, default=1.0, help='Volume multiplier for all operations')
+    parser.add_argument('--config', help='YAML file with an optional load_profile section')
+    parser.add_argument('--year', type=int, default=2025, help='Calendar year to simulate')
+    parser.add_argument('--tps-per-instance', type=float, default=DEFAULT_TPS_PER_INSTANCE,
+                       help='Throughput a single service instance can sustain')
+
+    args = parser.parse_args()
+
+    shape = None
+    if args.config:
+        from utils import load_config
+        shape = load_config(args.config).get('load_profile')
+
+    from galaxy_complete_cost_model import GALAXY_SERVICES
+    min_instances = {service_id: service['instances'] for service_id, service in GALAXY_SERVICES.items()}
+
+    demand = simulate_hourly_demand(args.retail, args.sme, args.corporate, args.multiplier,
+                                    shape=shape, year=args.year)
+    peaks = calculate_peak_metrics(demand, min_instances, tps_per_instance=args.tps_per_instance)
+    print_load_profile_report(peaks)
+
+    flat_hours = sum(min_instances.values()) * peaks['hours']
+    if flat_hours > 0:
+        print(f"\nFixed-fleet instance-hours: {flat_hours:,.0f} "
+              f"({peaks['instance_hours'] / flat_hours * 100:.1f}% needed at simulated demand)")
+    return 0
+
+if __name__ == "__main__":
+    main()
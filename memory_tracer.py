@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Memory accounting for Galaxy Platform calculations
+Process RSS and peak RSS, and tracemalloc allocation tracing: a traced call
+reports the source lines whose allocations grew the most, and an admin API
+keeps a tracing session open across requests so snapshots can be diffed
+against a baseline. Model CLIs are traced with
+`calc_profiler.py --mode memory`.
+"""
+
+import os
+import sys
+import threading
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_TOP = 25
+
+# Stack frames kept per traced allocation; more frames cost more memory and time
+TRACE_FRAMES = 1
+
+# Allocations made by the tracing machinery itself
+_IGNORED = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+]
+
+# Set while a MemoryTracer session is open, so a traced call does not stop its tracing
+_session_open = False
+
+def _mb(size: Optional[float]) -> Optional[float]:
+    return round(size / (1024 * 1024), 2) if size is not None else None
+
+def rss_bytes() -> Optional[int]:
+    """Current resident set size of this process (Linux only)"""
+    try:
+        for line in Path('/proc/self/status').read_text().splitlines():
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+def peak_rss_bytes(children: bool = False) -> Optional[int]:
+    """High-water mark of resident memory for this process, or the largest finished child"""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return usage.ru_maxrss if sys.platform == 'darwin' else usage.ru_maxrss * 1024
+
+def top_allocations(before: tracemalloc.Snapshot, after: tracemalloc.Snapshot,
+                    limit: int = DEFAULT_TOP) -> List[Dict[str, Any]]:
+    """Source lines whose live allocations grew the most between two snapshots"""
+    before, after = before.filter_traces(_IGNORED), after.filter_traces(_IGNORED)
+    rows = []
+    for stat in after.compare_to(before, 'lineno')[:limit]:
+        frame = stat.traceback[0]
+        rows.append({
+            'location': f"{os.path.basename(frame.filename)}:{frame.lineno}",
+            'sizeKb': round(stat.size / 1024, 1),
+            'sizeDiffKb': round(stat.size_diff / 1024, 1),
+            'count': stat.count,
+            'countDiff': stat.count_diff,
+        })
+    return rows
+
+def trace_call(func: Callable[[], Any], top: int = DEFAULT_TOP) -> Tuple[Any, Dict]:
+    """Run func() with allocation tracing; returns (result, report)"""
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start(TRACE_FRAMES)
+    else:
+        tracemalloc.reset_peak()
+    try:
+        peak_before = peak_rss_bytes()
+        before = tracemalloc.take_snapshot()
+        base, _ = tracemalloc.get_traced_memory()
+        result = func()
+        current, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        if started and not _session_open:
+            tracemalloc.stop()
+    peak_after = peak_rss_bytes()
+    report = {
+        'mode': 'memory',
+        'tracedPeakMb': _mb(peak - base),
+        'retainedMb': _mb(current - base),
+        'rssMb': _mb(rss_bytes()),
+        'peakRssMb': _mb(peak_after),
+        'peakRssGrowthMb': _mb(peak_after - peak_before) if peak_after is not None else None,
+        'top': top_allocations(before, after, top),
+    }
+    return result, report
+
+class MemoryTracer:
+    """A tracemalloc session spanning many requests, diffed against a baseline snapshot"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.baseline: Optional[tracemalloc.Snapshot] = None
+
+    @property
+    def active(self) -> bool:
+        return self.baseline is not None
+
+    def status(self) -> Dict[str, Any]:
+        report = {'tracing': self.active, 'rssMb': _mb(rss_bytes()), 'peakRssMb': _mb(peak_rss_bytes())}
+        if self.active:
+            current, peak = tracemalloc.get_traced_memory()
+            report.update({'tracedMb': _mb(current), 'tracedPeakMb': _mb(peak),
+                           'overheadMb': _mb(tracemalloc.get_tracemalloc_memory())})
+        return report
+
+    def start(self, frames: int = TRACE_FRAMES) -> bool:
+        """Begin tracing and take the baseline; False if a session is already open"""
+        global _session_open
+        with self.lock:
+            if self.active:
+                return False
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames)
+            _session_open = True
+            self.baseline = tracemalloc.take_snapshot()
+            return True
+
+    def snapshot(self, top: int = DEFAULT_TOP, rebase: bool = False) -> Optional[Dict[str, Any]]:
+        """Top allocation growth since the baseline; rebase makes this snapshot the new baseline"""
+        with self.lock:
+            if not self.active:
+                return None
+            current = tracemalloc.take_snapshot()
+            report = {**self.status(), 'top': top_allocations(self.baseline, current, top)}
+            if rebase:
+                self.baseline = current
+                tracemalloc.reset_peak()
+            return report
+
+    def stop(self) -> bool:
+        global _session_open
+        with self.lock:
+            if not self.active:
+                return False
+            _session_open = False
+            self.baseline = None
+            tracemalloc.stop()
+            return True
+
+def install_memory_admin(app, gate, prefix: str = '/api/admin/memory'):
+    """Serve a MemoryTracer under prefix, behind a calc_profiler.ProfileGate token"""
+    from functools import wraps
+    from flask import jsonify, request
+
+    tracer = MemoryTracer()
+
+    def admin(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not gate.enabled:
+                return jsonify({'error': 'Memory tracing is not enabled (set GALAXY_PROFILE_TOKEN)'}), 404
+            if not gate.authorize(request.headers.get('X-Profile-Token')):
+                return jsonify({'error': 'Invalid or missing X-Profile-Token'}), 403
+            return view(*args, **kwargs)
+        return wrapper
+
+    @app.route(prefix, methods=['GET'], endpoint='memory_status')
+    @admin
+    def memory_status():
+        """Process memory and tracing status"""
+        return jsonify(tracer.status())
+
+    @app.route(f'{prefix}/start', methods=['POST'], endpoint='memory_start')
+    @admin
+    def memory_start():
+        """Start allocation tracing and take the baseline snapshot"""
+        frames = request.args.get('frames', TRACE_FRAMES, type=int)
+        if not 1 <= frames <= 100:
+            return jsonify({'error': 'frames must be between 1 and 100'}), 400
+        if not tracer.start(frames):
+            return jsonify({'error': 'Tracing is already active'}), 409
+        return jsonify(tracer.status())
+
+    @app.route(f'{prefix}/snapshot', methods=['GET'], endpoint='memory_snapshot')
+    @admin
+    def memory_snapshot():
+        """Top allocation growth since the baseline (?top=N, ?rebase=1)"""
+        report = tracer.snapshot(request.args.get('top', DEFAULT_TOP, type=int),
+                                 request.args.get('rebase') in ('1', 'true'))
+        if report is None:
+            return jsonify({'error': 'Tracing is not active'}), 409
+        return jsonify(report)
+
+    @app.route(f'{prefix}/stop', methods=['POST'], endpoint='memory_stop')
+    @admin
+    def memory_stop():
+        """Stop allocation tracing"""
+        if not tracer.stop():
+            return jsonify({'error': 'Tracing is not active'}), 409
+        return jsonify(tracer.status())
+
+    return tracer
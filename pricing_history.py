@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Pricing history for Galaxy Platform
+Records every version of a provider pricing file as a compact delta from the
+previous version, with content hashes, and materialises the pricing that was
+in effect at any date
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import sys
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import yaml
+
+DEFAULT_HISTORY_DB = 'pricing_history.db'
+
+# Store a full snapshot every N versions so materialising never replays more
+# than N deltas
+SNAPSHOT_INTERVAL = 32
+
+MATERIALIZED_CACHE_SIZE = 64
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pricing_versions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    provider TEXT NOT NULL,
+    effective_at TEXT NOT NULL,
+    recorded_at TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    parent_id INTEGER REFERENCES pricing_versions(id),
+    is_snapshot INTEGER NOT NULL,
+    delta TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_pricing_versions_effective ON pricing_versions (provider, effective_at, id);
+"""
+
+# Materialised versions by content hash (identical content shares an entry)
+_MATERIALIZED: "OrderedDict[str, Dict]" = OrderedDict()
+
+def _escape(key: Any) -> str:
+    return str(key).replace('\\', '\\\\').replace('.', '\\.')
+
+def split_path(path: str) -> List[str]:
+    """Keys of a flattened path; a backslash escapes a dot or backslash inside a key"""
+    keys, key, chars = [], [], iter(path)
+    for char in chars:
+        if char == '\\':
+            key.append(next(chars, ''))
+        elif char == '.':
+            keys.append(''.join(key))
+            key = []
+        else:
+            key.append(char)
+    keys.append(''.join(key))
+    return keys
+
+def flatten(data: Dict, prefix: str = '') -> Dict[str, Any]:
+    """Flatten nested dicts to {'compute.vcpu_hour': 0.0315, ...}; other values are leaves.
+
+    Dots in keys (instance types such as db.r6g.large) are escaped as '\\.'.
+    """
+    flat = {}
+    for key, value in data.items():
+        path = f"{prefix}{_escape(key)}"
+        if isinstance(value, dict) and value:
+            flat.update(flatten(value, path + '.'))
+        else:
+            flat[path] = value
+    return flat
+
+def unflatten(flat: Dict[str, Any]) -> Dict:
+    """Inverse of flatten"""
+    data: Dict[str, Any] = {}
+    for path, value in flat.items():
+        node = data
+        *parents, leaf = split_path(path)
+        for key in parents:
+            node = node.setdefault(key, {})
+        node[leaf] = value
+    return data
+
+def content_hash(pricing: Dict) -> str:
+    """SHA-256 of the canonical JSON form of a pricing dict"""
+    canonical = json.dumps(pricing, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def compute_delta(old: Dict[str, Any], new: Dict[str, Any]) -> Dict:
+    """Changed and removed leaves between two flattened pricing dicts"""
+    return {
+        'set': {path: value for path, value in new.items() if path not in old or old[path] != value},
+        'unset': [path for path in old if path not in new],
+    }
+
+def apply_delta(flat: Dict[str, Any], delta: Dict) -> Dict[str, Any]:
+    """Apply a delta to a flattened pricing dict in place"""
+    for path in delta['unset']:
+        flat.pop(path, None)
+    flat.update(delta['set'])
+    return flat
+
+def parse_as_of(value: str) -> str:
+    """Normalise an ISO date or datetime to the end of that instant for range queries"""
+    if len(value) == 10:
+        return datetime.fromisoformat(value).strftime('%Y-%m-%dT23:59:59')
+    return datetime.fromisoformat(value).strftime('%Y-%m-%dT%H:%M:%S')
+
+class PricingHistory:
+    """Versioned pricing store backed by SQLite"""
+
+    def __init__(self, path: str = DEFAULT_HISTORY_DB):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def _latest(self, provider: str):
+        return self.conn.execute(
+            "SELECT id, content_hash FROM pricing_versions WHERE provider = ? ORDER BY id DESC LIMIT 1",
+            (provider,)).fetchone()
+
+    def record(self, provider: str, pricing: Dict, effective_at: Optional[str] = None) -> Dict:
+        """Record a pricing version; unchanged content is not stored again"""
+        pricing = json.loads(json.dumps(pricing, default=str))
+        digest = content_hash(pricing)
+        latest = self._latest(provider)
+        if latest and latest[1] == digest:
+            return {'id': latest[0], 'content_hash': digest, 'changed': False}
+
+        parent_flat = flatten(self.materialize(provider, latest[0])) if latest else {}
+        new_flat = flatten(pricing)
+        depth = self._deltas_since_snapshot(provider) + 1 if latest else SNAPSHOT_INTERVAL
+
+        if depth >= SNAPSHOT_INTERVAL:
+            is_snapshot, delta = 1, {'set': new_flat, 'unset': []}
+        else:
+            is_snapshot, delta = 0, compute_delta(parent_flat, new_flat)
+
+        now = datetime.now().strftime('%Y-%m-%dT%H:%M:%S')
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO pricing_versions (provider, effective_at, recorded_at, content_hash, parent_id, "
+                "is_snapshot, delta) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (provider, parse_as_of(effective_at) if effective_at else now, now, digest,
+                 latest[0] if latest else None, is_snapshot, json.dumps(delta, sort_keys=True)))
+
+        _MATERIALIZED[digest] = pricing
+        self._trim_cache()
+        return {'id': cursor.lastrowid, 'content_hash': digest, 'changed': True,
+                'changed_keys': len(delta['set']) + len(delta['unset']), 'snapshot': bool(is_snapshot)}
+
+    def _deltas_since_snapshot(self, provider: str) -> int:
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM pricing_versions WHERE provider = ? AND id > "
+            "(SELECT MAX(id) FROM pricing_versions WHERE provider = ? AND is_snapshot = 1)",
+            (provider, provider)).fetchone()[0]
+
+    def version_at(self, provider: str, as_of: str) -> Optional[int]:
+        """Id of the version in effect at a date (ISO date or datetime)"""
+        row = self.conn.execute(
+            "SELECT id FROM pricing_versions WHERE provider = ? AND effective_at <= ? "
+            "ORDER BY effective_at DESC, id DESC LIMIT 1", (provider, parse_as_of(as_of))).fetchone()
+        return row[0] if row else None
+
+    def materialize(self, provider: str, version_id: int) -> Dict:
+        """Full pricing dict of a version: nearest snapshot plus the deltas after it.
+
+        Each delta is taken against the previously recorded version, so they
+        are replayed in id order even when effective dates were back-dated.
+        """
+        row = self.conn.execute(
+            "SELECT content_hash FROM pricing_versions WHERE id = ? AND provider = ?",
+            (version_id, provider)).fetchone()
+        if row is None:
+            raise KeyError(f"No pricing version {version_id} for {provider}")
+        if row[0] in _MATERIALIZED:
+            _MATERIALIZED.move_to_end(row[0])
+            return json.loads(json.dumps(_MATERIALIZED[row[0]]))
+
+        snapshot_id = self.conn.execute(
+            "SELECT MAX(id) FROM pricing_versions WHERE provider = ? AND is_snapshot = 1 AND id <= ?",
+            (provider, version_id)).fetchone()[0]
+        flat: Dict[str, Any] = {}
+        cursor = self.conn.execute(
+            "SELECT delta FROM pricing_versions WHERE provider = ? AND id BETWEEN ? AND ? ORDER BY id",
+            (provider, snapshot_id, version_id))
+        for (delta,) in cursor:
+            apply_delta(flat, json.loads(delta))
+
+        pricing = unflatten(flat)
+        if content_hash(pricing) != row[0]:
+            raise ValueError(f"Pricing version {version_id} for {provider} failed its content hash check")
+
+        _MATERIALIZED[row[0]] = pricing
+        self._trim_cache()
+        return json.loads(json.dumps(pricing))
+
+    def as_of(self, provider: str, as_of: str) -> Optional[Dict]:
+        """Pricing dict in effect at a date, or None if nothing was recorded by then"""
+        version_id = self.version_at(provider, as_of)
+        return self.materialize(provider, version_id) if version_id is not None else None
+
+    def log(self, provider: str) -> List[Dict]:
+        """All versions of a provider's pricing, oldest first"""
+        cursor = self.conn.execute(
+            "SELECT id, effective_at, recorded_at, content_hash, is_snapshot, delta FROM pricing_versions "
+            "WHERE provider = ? ORDER BY id", (provider,))
+        versions = []
+        for version_id, effective_at, recorded_at, digest, is_snapshot, delta in cursor:
+            delta = json.loads(delta)
+            versions.append({
+                'id': version_id,
+                'effective_at': effective_at,
+                'recorded_at': recorded_at,
+                'content_hash': digest,
+                'snapshot': bool(is_snapshot),
+                'changed_keys': len(delta['set']) + len(delta['unset']),
+            })
+        return versions
+
+    def diff(self, provider: str, from_id: int, to_id: int) -> Dict:
+        """Leaf-level changes between two versions"""
+        old = flatten(self.materialize(provider, from_id))
+        new = flatten(self.materialize(provider, to_id))
+        delta = compute_delta(old, new)
+        return {
+            'changed': {path: {'from': old.get(path), 'to': value} for path, value in delta['set'].items()},
+            'removed': delta['unset'],
+        }
+
+    @staticmethod
+    def _trim_cache():
+        while len(_MATERIALIZED) > MATERIALIZED_CACHE_SIZE:
+            _MATERIALIZED.popitem(last=False)
+
+def record_pricing_file(provider: str, pricing_file: str, effective_at: Optional[str] = None,
+                        db_path: str = DEFAULT_HISTORY_DB) -> Dict:
+    """Record the current contents of a pricing YAML file"""
+    with open(pricing_file, 'r') as f:
+        pricing = yaml.safe_load(f)
+    history = PricingHistory(db_path)
+    try:
+        return history.record(provider, pricing, effective_at)
+    finally:
+        history.close()
+
+def pricing_as_of(provider: str, as_of: str, db_path: str = DEFAULT_HISTORY_DB) -> Dict[str, Any]:
+    """Pricing in effect at a date, in the format load_cloud_pricing returns"""
+    from galaxy_cloud_calculator import pricing_from_config
+
+    if not Path(db_path).exists():
+        raise FileNotFoundError(f"Pricing history not found: {db_path}")
+    history = PricingHistory(db_path)
+    try:
+        pricing = history.as_of(provider, as_of)
+    finally:
+        history.close()
+    if pricing is None:
+        raise LookupError(f"No {provider} pricing recorded on or before {as_of}")
+    return pricing_from_config(pricing, provider)
+
+def main():
+    """Main function for pricing history"""
+    parser = argparse.ArgumentParser(description='Galaxy Platform Pricing History')
+    parser.add_argument('--db', default=DEFAULT_HISTORY_DB, help='Pricing history store (SQLite file)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    record = subparsers.add_parser('record', help='Record the current pricing file as a new version')
+    record.add_argument('provider', choices=['aws', 'gcp', 'azure'])
+    record.add_argument('--file', help='Pricing YAML (default: pricing_<provider>.yaml)')
+    record.add_argument('--effective', help='Effective date (ISO), default now')
+
+    log = subparsers.add_parser('log', help='List recorded versions')
+    log.add_argument('provider', choices=['aws', 'gcp', 'azure'])
+
+    show = subparsers.add_parser('show', help='Print the pricing in effect at a date')
+    show.add_argument('provider', choices=['aws', 'gcp', 'azure'])
+    show.add_argument('--as-of', required=True, help='ISO date or datetime')
+
+    diff = subparsers.add_parser('diff', help='Show changes between two versions')
+    diff.add_argument('provider', choices=['aws', 'gcp', 'azure'])
+    diff.add_argument('from_id', type=int)
+    diff.add_argument('to_id', type=int)
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'record':
+            result = record_pricing_file(args.provider, args.file or f'pricing_{args.provider}.yaml',
+                                         args.effective, args.db)
+            status = 'recorded' if result['changed'] else 'unchanged, not recorded'
+            print(f"Version {result['id']} ({result['content_hash'][:12]}): {status}")
+            return 0
+
+        history = PricingHistory(args.db)
+        try:
+            if args.command == 'log':
+                print(f"{'Version':>8} {'Effective':<20} {'Recorded':<20} {'Hash':<14} {'Changes':>8}")
+                for v in history.log(args.provider):
+                    kind = 'snapshot' if v['snapshot'] else v['changed_keys']
+                    print(f"{v['id']:>8} {v['effective_at']:<20} {v['recorded_at']:<20} "
+                          f"{v['content_hash'][:12]:<14} {kind:>8}")
+            elif args.command == 'show':
+                pricing = history.as_of(args.provider, args.as_of)
+                if pricing is None:
+                    raise LookupError(f"No {args.provider} pricing recorded on or before {args.as_of}")
+                print(yaml.safe_dump(pricing, sort_keys=False))
+            else:
+                changes = history.diff(args.provider, args.from_id, args.to_id)
+                for path, change in changes['changed'].items():
+                    print(f"  {path}: {change['from']} -> {change['to']}")
+                for path in changes['removed']:
+                    print(f"  {path}: removed")
+        finally:
+            history.close()
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
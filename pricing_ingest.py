@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+"""
+Bulk price-list ingestion for Galaxy Platform
+Stream-parses the providers' published price-list files (CSV, JSON, JSON
+Lines) into an indexed SQLite store keyed by (provider, region, service, SKU,
+unit) and generates per-region pricing dicts for calculate_with_cloud_pricing
+"""
+
+import argparse
+import codecs
+import copy
+import csv
+import json
+import re
+import sqlite3
+import statistics
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import yaml
+
+DEFAULT_PRICING_DB = 'pricing.db'
+DEFAULT_SKU_MAP = 'pricing_sku_map.yaml'
+
+# Column names in each provider's published price list. 'sku' may name several
+# columns, joined with ':' (tiered prices share a SKU id). 'filters' keeps only
+# rows whose column equals the given value.
+SOURCE_FORMATS = {
+    'aws': {  # AWS Price List bulk API, offer file CSV
+        'sku': ['RateCode'],
+        'region': 'Region Code',
+        'service': 'serviceCode',
+        'unit': 'Unit',
+        'price': 'PricePerUnit',
+        'currency': 'Currency',
+        'description': 'PriceDescription',
+        'filters': {'TermType': 'OnDemand'},
+        'attributes': ['usageType', 'productFamily', 'Instance Type', 'vCPU', 'Memory', 'Operating System',
+                       'Tenancy', 'Pre Installed S/W', 'Database Engine', 'Deployment Option',
+                       'Volume API Name', 'transferType', 'StartingRange'],
+    },
+    'gcp': {  # Cloud Billing pricing export CSV
+        'sku': ['SKU ID', 'Tiered usage start'],
+        'region': 'Geo taxonomy regions',
+        'service': 'Service description',
+        'unit': 'Unit description',
+        'price': 'List price ($)',
+        'currency': None,
+        'description': 'SKU description',
+        'filters': {},
+        'attributes': ['Product taxonomy', 'Geo taxonomy type', 'Tiered usage start'],
+    },
+    'azure': {  # Retail Prices API pages ({"Items": [...]}) or exported JSON Lines
+        'sku': ['meterId', 'tierMinimumUnits'],
+        'region': 'armRegionName',
+        'service': 'serviceName',
+        'unit': 'unitOfMeasure',
+        'price': 'retailPrice',
+        'currency': 'currencyCode',
+        'description': 'meterName',
+        'filters': {'type': 'Consumption'},
+        'attributes': ['productName', 'skuName', 'armSkuName', 'tierMinimumUnits'],
+        'json_key': 'Items',
+    },
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS prices (
+    provider TEXT NOT NULL,
+    region TEXT NOT NULL,
+    service TEXT NOT NULL,
+    sku TEXT NOT NULL,
+    unit TEXT NOT NULL,
+    price REAL NOT NULL,
+    currency TEXT,
+    description TEXT,
+    attributes TEXT,
+    PRIMARY KEY (provider, region, service, sku, unit)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY,
+    provider TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    byte_offset INTEGER NOT NULL DEFAULT 0,
+    rows INTEGER NOT NULL DEFAULT 0,
+    completed INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+# Generated pricing dicts, keyed by (db path, db mtime, provider, region, SKU map and base pricing mtimes)
+_GENERATED_CACHE: Dict[Tuple, Dict] = {}
+
+def iter_csv_rows(f, key_column: str, offset: int = 0) -> Iterator[Tuple[Dict[str, str], int]]:
+    """Yield (row, byte offset after the row) from a binary CSV file.
+
+    Lines before the header (AWS puts offer metadata there) are skipped; the
+    header is the first line containing key_column. When offset is past the
+    header, reading resumes there.
+    """
+    header = None
+    while True:
+        line = f.readline()
+        if not line:
+            return
+        fields = next(csv.reader([line.decode('utf-8-sig')]))
+        if key_column in fields:
+            header = fields
+            break
+
+    if offset > f.tell():
+        f.seek(offset)
+
+    for line in iter(f.readline, b''):
+        fields = next(csv.reader([line.decode('utf-8')]), None)
+        if fields:
+            yield dict(zip(header, fields)), f.tell()
+
+def iter_jsonl_rows(f, offset: int = 0) -> Iterator[Tuple[Dict[str, Any], int]]:
+    """Yield (record, byte offset after the record) from a binary JSON Lines file"""
+    f.seek(offset)
+    for line in iter(f.readline, b''):
+        if line.strip():
+            yield json.loads(line), f.tell()
+
+def iter_json_array(f, key: Optional[str] = None, offset: int = 0,
+                    chunk_size: int = 1 << 20) -> Iterator[Tuple[Any, int]]:
+    """Yield (element, byte offset after the element) from a JSON array without loading the file.
+
+    The array is the top-level value, or the value of `key` in the top-level
+    object. Elements are decoded one at a time from a sliding buffer. A
+    non-zero offset must be one previously yielded, and parsing resumes
+    inside the array.
+    """
+    decoder = json.JSONDecoder()
+    reader = codecs.getincrementaldecoder('utf-8')()
+    f.seek(offset)
+    buffer, pos = '', 0
+    mark, mark_bytes = 0, offset  # buffer[mark] sits at byte mark_bytes in the file
+
+    def fill() -> bool:
+        nonlocal buffer, pos, mark
+        chunk = f.read(chunk_size)
+        buffer = buffer[mark:] + reader.decode(chunk, final=not chunk)
+        pos, mark = pos - mark, 0
+        return bool(chunk)
+
+    if offset == 0:
+        start = re.compile(r'"%s"\s*:\s*\[' % re.escape(key)) if key else re.compile(r'\[')
+        while True:
+            match = start.search(buffer)
+            if match:
+                pos = match.end()
+                break
+            if not fill():
+                raise ValueError(f"No JSON array{' under ' + repr(key) if key else ''} found")
+
+    while True:
+        while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+            pos += 1
+        if pos == len(buffer):
+            if not fill():
+                raise ValueError("Unexpected end of file inside JSON array")
+            continue
+        if buffer[pos] == ']':
+            return
+
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if not fill():
+                raise
+            continue
+
+        mark_bytes += len(buffer[mark:end].encode('utf-8'))
+        mark = pos = end
+        yield item, mark_bytes
+
+def iter_source_rows(f, path: Path, fmt: Dict, offset: int = 0) -> Iterator[Tuple[Dict[str, Any], int]]:
+    """Pick a streaming reader from the file extension"""
+    suffix = path.suffix.lower()
+    if suffix == '.csv':
+        return iter_csv_rows(f, fmt['sku'][0], offset)
+    if suffix in ('.jsonl', '.ndjson'):
+        return iter_jsonl_rows(f, offset)
+    if suffix == '.json':
+        return iter_json_array(f, fmt.get('json_key'), offset)
+    raise ValueError(f"Unsupported price-list format: {path.name}")
+
+def normalize_row(row: Dict[str, Any], provider: str, fmt: Dict) -> List[Tuple]:
+    """Turn one published row into store rows (one per region it applies to)"""
+    for column, value in fmt['filters'].items():
+        if row.get(column) != value:
+            return []
+
+    try:
+        price = float(str(row.get(fmt['price'], '')).replace(',', ''))
+    except ValueError:
+        return []
+
+    sku = ':'.join(str(row[c]) for c in fmt['sku'] if row.get(c) not in (None, ''))
+    if not sku:
+        return []
+
+    attributes = {c: row[c] for c in fmt['attributes'] if row.get(c) not in (None, '')}
+    currency = row.get(fmt['currency'], 'USD') if fmt['currency'] else 'USD'
+    regions = [r.strip() for r in str(row.get(fmt['region']) or 'global').split(',') if r.strip()]
+
+    return [
+        (provider, region, str(row.get(fmt['service'], '')), sku, str(row.get(fmt['unit'], '')),
+         price, currency, str(row.get(fmt['description'], '')), json.dumps(attributes, sort_keys=True))
+        for region in regions
+    ]
+
+class PricingStore:
+    """Indexed local price-list store backed by SQLite"""
+
+    def __init__(self, path: str = DEFAULT_PRICING_DB):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def ingest(self, source: str, provider: str, batch_size: int = 5000, verbose: bool = False) -> Dict:
+        """Ingest one price-list file, resuming where a previous run stopped.
+
+        Rows and the source's byte offset are committed in the same
+        transaction, so an interrupted ingest picks up after the last batch.
+        A source whose size or mtime changed is ingested again from the start.
+        """
+        path = Path(source)
+        fmt = SOURCE_FORMATS[provider]
+        stat = path.stat()
+        key = str(path.resolve())
+
+        state = self.conn.execute(
+            "SELECT size, mtime, byte_offset, rows, completed FROM sources WHERE path = ?", (key,)).fetchone()
+        if state and (state[0], state[1]) == (stat.st_size, stat.st_mtime):
+            offset, rows, completed = state[2], state[3], state[4]
+        else:
+            offset, rows, completed = 0, 0, 0
+            self.conn.execute(
+                "INSERT OR REPLACE INTO sources (path, provider, size, mtime) VALUES (?, ?, ?, ?)",
+                (key, provider, stat.st_size, stat.st_mtime))
+            self.conn.commit()
+
+        if completed:
+            return {'source': source, 'rows': rows, 'resumed_from': offset, 'skipped': True}
+
+        resumed_from = offset
+        batch = []
+        with open(path, 'rb') as f:
+            for row, offset in iter_source_rows(f, path, fmt, offset):
+                batch.extend(normalize_row(row, provider, fmt))
+                if len(batch) >= batch_size:
+                    rows += self._write_batch(batch, key, offset, rows)
+                    batch = []
+                    if verbose:
+                        print(f"  {path.name}: {offset / max(stat.st_size, 1) * 100:5.1f}%  {rows:,} rows",
+                              file=sys.stderr)
+
+        rows += self._write_batch(batch, key, stat.st_size, rows, completed=True)
+        return {'source': source, 'rows': rows, 'resumed_from': resumed_from, 'skipped': False}
+
+    def _write_batch(self, batch: List[Tuple], key: str, offset: int, rows: int, completed: bool = False) -> int:
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO prices VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", batch)
+            self.conn.execute("UPDATE sources SET byte_offset = ?, rows = ?, completed = ? WHERE path = ?",
+                              (offset, rows + len(batch), int(completed), key))
+        return len(batch)
+
+    def lookup(self, provider: str, region: str, service: str, sku: str, unit: str) -> Optional[float]:
+        """Price of a single SKU (primary-key lookup)"""
+        row = self.conn.execute(
+            "SELECT price FROM prices WHERE provider = ? AND region = ? AND service = ? AND sku = ? AND unit = ?",
+            (provider, region, service, sku, unit)).fetchone()
+        return row[0] if row else None
+
+    def query(self, provider: str, region: str, service: str) -> List[Dict]:
+        """All rows for one service in one region (primary-key prefix scan)"""
+        cursor = self.conn.execute(
+            "SELECT sku, unit, price, description, attributes FROM prices "
+            "WHERE provider = ? AND region = ? AND service = ?", (provider, region, service))
+        return [{'sku': sku, 'unit': unit, 'price': price, 'description': description,
+                 'attributes': json.loads(attributes)} for sku, unit, price, description, attributes in cursor]
+
+    def regions(self, provider: str) -> List[str]:
+        """Regions with ingested prices for a provider"""
+        cursor = self.conn.execute("SELECT DISTINCT region FROM prices WHERE provider = ? ORDER BY region",
+                                   (provider,))
+        return [r[0] for r in cursor]
+
+def unit_quantity(unit: str) -> float:
+    """Leading quantity of a published unit, e.g. '100 Hours' -> 100, '10K' -> 10000"""
+    match = re.match(r'\s*([\d.,]+)\s*([KM])?\b', unit or '')
+    if not match:
+        return 1.0
+    quantity = float(match.group(1).replace(',', '')) or 1.0
+    return quantity * {'K': 1e3, 'M': 1e6}.get(match.group(2), 1)
+
+def _numeric(value: Any) -> Optional[float]:
+    match = re.search(r'[\d.,]+', str(value))
+    return float(match.group().replace(',', '')) if match else None
+
+def rule_matches(row: Dict, rule: Dict) -> bool:
+    """Check a store row against a pricing_sku_map.yaml rule"""
+    if 'description' in rule and not re.search(rule['description'], row['description']):
+        return False
+    if 'unit' in rule and not re.search(rule['unit'], row['unit']):
+        return False
+    for attribute, pattern in rule.get('attributes', {}).items():
+        if not re.search(pattern, str(row['attributes'].get(attribute, ''))):
+            return False
+    return True
+
+def resolve_rule(store: PricingStore, provider: str, region: str, rule: Dict) -> Optional[float]:
+    """Price for one pricing key in one region, or None if no SKU matches"""
+    values = []
+    for row in store.query(provider, region, rule['service']):
+        if not rule_matches(row, rule):
+            continue
+        value = row['price'] / unit_quantity(row['unit'])
+        if 'divide_by' in rule:
+            divisor = _numeric(row['attributes'].get(rule['divide_by'], ''))
+            if not divisor:
+                continue
+            value /= divisor
+        values.append(value * rule.get('scale', 1))
+
+    if not values:
+        return None
+    aggregate = {'mean': statistics.mean, 'min': min, 'max': max, 'median': statistics.median}
+    return aggregate[rule.get('aggregate', 'mean')](values)
+
+def _mtime(path: str) -> Optional[int]:
+    try:
+        return Path(path).stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+def load_sku_map(path: str = DEFAULT_SKU_MAP) -> Dict:
+    """Load the pricing key -> SKU rules"""
+    with open(path, 'r') as f:
+        return yaml.safe_load(f)
+
+def generate_pricing(provider: str, region: str, db_path: str = DEFAULT_PRICING_DB,
+                     sku_map: Optional[Dict] = None) -> Dict[str, Any]:
+    """Build a pricing dict for one region from the ingested price lists.
+
+    Starts from the hand-maintained pricing file so every key the calculator
+    needs is present, then overrides the keys mapped in pricing_sku_map.yaml.
+    Results are cached until the store, the SKU map or the base pricing file changes.
+    """
+    from galaxy_cloud_calculator import load_cloud_pricing
+
+    if not Path(db_path).exists():
+        raise FileNotFoundError(f"Pricing store not found: {db_path} (run pricing_ingest.py ingest first)")
+
+    cache_key = (str(Path(db_path).resolve()), Path(db_path).stat().st_mtime, provider, region,
+                 _mtime(DEFAULT_SKU_MAP), _mtime(f"pricing_{provider.lower()}.yaml"))
+    if sku_map is None and cache_key in _GENERATED_CACHE:
+        return copy.deepcopy(_GENERATED_CACHE[cache_key])
+
+    rules = (sku_map or load_sku_map()).get(provider, {})
+    pricing = copy.deepcopy(load_cloud_pricing(provider))
+    pricing['region'] = region
+
+    store = PricingStore(db_path)
+    matched, missing = [], []
+    try:
+        for key, rule in rules.items():
+            value = resolve_rule(store, provider, region, rule)
+            if value is None:
+                missing.append(key)
+                continue
+            section, name = key.split('.', 1)
+            pricing.setdefault(section, {})[name] = round(value, 6)
+            matched.append(key)
+    finally:
+        store.close()
+
+    pricing['generated'] = {'source': db_path, 'matched': matched, 'missing': missing}
+    if sku_map is None:
+        _GENERATED_CACHE[cache_key] = copy.deepcopy(pricing)
+    return pricing
+
+def main():
+    """Main function for price-list ingestion"""
+    parser = argparse.ArgumentParser(description='Galaxy Platform Price-List Ingestion')
+    parser.add_argument('--db', default=DEFAULT_PRICING_DB, help='Pricing store (SQLite file)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    ingest = subparsers.add_parser('ingest', help='Ingest bulk price-list files (resumable)')
+    ingest.add_argument('files', nargs='+', help='CSV, JSON or JSON Lines price-list files')
+    ingest.add_argument('--provider', choices=list(SOURCE_FORMATS), required=True)
+    ingest.add_argument('--batch-size', type=int, default=5000, help='Rows per committed batch')
+
+    generate = subparsers.add_parser('generate', help='Generate a pricing file for one region')
+    generate.add_argument('--provider', choices=list(SOURCE_FORMATS), required=True)
+    generate.add_argument('--region', required=True)
+    generate.add_argument('--sku-map', default=DEFAULT_SKU_MAP, help='Pricing key -> SKU rules')
+    generate.add_argument('--output', help='Write YAML here instead of stdout')
+
+    regions = subparsers.add_parser('regions', help='List regions with ingested prices')
+    regions.add_argument('--provider', choices=list(SOURCE_FORMATS), required=True)
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'ingest':
+            store = PricingStore(args.db)
+            try:
+                for source in args.files:
+                    result = store.ingest(source, args.provider, args.batch_size, verbose=True)
+                    status = 'already ingested' if result['skipped'] else (
+                        f"resumed at byte {result['resumed_from']:,}" if result['resumed_from'] else 'ingested')
+                    print(f"{source}: {result['rows']:,} rows ({status})")
+            finally:
+                store.close()
+
+        elif args.command == 'generate':
+            pricing = generate_pricing(args.provider, args.region, args.db, load_sku_map(args.sku_map))
+            missing = pricing['generated']['missing']
+            if missing:
+                print(f"No matching SKUs for: {', '.join(missing)} (kept file defaults)", file=sys.stderr)
+            output = yaml.safe_dump(pricing, sort_keys=False)
+            if args.output:
+                Path(args.output).write_text(output)
+                print(f"Wrote {args.output}")
+            else:
+                print(output)
+
+        else:
+            store = PricingStore(args.db)
+            print('\n'.join(store.regions(args.provider)))
+            store.close()
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -81,6 +81,18 @@ PRICING = {
         "container_registry_gb": 0.10,  # per GB-month
         "pipeline_user": 10,  # per user per month
     },
+    
+    "commitments": {
+        # Discount vs on-demand for committing to a steady $/hour of spend
+        "compute": {
+            "commit_1yr": {"term_months": 12, "discount": 0.30},
+            "commit_3yr": {"term_months": 36, "discount": 0.50},
+        },
+        "database": {
+            "reserved_1yr": {"term_months": 12, "discount": 0.35},
+            "reserved_3yr": {"term_months": 36, "discount": 0.55},
+        },
+    },
 }
 
 def get_instance_size(customer_count):
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Report pipeline for Galaxy Platform
+Runs the cost models in-process, spreads independent report targets over a
+process pool, and builds the summary from the computed results. Artifacts are
+content-addressed by their inputs, so unchanged ones are reused from a local
+cache instead of being rebuilt.
+"""
+
+import argparse
+import ast
+import contextlib
+import hashlib
+import importlib
+import io
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+CONFIG_DIR = Path(__file__).parent
+
+DEFAULT_CACHE_DIR = '.report_cache'
+
+SUMMARY_MODULES = {'complete': 'galaxy_complete_cost_model', 'partial': 'galaxy_cost_model'}
+
+# Report lines that record when, not what, was built (utils.print_cost_report);
+# restamped when a cached report is reused so it carries this build's time
+GENERATED_LINE = re.compile(r'^Generated: \d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$', re.MULTILINE)
+
+@dataclass
+class ReportTarget:
+    """A text report: the captured output of a model's main() for one argv"""
+    filename: str
+    module: str
+    argv: List[str] = field(default_factory=list)
+    description: str = ''
+
+@dataclass
+class SummaryTarget:
+    """A summary.json entry computed from a model's cost functions"""
+    name: str
+    model: str  # 'complete' (12 services) or 'partial' (7 services)
+    config: str
+    architecture: str
+
+REPORT_TARGETS = [
+    ReportTarget('galaxy_complete_100k_single_region.txt', 'galaxy_complete_cost_model', ['galaxy_config.yaml'],
+                 'COMPLETE Galaxy model (12 services, 100K customers, single region)'),
+    ReportTarget('galaxy_complete_architecture_comparison.txt', 'galaxy_complete_cost_model',
+                 ['galaxy_config.yaml', '--compare'], 'COMPLETE Galaxy model with architecture comparison'),
+    ReportTarget('galaxy_500k_multi_region.txt', 'galaxy_complete_cost_model', ['config_multiregion.yaml'],
+                 'Galaxy model (500K customers, multi-region)'),
+    ReportTarget('generic_model_comparison.txt', 'cost_model', ['config.yaml', '--sensitivity'],
+                 'Generic model for comparison'),
+]
+
+SUMMARY_TARGETS = [
+    SummaryTarget('complete_galaxy_100k_single', 'complete', 'galaxy_config.yaml', 'single_region_3az'),
+    SummaryTarget('complete_galaxy_100k_multi', 'complete', 'galaxy_config.yaml', 'multi_region_3az'),
+    SummaryTarget('partial_galaxy_100k_single', 'partial', 'galaxy_config.yaml', 'single_region_3az'),
+]
+
+def run_model_main(module: str, argv: List[str]) -> Tuple[int, str, str]:
+    """Run a model's main(argv) in this process; returns (exit code, stdout, stderr)"""
+    stdout, stderr = io.StringIO(), io.StringIO()
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        try:
+            code = importlib.import_module(module).main(argv) or 0
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else 1
+    return code, stdout.getvalue(), stderr.getvalue()
+
+def build_report(target: ReportTarget) -> Dict[str, Any]:
+    """Produce one text report"""
+    start = time.perf_counter()
+    code, output, errors = run_model_main(target.module, target.argv)
+    result = {'filename': target.filename, 'text': output, 'seconds': time.perf_counter() - start}
+    if code:
+        result['error'] = errors.strip() or f"{target.module} exited with status {code}"
+    return result
+
+def build_summary_entry(target: SummaryTarget) -> Dict[str, Any]:
+    """Price one summary entry with the model's own cost functions"""
+    from utils import format_cost, load_config
+
+    config = dict(load_config(target.config), architecture_variant=target.architecture)
+    if target.model == 'complete':
+        from galaxy_complete_cost_model import (
+            PRICING, calculate_complete_galaxy_metrics, calculate_complete_galaxy_costs, GALAXY_SERVICES
+        )
+        metrics = calculate_complete_galaxy_metrics(config)
+        costs = calculate_complete_galaxy_costs(metrics, PRICING)
+    else:
+        from galaxy_cost_model import PRICING, calculate_galaxy_metrics, calculate_galaxy_costs, GALAXY_SERVICES
+        metrics = calculate_galaxy_metrics(config)
+        costs = calculate_galaxy_costs(metrics, PRICING)
+
+    return {
+        'customer_count': metrics['customer_count'],
+        'architecture': target.architecture,
+        'services': len(GALAXY_SERVICES),
+        'monthly_cost': format_cost(costs['total_monthly']),
+        'annual_cost': format_cost(costs['total_annual']),
+        'cost_per_customer': format_cost(costs['cost_per_customer']),
+    }
+
+def _file_hash(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+_SOURCES: Dict[str, Set[Path]] = {}
+
+def local_sources(module: str) -> Set[Path]:
+    """Source files of a module and every local module it imports, transitively"""
+    if module in _SOURCES:
+        return _SOURCES[module]
+    sources: Set[Path] = set()
+    pending = [module]
+    while pending:
+        path = CONFIG_DIR / f"{pending.pop()}.py"
+        if not path.exists() or path in sources:
+            continue
+        sources.add(path)
+        for node in ast.walk(ast.parse(path.read_text())):
+            if isinstance(node, ast.Import):
+                pending.extend(alias.name.split('.')[0] for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                pending.append(node.module.split('.')[0])
+    _SOURCES[module] = sources
+    return sources
+
+def artifact_key(kind: str, target) -> str:
+    """Hash of everything an artifact depends on: the target, its input files and model code"""
+    if kind == 'report':
+        module = target.module
+        inputs = [CONFIG_DIR / arg for arg in target.argv if (CONFIG_DIR / arg).is_file()]
+    else:
+        module = SUMMARY_MODULES[target.model]
+        inputs = [CONFIG_DIR / target.config]
+    sources = local_sources(module) | {Path(__file__)}
+    manifest = {
+        'kind': kind,
+        'target': {k: v for k, v in vars(target).items() if k != 'description'},
+        'inputs': {p.name: _file_hash(p) for p in sorted(inputs)},
+        'code': {p.name: _file_hash(p) for p in sorted(sources)},
+    }
+    return hashlib.sha256(json.dumps(manifest, sort_keys=True).encode('utf-8')).hexdigest()
+
+class ArtifactCache:
+    """Built artifacts stored on disk under their content key"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_DIR):
+        self.path = Path(path)
+
+    def _file(self, key: str) -> Path:
+        return self.path / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict]:
+        try:
+            with open(self._file(key)) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def put(self, key: str, value: Dict):
+        path = self._file(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix('.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(value, f)
+        tmp.replace(path)
+
+def restamp(text: str, when: Optional[datetime] = None) -> str:
+    """Replace the build timestamp in a report's header with when (default now)"""
+    stamp = (when or datetime.now()).strftime('%Y-%m-%d %H:%M:%S')
+    return GENERATED_LINE.sub(f"Generated: {stamp}", text)
+
+def _run(job):
+    """Build one target; a failure is returned as that target's error, not raised"""
+    kind, target = job
+    start = time.perf_counter()
+    try:
+        if kind == 'report':
+            return kind, target, build_report(target)
+        return kind, target, build_summary_entry(target)
+    except Exception as e:
+        if kind == 'report':
+            return kind, target, {'filename': target.filename, 'text': '', 'seconds': time.perf_counter() - start,
+                                  'error': f"{type(e).__name__}: {e}"}
+        return kind, target, {'error': str(e)}
+
+def run_pipeline(report_targets: Optional[List[ReportTarget]] = None,
+                 summary_targets: Optional[List[SummaryTarget]] = None,
+                 workers: Optional[int] = None, verbose: bool = True,
+                 cache: Optional[ArtifactCache] = None) -> Tuple[List[Dict], Dict[str, Dict]]:
+    """Build every target concurrently; returns (reports in target order, summary entries).
+
+    With a cache, targets whose key is already stored are reused and only
+    stale ones are built. workers=0 builds everything in this process, one
+    target at a time.
+    """
+    report_targets = REPORT_TARGETS if report_targets is None else report_targets
+    summary_targets = SUMMARY_TARGETS if summary_targets is None else summary_targets
+    jobs = [('report', t) for t in report_targets] + [('summary', t) for t in summary_targets]
+
+    reports: Dict[str, Dict] = {}
+    summary: Dict[str, Dict] = {}
+    keys: Dict[int, str] = {}
+
+    def collect(kind, target, result, cached=False):
+        if cache and not cached and 'error' not in result:
+            cache.put(keys[id(target)], result)
+        if kind == 'report':
+            reports[target.filename] = dict(result, cached=cached)
+            if cached:
+                reports[target.filename]['text'] = restamp(result['text'])
+            if verbose:
+                if 'error' in result:
+                    status = f"failed: {result['error']}"
+                else:
+                    status = 'reused' if cached else f"{result['seconds']:.2f}s"
+                print(f"  {target.filename:<45} {status}")
+        else:
+            summary[target.name] = result
+
+    if cache:
+        stale = []
+        for kind, target in jobs:
+            keys[id(target)] = artifact_key(kind, target)
+            result = cache.get(keys[id(target)])
+            if result is None:
+                stale.append((kind, target))
+            else:
+                collect(kind, target, result, cached=True)
+        jobs = stale
+
+    if workers == 0:
+        for job in jobs:
+            collect(*_run(job))
+    elif jobs:
+        workers = workers or min(len(jobs), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_run, job): job for job in jobs}
+            for future in as_completed(futures):
+                kind, target = futures[future]
+                collect(kind, target, future.result()[2])
+
+    return [reports[t.filename] for t in report_targets], {t.name: summary[t.name] for t in summary_targets}
+
+def config_targets(configs: List[str]) -> List[ReportTarget]:
+    """A complete-model report per extra config file, named after the config"""
+    return [ReportTarget(f"{Path(config).stem}.txt", 'galaxy_complete_cost_model', [config],
+                         f"COMPLETE Galaxy model for {config}") for config in configs]
+
+def _write_if_changed(path: Path, text: str) -> bool:
+    """Leave files whose content is already current untouched"""
+    if path.exists() and path.read_text() == text:
+        return False
+    with open(path, 'w') as f:
+        f.write(text)
+    return True
+
+def build_reports(report_dir: Path, workers: Optional[int] = None, verbose: bool = True,
+                  cache: Optional[ArtifactCache] = None,
+                  report_targets: Optional[List[ReportTarget]] = None) -> Dict[str, Any]:
+    """Write every text report and summary.json into report_dir; returns the summary"""
+    from galaxy_complete_cost_model import GALAXY_SERVICES
+
+    reports, models = run_pipeline(report_targets, workers=workers, verbose=verbose, cache=cache)
+    for report in reports:
+        _write_if_changed(report_dir / report['filename'], report['text'])
+
+    summary = {
+        'generated': datetime.now().strftime('%Y%m%d_%H%M%S'),
+        'models': models,
+        'all_services': [f"{key} ({service['name']})" for key, service in GALAXY_SERVICES.items()],
+        'failed_reports': [r['filename'] for r in reports if 'error' in r],
+        'reused_reports': [r['filename'] for r in reports if r['cached']],
+    }
+    with open(report_dir / 'summary.json', 'w') as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+def main():
+    """Main function for the report pipeline"""
+    parser = argparse.ArgumentParser(description='Galaxy Platform Report Pipeline')
+    parser.add_argument('--output', help='Report directory (default: cost_reports_<timestamp>)')
+    parser.add_argument('--workers', type=int, help='Worker processes (0 = build in this process)')
+    parser.add_argument('--config', action='append', default=[],
+                       help='Also report on this config with the complete model (repeatable)')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help='Artifact cache directory')
+    parser.add_argument('--no-cache', action='store_true', help='Rebuild every artifact')
+
+    args = parser.parse_args()
+
+    report_dir = Path(args.output or f"cost_reports_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    report_dir.mkdir(parents=True, exist_ok=True)
+    cache = None if args.no_cache else ArtifactCache(args.cache_dir)
+    targets = REPORT_TARGETS + config_targets(args.config)
+
+    start = time.perf_counter()
+    print(f"Generating reports in {report_dir}/")
+    summary = build_reports(report_dir, args.workers, cache=cache, report_targets=targets)
+    reused = len(summary['reused_reports'])
+    print(f"\n✓ {len(targets) - reused} reports built, {reused} reused, "
+          f"{len(summary['models'])} summary entries in {time.perf_counter() - start:.2f}s")
+    return 1 if summary['failed_reports'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
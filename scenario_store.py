@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Scenario store for Galaxy Platform
+Persists normalised calculation inputs, pricing / config versions and
+component results in a local SQLite database, with indexed queries, diffs
+and result caching
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from pricing_history import content_hash
+
+DEFAULT_SCENARIO_DB = 'scenarios.db'
+
+_MODEL_FINGERPRINT: Optional[str] = None
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scenarios (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    source TEXT NOT NULL,
+    input_hash TEXT NOT NULL,
+    pricing_hash TEXT,
+    config_hash TEXT,
+    provider TEXT,
+    architecture TEXT,
+    retail INTEGER,
+    sme INTEGER,
+    corporate INTEGER,
+    customer_count INTEGER,
+    volume_multiplier REAL,
+    total_monthly REAL,
+    inputs TEXT NOT NULL,
+    components TEXT NOT NULL,
+    response TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_scenarios_lookup ON scenarios (input_hash, pricing_hash, config_hash);
+CREATE INDEX IF NOT EXISTS idx_scenarios_provider ON scenarios (provider, architecture, created_at);
+CREATE INDEX IF NOT EXISTS idx_scenarios_segments ON scenarios (retail, sme, corporate);
+CREATE INDEX IF NOT EXISTS idx_scenarios_customers ON scenarios (customer_count);
+CREATE INDEX IF NOT EXISTS idx_scenarios_created ON scenarios (created_at);
+"""
+
+COLUMNS = ['id', 'created_at', 'source', 'input_hash', 'pricing_hash', 'config_hash', 'provider', 'architecture',
+           'retail', 'sme', 'corporate', 'customer_count', 'volume_multiplier', 'total_monthly']
+
+def canonical_hash(value: Any) -> str:
+    """SHA-256 of the canonical JSON form of a value"""
+    canonical = json.dumps(value, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def model_fingerprint() -> str:
+    """Hash of the model sources, so cached results are invalidated when the code changes"""
+    global _MODEL_FINGERPRINT
+    if _MODEL_FINGERPRINT is None:
+        digest = hashlib.sha256()
+        for source in sorted(Path(__file__).parent.glob('*.py')):
+            digest.update(source.name.encode('utf-8'))
+            digest.update(source.read_bytes())
+        _MODEL_FINGERPRINT = digest.hexdigest()
+    return _MODEL_FINGERPRINT
+
+def scenario_record(inputs: Dict[str, Any], components: Dict[str, float], total_monthly: float,
+                    source: str = 'api', pricing: Optional[Dict] = None, config: Optional[Dict] = None,
+                    response: Optional[Dict] = None) -> Dict[str, Any]:
+    """Normalise one calculation into a row for save()/save_many().
+
+    The pricing hash is the pricing_history content hash, so a stored
+    scenario can be matched to the pricing version it was priced with.
+    """
+    segments = inputs.get('segments', {})
+    retail = inputs.get('retail', segments.get('retail'))
+    sme = inputs.get('sme', segments.get('sme'))
+    corporate = inputs.get('corporate', segments.get('corporate'))
+    customer_count = inputs.get('customer_count')
+    if customer_count is None and None not in (retail, sme, corporate):
+        customer_count = retail + sme + corporate
+
+    return {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'source': source,
+        'input_hash': canonical_hash(inputs),
+        'pricing_hash': content_hash(pricing) if pricing is not None else None,
+        'config_hash': canonical_hash(config) if config is not None else None,
+        'provider': inputs.get('provider'),
+        'architecture': inputs.get('architecture', inputs.get('architecture_variant')),
+        'retail': retail,
+        'sme': sme,
+        'corporate': corporate,
+        'customer_count': customer_count,
+        'volume_multiplier': inputs.get('volumeMultiplier', inputs.get('volume_multiplier', 1.0)),
+        'total_monthly': total_monthly,
+        'inputs': json.dumps(inputs, sort_keys=True, default=str),
+        'components': json.dumps(components, sort_keys=True),
+        'response': json.dumps(response, default=str) if response is not None else None,
+    }
+
+class ScenarioStore:
+    """Local scenario and result store backed by SQLite"""
+
+    def __init__(self, path: str = DEFAULT_SCENARIO_DB):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def save(self, record: Dict[str, Any]) -> int:
+        """Insert one scenario record and return its id"""
+        with self.conn:
+            cursor = self.conn.execute(
+                f"INSERT INTO scenarios ({', '.join(record)}) VALUES ({', '.join('?' * len(record))})",
+                list(record.values()))
+        return cursor.lastrowid
+
+    def save_many(self, records: Iterable[Dict[str, Any]], chunk_size: int = 1000) -> int:
+        """Bulk insert records in chunked transactions; returns the number saved"""
+        saved, chunk = 0, []
+        for record in records:
+            chunk.append(record)
+            if len(chunk) >= chunk_size:
+                saved += self._insert_chunk(chunk)
+                chunk = []
+        if chunk:
+            saved += self._insert_chunk(chunk)
+        return saved
+
+    def _insert_chunk(self, chunk: List[Dict[str, Any]]) -> int:
+        columns = list(chunk[0])
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT INTO scenarios ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                [[r.get(c) for c in columns] for r in chunk])
+        return len(chunk)
+
+    def find_cached(self, inputs: Dict[str, Any], pricing: Optional[Dict] = None,
+                    config: Optional[Dict] = None) -> Optional[Dict]:
+        """Latest stored result for identical inputs, pricing and config, if any"""
+        row = self.conn.execute(
+            "SELECT id, response, components, total_monthly FROM scenarios "
+            "WHERE input_hash = ? AND pricing_hash IS ? AND config_hash IS ? ORDER BY id DESC LIMIT 1",
+            (canonical_hash(inputs),
+             content_hash(pricing) if pricing is not None else None,
+             canonical_hash(config) if config is not None else None)).fetchone()
+        if row is None:
+            return None
+        return {
+            'id': row[0],
+            'response': json.loads(row[1]) if row[1] else None,
+            'components': json.loads(row[2]),
+            'total_monthly': row[3],
+        }
+
+    def query(self, provider: Optional[str] = None, architecture: Optional[str] = None,
+              retail: Optional[int] = None, sme: Optional[int] = None, corporate: Optional[int] = None,
+              min_customers: Optional[int] = None, max_customers: Optional[int] = None,
+              since: Optional[str] = None, until: Optional[str] = None, source: Optional[str] = None,
+              limit: int = 100, with_components: bool = False) -> List[Dict]:
+        """Scenarios matching every given filter, newest first"""
+        filters = {
+            'provider = ?': provider, 'architecture = ?': architecture, 'retail = ?': retail, 'sme = ?': sme,
+            'corporate = ?': corporate, 'customer_count >= ?': min_customers,
+            'customer_count <= ?': max_customers, 'created_at >= ?': since, 'created_at <= ?': until,
+            'source = ?': source,
+        }
+        clauses = [clause for clause, value in filters.items() if value is not None]
+        params = [value for value in filters.values() if value is not None]
+        columns = COLUMNS + (['components'] if with_components else [])
+        sql = f"SELECT {', '.join(columns)} FROM scenarios"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY created_at DESC, id DESC LIMIT ?"
+
+        rows = []
+        for values in self.conn.execute(sql, params + [limit]):
+            row = dict(zip(columns, values))
+            if with_components:
+                row['components'] = json.loads(row['components'])
+            rows.append(row)
+        return rows
+
+    def get(self, scenario_id: int) -> Optional[Dict]:
+        """One scenario with its inputs and components"""
+        columns = COLUMNS + ['inputs', 'components']
+        values = self.conn.execute(f"SELECT {', '.join(columns)} FROM scenarios WHERE id = ?",
+                                   (scenario_id,)).fetchone()
+        if values is None:
+            return None
+        row = dict(zip(columns, values))
+        row['inputs'] = json.loads(row['inputs'])
+        row['components'] = json.loads(row['components'])
+        return row
+
+    def diff(self, from_id: int, to_id: int) -> Dict:
+        """Input changes and per-component cost deltas between two scenarios"""
+        old, new = self.get(from_id), self.get(to_id)
+        if old is None or new is None:
+            raise KeyError(f"Unknown scenario id: {from_id if old is None else to_id}")
+
+        keys = set(old['inputs']) | set(new['inputs'])
+        components = set(old['components']) | set(new['components'])
+        return {
+            'from': from_id,
+            'to': to_id,
+            'inputs': {k: {'from': old['inputs'].get(k), 'to': new['inputs'].get(k)}
+                       for k in sorted(keys) if old['inputs'].get(k) != new['inputs'].get(k)},
+            'pricing_changed': old['pricing_hash'] != new['pricing_hash'],
+            'components': {c: new['components'].get(c, 0) - old['components'].get(c, 0)
+                           for c in sorted(components)},
+            'total_monthly': new['total_monthly'] - old['total_monthly'],
+        }
+
+def main():
+    """Main function for the scenario store"""
+    parser = argparse.ArgumentParser(description='Galaxy Platform Scenario Store')
+    parser.add_argument('--db', default=DEFAULT_SCENARIO_DB, help='Scenario store (SQLite file)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    listing = subparsers.add_parser('list', help='List stored scenarios')
+    listing.add_argument('--provider')
+    listing.add_argument('--architecture')
+    listing.add_argument('--since', help='ISO date')
+    listing.add_argument('--limit', type=int, default=20)
+
+    show = subparsers.add_parser('show', help='Show one scenario')
+    show.add_argument('id', type=int)
+
+    diff = subparsers.add_parser('diff', help='Compare two scenarios')
+    diff.add_argument('from_id', type=int)
+    diff.add_argument('to_id', type=int)
+
+    args = parser.parse_args()
+
+    from utils import format_cost
+
+    try:
+        with ScenarioStore(args.db) as store:
+            if args.command == 'list':
+                print(f"{'Id':>6} {'Created':<20} {'Source':<8} {'Provider':<8} {'Architecture':<20} "
+                      f"{'Customers':>12} {'Monthly':>12}")
+                for row in store.query(args.provider, args.architecture, since=args.since, limit=args.limit):
+                    print(f"{row['id']:>6} {row['created_at']:<20} {row['source']:<8} {row['provider'] or '-':<8} "
+                          f"{row['architecture'] or '-':<20} {row['customer_count'] or 0:>12,} "
+                          f"{format_cost(row['total_monthly']):>12}")
+            elif args.command == 'show':
+                row = store.get(args.id)
+                if row is None:
+                    raise KeyError(f"Unknown scenario id: {args.id}")
+                print(json.dumps(row, indent=2))
+            else:
+                changes = store.diff(args.from_id, args.to_id)
+                for key, change in changes['inputs'].items():
+                    print(f"  input {key}: {change['from']} -> {change['to']}")
+                if changes['pricing_changed']:
+                    print("  pricing changed")
+                for component, delta in changes['components'].items():
+                    if delta:
+                        print(f"  {component:<15} {'+' if delta >= 0 else '-'}{format_cost(abs(delta))}")
+                print(f"  {'total':<15} {'+' if changes['total_monthly'] >= 0 else '-'}"
+                      f"{format_cost(abs(changes['total_monthly']))}")
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
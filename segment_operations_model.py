@@ -4,6 +4,11 @@ Segment-based operations model for Galaxy Platform
 Supports Retail, SME, and Corporate customer segments with different behavior patterns
 """
 
+if __name__ == "__main__":
+    # Hand the run to a warm calculation daemon (calc_daemon.py) when one is listening
+    from calc_daemon import forward_cli
+    forward_cli(__file__)
+
 import yaml
 import csv
 import json
@@ -400,7 +405,7 @@ def print_summary_report(retail_count: int, sme_count: int, corporate_count: int
     print(f"  Data growth per year:   {totals['total_data_gb_month'] * 12:>10,.1f} GB")
     print("="*80)
 
-def main():
+def main(argv=None):
     """Main function to generate all segment files"""
     import argparse
     
@@ -411,7 +416,7 @@ def main():
     parser.add_argument('--multiplier', type=float, default=1.0, help='Volume multiplier for all operations')
     parser.add_argument('--output-dir', default='.', help='Output directory for CSV files')
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     # Generate configuration file
     print("Generating volume configuration...")
@@ -0,0 +1,44 @@
+import copy
+
+import pytest
+
+from galaxy_cloud_calculator import calculate_with_cloud_pricing
+from whatif_model import WhatIfSession
+
+EDITS = [
+    {'price': 'compute.vcpu_hour', 'value': 0.05},
+    {'price': 'database.storage_gb', 'value': 0.5},
+    {'service': 'TITAN', 'operation': 'Payment Transaction', 'retail_volume': 60},
+    {'metric': 'architecture_variant', 'value': 'multi_region_3az'},
+    {'metric': 'backup_retention_days', 'value': 14},
+    {'metric': 'log_retention_days', 'value': 365},
+    {'metric': 'customer_count', 'value': 2000000},
+]
+
+def full_recompute(session: WhatIfSession) -> dict:
+    return calculate_with_cloud_pricing(copy.deepcopy(session.metrics), copy.deepcopy(session.pricing))
+
+@pytest.mark.parametrize('provider', ['aws', 'gcp'])
+@pytest.mark.parametrize('edit', EDITS, ids=lambda edit: edit.get('price') or edit.get('metric') or edit['operation'])
+def test_edit_matches_full_recompute(provider, edit):
+    session = WhatIfSession(1000000, 100000, 10000, provider)
+    result = session.apply([edit])
+    expected = full_recompute(session)
+
+    assert result['total_monthly'] == expected['total_monthly']
+    assert result['components'] == expected['components']
+
+def test_architecture_edit_recomputes_variant_components():
+    session = WhatIfSession(1000000, 100000, 10000, 'aws')
+    before = session.totals['total_monthly']
+    result = session.apply([{'metric': 'architecture_variant', 'value': 'multi_region_3az'}])
+
+    assert {'compute', 'database', 'observability'} <= set(result['recomputed'])
+    assert result['total_monthly'] > before
+
+def test_unchanged_edit_recomputes_nothing():
+    session = WhatIfSession(100000, 10000, 1000, 'gcp')
+    result = session.apply([{'metric': 'architecture_variant', 'value': 'single_region_3az'}])
+
+    assert result['recomputed'] == []
+    assert result['total_delta'] == 0
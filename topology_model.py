@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Multi-region topology model for Galaxy Platform
+Prices an explicit region layout (primary / active / standby regions,
+database replicas and cross-region replication traffic) instead of the flat
+architecture multiplier, and searches candidate N-region layouts
+"""
+
+import argparse
+import sys
+from itertools import combinations
+from typing import Dict, List, Optional
+import numpy as np
+
+from galaxy_complete_cost_model import estimate_database_instance_cost
+
+DEFAULT_TOPOLOGY_SETTINGS = {
+    'survive_region_loss': True,
+    'standby_capacity': 0.3,
+    'min_region_capacity': 0.25,
+    'replica_cost_fraction': 0.7,
+    'replication_amplification': 2.0,
+}
+
+LAYOUT_MODES = ['active_active', 'active_standby', 'active_active_standby']
+
+def replication_write_gb(metrics: Dict) -> float:
+    """Logical GB written per month, from write ops x bytes_per_operation in the operation profiles"""
+    if 'write_gb_month' in metrics:
+        return metrics['write_gb_month']
+
+    # Without a segment split, treat every customer as retail
+    from segment_operations_model import calculate_total_volumes
+    return calculate_total_volumes(metrics['customer_count'], 0, 0)['total_data_gb_month']
+
+def single_region_components(metrics: Dict, pricing: Dict) -> Dict[str, float]:
+    """Production component costs for one region, used as the per-region unit cost"""
+    from galaxy_cloud_calculator import calculate_with_cloud_pricing
+
+    single = dict(metrics, architecture_variant='single_region_3az', include_nonprod=False)
+    single.pop('topology', None)
+    return calculate_with_cloud_pricing(single, pricing)['components']
+
+def layout_matrices(layouts: List[Dict], region_names: List[str], settings: Dict) -> Dict[str, np.ndarray]:
+    """Encode layouts as (layouts x regions) matrices of roles, traffic shares and capacity"""
+    index = {name: i for i, name in enumerate(region_names)}
+    shape = (len(layouts), len(region_names))
+    present = np.zeros(shape)
+    primary = np.zeros(shape)
+    standby = np.zeros(shape)
+    shares = np.zeros(shape)
+
+    for row, layout in enumerate(layouts):
+        for region in layout['regions']:
+            col = index[region['name']]
+            present[row, col] = 1
+            role = region.get('role', 'active')
+            if role == 'standby':
+                standby[row, col] = 1
+            else:
+                primary[row, col] = role == 'primary'
+                shares[row, col] = region.get('traffic_share', 1)
+
+    shares = shares / np.maximum(shares.sum(axis=1, keepdims=True), 1e-12)
+    active = (shares > 0).astype(float)
+
+    # Each active region must absorb its share of the largest other region if it fails
+    capacity = shares.copy()
+    if settings['survive_region_loss']:
+        ordered = np.sort(shares, axis=1)
+        top, second = ordered[:, -1:], ordered[:, -2:-1] if shares.shape[1] > 1 else np.zeros_like(ordered[:, -1:])
+        largest_other = np.where(shares >= top, second, top)
+        headroom = np.where(largest_other < 1, 1 - largest_other, 1)
+        capacity = np.where(active > 0, shares / headroom, 0)
+        capacity = np.minimum(capacity, 1)
+
+    capacity = capacity + standby * settings['standby_capacity']
+    capacity = np.where(present > 0, np.maximum(capacity, settings['min_region_capacity']), 0)
+
+    return {
+        'present': present,
+        'primary': primary,
+        'active': active,
+        'standby': standby,
+        'shares': shares,
+        'capacity': capacity,
+    }
+
+def evaluate_layouts(matrices: Dict[str, np.ndarray], multipliers: np.ndarray, base: Dict[str, float],
+                     pricing: Dict, metrics: Dict, settings: Dict) -> Dict[str, np.ndarray]:
+    """Monthly production cost per component for every layout at once"""
+    present, primary, capacity = matrices['present'], matrices['primary'], matrices['capacity']
+    replicas = present * (1 - primary)
+    region_count = present.sum(axis=1)
+
+    db_instances = estimate_database_instance_cost(pricing)
+    db_data = max(base['database'] - db_instances, 0)
+
+    inter_region_gb = pricing['network'].get('inter_region_gb', 0.02)
+    backup_copy_gb = pricing['backup_dr'].get('cross_region_copy_gb',
+                                              pricing['backup_dr'].get('cross_region_replication_gb', inter_region_gb))
+
+    # Primary ships its write stream to every other region; writes accepted in
+    # other active regions are forwarded to the primary first.
+    write_gb = replication_write_gb(metrics)
+    replication_gb = write_gb * settings['replication_amplification'] * (region_count - 1)
+    forwarded_gb = write_gb * (matrices['shares'] * (1 - primary)).sum(axis=1)
+
+    return {
+        'compute': base['compute'] * (capacity @ multipliers),
+        'database': (db_instances * (primary @ multipliers) +
+                     db_instances * settings['replica_cost_fraction'] * (replicas @ multipliers) +
+                     db_data * (present @ multipliers)),
+        'network': base['network'] + (replication_gb + forwarded_gb) * inter_region_gb,
+        'observability': base['observability'] * capacity.sum(axis=1),
+        'cache_queue': base['cache_queue'] * ((matrices['active'] + matrices['standby'] *
+                                               settings['standby_capacity']) @ multipliers),
+        'security': base['security'] * region_count,
+        'storage': base['storage'] * (present @ multipliers),
+        'backup_dr': base['backup_dr'] + metrics['total_data_gb'] * backup_copy_gb * np.minimum(region_count - 1, 1),
+        'api_gateway': np.full(len(region_count), base['api_gateway']),
+        'cicd': np.full(len(region_count), base['cicd']),
+        'replication_gb': replication_gb + forwarded_gb,
+    }
+
+REGION_ROLES = ('primary', 'active', 'standby')
+
+def _number(value, label: str, minimum: float = 0.0) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not np.isfinite(value) or value < minimum:
+        raise ValueError(f"{label} must be a number >= {minimum:g}")
+    return value
+
+def validate_topology(topology: Dict):
+    """Raise ValueError describing the first problem with a topology definition"""
+    if not isinstance(topology, dict):
+        raise ValueError("Topology must be an object")
+    regions = topology.get('regions')
+    if not isinstance(regions, list) or not regions:
+        raise ValueError("Topology must have a non-empty 'regions' list")
+    names = set()
+    for i, region in enumerate(regions):
+        if not isinstance(region, dict) or not isinstance(region.get('name'), str) or not region['name']:
+            raise ValueError(f"Topology region {i} must be an object with a 'name'")
+        if region['name'] in names:
+            raise ValueError(f"Topology region {region['name']} is listed twice")
+        names.add(region['name'])
+        if region.get('role', 'active') not in REGION_ROLES:
+            raise ValueError(f"Topology region {region['name']} role must be one of {', '.join(REGION_ROLES)}")
+        _number(region.get('traffic_share', 1), f"Topology region {region['name']} traffic_share")
+        _number(region.get('price_multiplier', 1.0), f"Topology region {region['name']} price_multiplier")
+    if sum(1 for r in regions if r.get('role') == 'primary') != 1:
+        raise ValueError("Topology must have exactly one primary region")
+    for key, default in DEFAULT_TOPOLOGY_SETTINGS.items():
+        if key == 'survive_region_loss':
+            if not isinstance(topology.get(key, default), bool):
+                raise ValueError("Topology survive_region_loss must be true or false")
+        else:
+            _number(topology.get(key, default), f"Topology {key}")
+
+def topology_settings(topology: Dict) -> Dict:
+    """Merge topology level settings over the defaults"""
+    return {key: topology.get(key, default) for key, default in DEFAULT_TOPOLOGY_SETTINGS.items()}
+
+def calculate_topology_costs(metrics: Dict, pricing: Dict, topology: Optional[Dict] = None) -> Dict:
+    """Calculate costs for the region layout in metrics['topology'].
+
+    Returns the same structure as calculate_with_cloud_pricing plus a
+    per-region breakdown. Non-production environments are sized on a single
+    region, since they are not replicated.
+    """
+    topology = topology or metrics['topology']
+    validate_topology(topology)
+    settings = topology_settings(topology)
+    regions = topology['regions']
+    names = [r['name'] for r in regions]
+
+    base = single_region_components(metrics, pricing)
+    matrices = layout_matrices([topology], names, settings)
+    multipliers = np.array([r.get('price_multiplier', 1.0) for r in regions])
+    costs = evaluate_layouts(matrices, multipliers, base, pricing, metrics, settings)
+
+    replication_gb = float(costs.pop('replication_gb')[0])
+    component_costs = {name: float(values[0]) for name, values in costs.items()}
+    total_monthly = sum(component_costs.values())
+
+    if metrics.get('include_nonprod', True):
+        component_costs['non_production'] = sum(base.values()) * 0.4
+        total_monthly += component_costs['non_production']
+
+    region_breakdown = {}
+    for i, region in enumerate(regions):
+        region_breakdown[region['name']] = {
+            'role': region.get('role', 'active'),
+            'traffic_share': float(matrices['shares'][0, i]),
+            'capacity': float(matrices['capacity'][0, i]),
+            'compute': float(base['compute'] * matrices['capacity'][0, i] * multipliers[i]),
+        }
+
+    return {
+        'provider': pricing.get('provider', 'Unknown'),
+        'region': ', '.join(names),
+        'components': component_costs,
+        'total_monthly': total_monthly,
+        'total_annual': total_monthly * 12,
+        'cost_per_customer': total_monthly / metrics['customer_count'] if metrics['customer_count'] > 0 else 0,
+        'regions': region_breakdown,
+        'replication_gb_month': replication_gb,
+    }
+
+def enumerate_layouts(candidates: List[Dict], min_regions: int = 2, max_regions: int = 3,
+                      modes: Optional[List[str]] = None) -> List[Dict]:
+    """Every combination of candidate regions, primary choice and layout mode"""
+    layouts = []
+    modes = modes or LAYOUT_MODES
+    for count in range(min_regions, max_regions + 1):
+        for combo in combinations(candidates, count):
+            for primary in combo:
+                others = [r for r in combo if r is not primary]
+                for mode in modes:
+                    if mode == 'active_active':
+                        roles = ['active'] * len(others)
+                    elif mode == 'active_standby':
+                        roles = ['standby'] * len(others)
+                    else:
+                        if len(others) < 2:
+                            continue
+                        roles = ['active'] + ['standby'] * (len(others) - 1)
+
+                    regions = [{'name': primary['name'], 'role': 'primary'}]
+                    regions += [{'name': r['name'], 'role': role} for r, role in zip(others, roles)]
+                    layouts.append({'mode': mode, 'regions': regions})
+    return layouts
+
+def search_topologies(metrics: Dict, pricing: Dict, topology: Dict, min_regions: int = 2,
+                      max_regions: int = 3, top: int = 10) -> List[Dict]:
+    """Price every candidate layout in one vectorised pass and return the cheapest"""
+    settings = topology_settings(topology)
+    candidates = topology['candidate_regions']
+    names = [r['name'] for r in candidates]
+    multipliers = np.array([r.get('price_multiplier', 1.0) for r in candidates])
+
+    layouts = enumerate_layouts(candidates, min_regions, min(max_regions, len(candidates)))
+    if not layouts:
+        return []
+
+    base = single_region_components(metrics, pricing)
+    matrices = layout_matrices(layouts, names, settings)
+    costs = evaluate_layouts(matrices, multipliers, base, pricing, metrics, settings)
+    replication_gb = costs.pop('replication_gb')
+    totals = sum(costs.values())
+
+    ranked = []
+    for row in np.argsort(totals)[:top]:
+        ranked.append({
+            'mode': layouts[row]['mode'],
+            'regions': layouts[row]['regions'],
+            'total_monthly': float(totals[row]),
+            'components': {name: float(values[row]) for name, values in costs.items()},
+            'replication_gb_month': float(replication_gb[row]),
+        })
+    return ranked
+
+def print_topology_report(costs: Dict, flat_costs: Dict):
+    """Print a topology-priced estimate next to the flat multiplier estimate"""
+    from utils import format_cost
+
+    print("\n" + "="*80)
+    print(f"GALAXY PLATFORM - MULTI-REGION TOPOLOGY ({costs['provider']})")
+    print("="*80)
+    print(f"{'Region':<16} {'Role':<10} {'Traffic':>9} {'Capacity':>10} {'Compute':>14}")
+    print("-"*80)
+    for name, region in costs['regions'].items():
+        print(f"{name:<16} {region['role']:<10} {region['traffic_share'] * 100:>8.0f}% "
+              f"{region['capacity']:>10.2f} {format_cost(region['compute']):>14}")
+    print(f"\nCross-region replication: {costs['replication_gb_month']:,.1f} GB/month")
+
+    print("\n" + "-"*80)
+    print(f"{'Component':<20} {'Topology':>15} {'Flat 2.8x':>15}")
+    print("-"*80)
+    for component in sorted(costs['components'], key=lambda c: costs['components'][c], reverse=True):
+        print(f"{component.replace('_', ' ').title():<20} {format_cost(costs['components'][component]):>15} "
+              f"{format_cost(flat_costs['components'].get(component, 0)):>15}")
+    print("-"*80)
+    print(f"{'TOTAL MONTHLY':<20} {format_cost(costs['total_monthly']):>15} "
+          f"{format_cost(flat_costs['total_monthly']):>15}")
+    print("="*80)
+
+def main():
+    """Main function for multi-region topology costing"""
+    parser = argparse.ArgumentParser(description='Galaxy Platform Multi-Region Topology Model')
+    parser.add_argument('config', help='Path to configuration file with a topology section')
+    parser.add_argument('--provider', choices=['aws', 'gcp', 'azure', 'generic'], default='generic',
+                       help='Cloud provider for pricing')
+    parser.add_argument('--search', action='store_true', help='Search candidate region layouts')
+    parser.add_argument('--min-regions', type=int, default=2, help='Minimum regions in a searched layout')
+    parser.add_argument('--max-regions', type=int, default=3, help='Maximum regions in a searched layout')
+
+    args = parser.parse_args()
+
+    from utils import load_config, format_cost
+    from galaxy_cloud_calculator import load_cloud_pricing, calculate_with_cloud_pricing
+    from galaxy_complete_cost_model import calculate_complete_galaxy_metrics
+
+    try:
+        config = load_config(args.config)
+        if 'topology' not in config:
+            raise ValueError(f"No topology section in {args.config}")
+
+        pricing = load_cloud_pricing(args.provider)
+        metrics = calculate_complete_galaxy_metrics(config)
+
+        if args.search:
+            ranked = search_topologies(metrics, pricing, config['topology'], args.min_regions, args.max_regions)
+            print("\n" + "="*80)
+            print("CHEAPEST REGION LAYOUTS (production, monthly)")
+            print("="*80)
+            for rank, layout in enumerate(ranked, 1):
+                regions = ', '.join(f"{r['name']}({r['role']})" for r in layout['regions'])
+                print(f"{rank:>2}. {format_cost(layout['total_monthly']):>10}  {layout['mode']:<22} {regions}")
+            return 0
+
+        costs = calculate_topology_costs(metrics, pricing)
+        flat = dict(metrics)
+        flat.pop('topology', None)
+        print_topology_report(costs, calculate_with_cloud_pricing(flat, pricing))
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
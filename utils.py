@@ -2,19 +2,37 @@
 Utility functions for the cost estimation model
 """
 
+import copy
 import json
 import yaml
-from typing import Dict, Any
+from pathlib import Path
+from typing import Dict, Any, Tuple
 from datetime import datetime
-import matplotlib.pyplot as plt
-import numpy as np
+
+# Parsed YAML by (resolved path, mtime, size); a warm calculation daemon
+# (calc_daemon.py) hands it to every forked run
+_YAML_CACHE: Dict[Tuple[str, int, int], Any] = {}
+
+def load_yaml(path) -> Any:
+    """Parse a YAML file, reusing the previous parse while the file is unchanged"""
+    path = Path(path).resolve()
+    stat = path.stat()
+    key = (str(path), stat.st_mtime_ns, stat.st_size)
+    if key not in _YAML_CACHE:
+        with open(path, 'r') as f:
+            data = yaml.safe_load(f)
+        for stale in [k for k in _YAML_CACHE if k[0] == key[0]]:
+            del _YAML_CACHE[stale]
+        _YAML_CACHE[key] = data
+    # Callers are free to modify what they get back
+    return copy.deepcopy(_YAML_CACHE[key])
 
 def load_config(config_path: str) -> Dict[str, Any]:
     """Load configuration from YAML or JSON file"""
+    if config_path.endswith('.yaml') or config_path.endswith('.yml'):
+        return load_yaml(config_path)
     with open(config_path, 'r') as f:
-        if config_path.endswith('.yaml') or config_path.endswith('.yml'):
-            return yaml.safe_load(f)
-        elif config_path.endswith('.json'):
+        if config_path.endswith('.json'):
             return json.load(f)
         else:
             raise ValueError("Config file must be YAML or JSON")
@@ -56,7 +74,7 @@ def calculate_derived_metrics(config: Dict[str, Any]) -> Dict[str, Any]:
     metrics['total_data_gb'] = (metrics['account_data_gb'] + 
                                 metrics['transaction_data_gb'] + 
                                 metrics['document_data_gb'])
-    metrics['peak_tps'] = metrics['base_tps'] * 3  # 3x peak multiplier
+    metrics['peak_tps'] = metrics['base_tps'] * config.get('peak_multiplier', 3)  # 3x peak by default
     metrics['daily_transactions'] = metrics['base_tps'] * 86400  # seconds in a day
     metrics['monthly_api_calls'] = metrics['daily_api_calls'] * 30
     
@@ -80,38 +98,13 @@ def generate_cost_breakdown_chart(costs: Dict[str, float], output_file: str = No
         print("No costs to visualize")
         return
     
-    labels = list(filtered_costs.keys())
-    sizes = list(filtered_costs.values())
-    
-    # Create pie chart
-    fig, ax = plt.subplots(figsize=(10, 8))
-    colors = plt.cm.Set3(np.linspace(0, 1, len(labels)))
-    
-    wedges, texts, autotexts = ax.pie(sizes, labels=labels, colors=colors,
-                                       autopct='%1.1f%%', startangle=90)
-    
-    # Enhance text
-    for text in texts:
-        text.set_fontsize(10)
-    for autotext in autotexts:
-        autotext.set_color('white')
-        autotext.set_fontsize(9)
-        autotext.set_weight('bold')
-    
-    ax.set_title('Infrastructure Cost Breakdown', fontsize=14, fontweight='bold')
-    
-    # Add legend with cost values
-    legend_labels = [f"{label}: {format_cost(cost)}" 
-                     for label, cost in zip(labels, sizes)]
-    ax.legend(legend_labels, loc='center left', bbox_to_anchor=(1, 0.5))
-    
-    plt.tight_layout()
-    
+    # matplotlib is only imported once a chart is actually drawn
+    from chart_renderer import save_chart, show_chart
     if output_file:
-        plt.savefig(output_file, dpi=150, bbox_inches='tight')
+        save_chart('cost_breakdown', {'costs': filtered_costs}, output_file)
         print(f"Chart saved to {output_file}")
     else:
-        plt.show()
+        show_chart('cost_breakdown', {'costs': filtered_costs})
 
 def generate_scaling_chart(sensitivity_results: list, output_file: str = None):
     """Generate a line chart showing cost scaling with customer growth"""
@@ -119,40 +112,14 @@ def generate_scaling_chart(sensitivity_results: list, output_file: str = None):
         print("No sensitivity results to visualize")
         return
     
-    # Extract data
-    scenarios = [r['scenario'] for r in sensitivity_results]
-    customer_counts = [r['customer_count'] for r in sensitivity_results]
-    total_costs = [r['total_monthly_cost'] for r in sensitivity_results]
-    
-    # Create line chart
-    fig, ax = plt.subplots(figsize=(10, 6))
-    
-    ax.plot(customer_counts, total_costs, marker='o', linewidth=2, markersize=8)
-    
-    # Annotate points
-    for i, (x, y, scenario) in enumerate(zip(customer_counts, total_costs, scenarios)):
-        ax.annotate(f"{scenario}\n{format_cost(y)}", 
-                   xy=(x, y), xytext=(0, 10),
-                   textcoords='offset points', ha='center',
-                   fontsize=9, bbox=dict(boxstyle='round,pad=0.3', 
-                                       facecolor='yellow', alpha=0.3))
-    
-    ax.set_xlabel('Number of Customers', fontsize=12)
-    ax.set_ylabel('Monthly Cost (USD)', fontsize=12)
-    ax.set_title('Infrastructure Cost Scaling Analysis', fontsize=14, fontweight='bold')
-    ax.grid(True, alpha=0.3)
-    
-    # Format y-axis
-    ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: format_cost(x)))
-    ax.xaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f"{int(x):,}"))
-    
-    plt.tight_layout()
-    
+    from chart_renderer import save_chart, show_chart
+    data = {'results': [{k: r[k] for k in ('scenario', 'customer_count', 'total_monthly_cost')}
+                        for r in sensitivity_results]}
     if output_file:
-        plt.savefig(output_file, dpi=150, bbox_inches='tight')
+        save_chart('scaling', data, output_file)
         print(f"Chart saved to {output_file}")
     else:
-        plt.show()
+        show_chart('scaling', data)
 
 def print_cost_report(costs: Dict[str, Any], metrics: Dict[str, Any]):
     """Print a formatted cost report"""
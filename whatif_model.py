@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Incremental what-if evaluation for Galaxy Platform
+Records which pricing keys and metrics each cost component reads, and after
+an edit to a unit price or an operation volume recomputes only the affected
+components
+"""
+
+import argparse
+import copy
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from segment_operations_model import get_operation_profiles
+from galaxy_complete_cost_model import calculate_complete_galaxy_metrics
+from galaxy_cloud_calculator import CLOUD_COMPONENTS, load_cloud_pricing
+
+SECONDS_PER_MONTH = 30 * 24 * 3600
+
+MAX_SESSIONS = 100
+
+_SESSIONS: "OrderedDict[str, WhatIfSession]" = OrderedDict()
+
+Path = Tuple[str, ...]
+
+class TrackingDict(dict):
+    """Dict that records the key path of every read into a shared set.
+
+    Nested dicts are wrapped on access, so pricing['compute']['vcpu_hour']
+    records ('pricing', 'compute', 'vcpu_hour'). Iterating a dict records
+    its own path, which covers every key below it.
+    """
+
+    def __init__(self, data: Dict, path: Path, reads: Set[Path]):
+        super().__init__(data)
+        self._path = path
+        self._reads = reads
+
+    def _wrap(self, key, value):
+        # Reaching through a nested dict is not a read of the whole dict; its
+        # leaves record themselves
+        if isinstance(value, dict):
+            return TrackingDict(value, self._path + (key,), self._reads)
+        self._reads.add(self._path + (key,))
+        return value
+
+    def __getitem__(self, key):
+        return self._wrap(key, super().__getitem__(key))
+
+    def get(self, key, default=None):
+        return self._wrap(key, super().get(key, default))
+
+    def __contains__(self, key):
+        self._reads.add(self._path + (key,))
+        return super().__contains__(key)
+
+    def __iter__(self):
+        self._reads.add(self._path)
+        return super().__iter__()
+
+    def items(self):
+        self._reads.add(self._path)
+        return [(k, self._wrap(k, v)) for k, v in super().items()]
+
+    def values(self):
+        return [v for _, v in self.items()]
+
+    def keys(self):
+        self._reads.add(self._path)
+        return super().keys()
+
+def affects(changed: Set[Path], reads: Set[Path]) -> bool:
+    """True if any changed path is, contains, or lies under a path that was read"""
+    for path in changed:
+        for read in reads:
+            shorter = min(len(path), len(read))
+            if path[:shorter] == read[:shorter]:
+                return True
+    return False
+
+class WhatIfSession:
+    """Baseline segment estimate that supports incremental edits.
+
+    Mirrors /api/calculate-segment for the fixed-fleet model: volumes from the
+    operation profiles, metrics from calculate_complete_galaxy_metrics with
+    segment-weighted rates, and the components of calculate_with_cloud_pricing.
+    Aggregates are re-summed in profile order so results are identical to a
+    full recompute, not merely close.
+    """
+
+    def __init__(self, retail_count: int, sme_count: int, corporate_count: int, provider: str = 'gcp',
+                 architecture: str = 'single_region_3az', include_nonprod: bool = True,
+                 volume_multiplier: float = 1.0):
+        self.counts = {'retail': retail_count, 'sme': sme_count, 'corporate': corporate_count}
+        self.volume_multiplier = volume_multiplier
+        self.provider = provider
+        self.profiles = [copy.copy(p) for p in get_operation_profiles()]
+        self.profile_index = {(p.service, p.operation): i for i, p in enumerate(self.profiles)}
+        self.pricing = copy.deepcopy(load_cloud_pricing(provider))
+
+        self.profile_ops = [self._profile_ops(p) for p in self.profiles]
+        self.metrics = calculate_complete_galaxy_metrics({
+            'customer_count': retail_count + sme_count + corporate_count,
+            'architecture_variant': architecture,
+            'backup_retention_days': 30,
+            'log_retention_days': 30,
+        })
+        self.metrics['include_nonprod'] = include_nonprod
+        self.metrics.update(self._volume_metrics())
+
+        self.components: Dict[str, float] = {}
+        self.reads: Dict[str, Set[Path]] = {}
+        for name in CLOUD_COMPONENTS:
+            self._evaluate(name)
+        self.totals = self._summarize()
+
+    def _profile_ops(self, profile) -> float:
+        return (profile.retail_volume * self.counts['retail'] * self.volume_multiplier +
+                profile.sme_volume * self.counts['sme'] * self.volume_multiplier +
+                profile.corporate_volume * self.counts['corporate'] * self.volume_multiplier)
+
+    def _volume_metrics(self) -> Dict[str, float]:
+        """Metrics the segment endpoint derives from calculate_total_volumes"""
+        total_ops = sum(self.profile_ops)
+        data_gb = sum((ops * p.bytes_per_operation) / (1024**3) if p.is_write_operation else 0
+                      for p, ops in zip(self.profiles, self.profile_ops))
+        titan_writes = sum(ops for p, ops in zip(self.profiles, self.profile_ops)
+                           if p.service == 'TITAN' and p.is_write_operation)
+
+        transaction_tps = titan_writes / SECONDS_PER_MONTH
+        return {
+            'transaction_tps': transaction_tps,
+            'ledger_tps': transaction_tps,
+            'customer_api_tps': total_ops / SECONDS_PER_MONTH,
+            'total_data_gb': data_gb * 12,
+        }
+
+    def _evaluate(self, name: str):
+        reads: Set[Path] = set()
+        metrics = TrackingDict(self.metrics, ('metrics',), reads)
+        pricing = TrackingDict(self.pricing, ('pricing',), reads)
+        # The variant is read through metrics so that editing it marks every component that uses it
+        self.components[name] = CLOUD_COMPONENTS[name](metrics, pricing, metrics['architecture_variant'])
+        self.reads[name] = reads
+
+    def _summarize(self) -> Dict[str, float]:
+        """Totals exactly as calculate_with_cloud_pricing forms them"""
+        components = dict(self.components)
+        total_monthly = sum(components.values())
+        if self.metrics.get('include_nonprod', True):
+            components['non_production'] = total_monthly * 0.4
+            total_monthly *= 1.4
+        return {'components': components, 'total_monthly': total_monthly}
+
+    def apply(self, changes: List[Dict[str, Any]]) -> Dict:
+        """Apply edits and recompute only the components that read what changed.
+
+        Supported edits:
+          {'price': 'compute.vcpu_hour', 'value': 0.05}
+          {'service': 'TITAN', 'operation': 'Payment Transaction', 'retail_volume': 60, ...}
+          {'metric': 'backup_retention_days', 'value': 14}
+        """
+        start = time.perf_counter()
+        changed: Set[Path] = set()
+        volumes_changed = False
+
+        for change in changes:
+            if 'price' in change:
+                *sections, key = change['price'].split('.')
+                node = self.pricing
+                for section in sections:
+                    node = node.setdefault(section, {})
+                if node.get(key) != change['value']:
+                    node[key] = change['value']
+                    changed.add(('pricing',) + tuple(sections) + (key,))
+            elif 'operation' in change:
+                index = self.profile_index.get((change['service'].upper(), change['operation']))
+                if index is None:
+                    raise ValueError(f"Unknown operation: {change['service']} / {change['operation']}")
+                profile = self.profiles[index]
+                for field in ('retail_volume', 'sme_volume', 'corporate_volume'):
+                    if field in change:
+                        setattr(profile, field, change[field])
+                self.profile_ops[index] = self._profile_ops(profile)
+                volumes_changed = True
+            elif 'metric' in change:
+                if self.metrics.get(change['metric']) != change['value']:
+                    self.metrics[change['metric']] = change['value']
+                    changed.add(('metrics', change['metric']))
+                    if change['metric'] == 'architecture_variant':
+                        # Derived from the variant, as calculate_complete_galaxy_metrics does
+                        self.metrics['enable_multi_region'] = change['value'] == 'multi_region_3az'
+                        changed.add(('metrics', 'enable_multi_region'))
+            else:
+                raise ValueError(f"Unsupported change: {change}")
+
+        if volumes_changed:
+            for key, value in self._volume_metrics().items():
+                if self.metrics[key] != value:
+                    self.metrics[key] = value
+                    changed.add(('metrics', key))
+
+        previous = self.totals
+        recomputed = [name for name in CLOUD_COMPONENTS if affects(changed, self.reads[name])]
+        for name in recomputed:
+            self._evaluate(name)
+        self.totals = self._summarize()
+
+        return {
+            'components': self.totals['components'],
+            'deltas': {name: value - previous['components'].get(name, 0)
+                       for name, value in self.totals['components'].items()
+                       if value != previous['components'].get(name, 0)},
+            'total_monthly': self.totals['total_monthly'],
+            'total_delta': self.totals['total_monthly'] - previous['total_monthly'],
+            'changed_inputs': sorted('.'.join(path[1:]) for path in changed),
+            'recomputed': recomputed,
+            'elapsed_ms': (time.perf_counter() - start) * 1000,
+        }
+
+    def dependencies(self) -> Dict[str, List[str]]:
+        """Inputs each component read on its last evaluation"""
+        return {name: sorted('.'.join(path) for path in reads) for name, reads in self.reads.items()}
+
+def get_session(session_id: Optional[str], **baseline) -> Tuple[str, WhatIfSession, bool]:
+    """Return (session id, session, created) for an existing id, or start a new baseline"""
+    if session_id in _SESSIONS:
+        _SESSIONS.move_to_end(session_id)
+        return session_id, _SESSIONS[session_id], False
+
+    session_id = uuid.uuid4().hex
+    _SESSIONS[session_id] = WhatIfSession(**baseline)
+    while len(_SESSIONS) > MAX_SESSIONS:
+        _SESSIONS.popitem(last=False)
+    return session_id, _SESSIONS[session_id], True
+
+def main():
+    """Main function for what-if evaluation"""
+    parser = argparse.ArgumentParser(description='Galaxy Platform Incremental What-If')
+    parser.add_argument('--retail', type=int, default=1000000, help='Number of retail customers')
+    parser.add_argument('--sme', type=int, default=100000, help='Number of SME customers')
+    parser.add_argument('--corporate', type=int, default=10000, help='Number of corporate customers')
+    parser.add_argument('--provider', choices=['aws', 'gcp', 'azure', 'generic'], default='gcp',
+                       help='Cloud provider for pricing')
+    parser.add_argument('--price', action='append', default=[], metavar='KEY=VALUE',
+                        help='Price edit, e.g. compute.vcpu_hour=0.05 (repeatable)')
+    parser.add_argument('--show-dependencies', action='store_true', help='Print the inputs each component reads')
+
+    args = parser.parse_args()
+
+    from utils import format_cost
+
+    session = WhatIfSession(args.retail, args.sme, args.corporate, args.provider)
+    if args.show_dependencies:
+        for name, reads in session.dependencies().items():
+            print(f"{name:<15} {', '.join(reads)}")
+
+    changes = []
+    for edit in args.price:
+        key, value = edit.split('=', 1)
+        changes.append({'price': key, 'value': float(value)})
+    result = session.apply(changes)
+
+    print(f"\nRecomputed {len(result['recomputed'])} of {len(CLOUD_COMPONENTS)} components "
+          f"in {result['elapsed_ms']:.3f} ms: {', '.join(result['recomputed']) or 'none'}")
+    for name, delta in result['deltas'].items():
+        print(f"  {name:<15} {'+' if delta >= 0 else '-'}{format_cost(abs(delta))}")
+    print(f"Total monthly: {format_cost(result['total_monthly'])} "
+          f"({'+' if result['total_delta'] >= 0 else '-'}{format_cost(abs(result['total_delta']))})")
+    return 0
+
+if __name__ == "__main__":
+    main()